@@ -2,11 +2,22 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 from django.utils.translation import gettext_lazy as _
 
-from .models import Worker, Position
+from . import search
+from .models import Position, Task, TaskType, Worker
+from .pagination import EstimatedCountPaginator
+
+
+class ScalableAdminMixin:
+    """Changelist settings for tables that may hold millions of rows."""
+
+    # Take the total from counters or table statistics, and skip the
+    # second, unfiltered COUNT(*) for "N results (M total)".
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 @admin.register(Worker)
-class WorkerAdmin(UserAdmin):
+class WorkerAdmin(ScalableAdminMixin, UserAdmin):
     model = Worker
 
     # ✅ Fields shown in admin list
@@ -20,10 +31,14 @@ class WorkerAdmin(UserAdmin):
         "is_active",
     )
 
+    list_select_related = ("position",)
+
     list_filter = ("is_staff", "is_active", "position")
 
     search_fields = ("username", "email", "first_name", "last_name")
 
+    autocomplete_fields = ("position",)
+
     ordering = ("username",)
 
     # ❌ Fields that should NOT be editable
@@ -75,3 +90,30 @@ class WorkerAdmin(UserAdmin):
 class PositionAdmin(admin.ModelAdmin):
     list_display = ("id", "name")
     search_fields = ("name",)
+
+
+@admin.register(TaskType)
+class TaskTypeAdmin(admin.ModelAdmin):
+    list_display = ("id", "name")
+    search_fields = ("name",)
+
+
+@admin.register(Task)
+class TaskAdmin(ScalableAdminMixin, admin.ModelAdmin):
+    list_display = (
+        "name",
+        "task_type",
+        "priority",
+        "deadline",
+        "is_complete",
+    )
+    list_select_related = ("task_type",)
+    list_filter = ("is_complete", "priority", "task_type")
+    # Matched through the full-text index instead of LIKE '%...%'.
+    search_fields = ("name", "description")
+    ordering = ("-deadline",)
+    autocomplete_fields = ("task_type", "assignees")
+    readonly_fields = ("updated_at",)
+
+    def get_search_results(self, request, queryset, search_term):
+        return search.filter_tasks(queryset, search_term), False
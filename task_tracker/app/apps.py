@@ -3,3 +3,14 @@ from django.apps import AppConfig
 
 class AppConfig(AppConfig):
     name = 'app'
+
+    def ready(self):
+        # Importing these modules connects their signal receivers.
+        from . import (  # noqa: F401
+            backends,
+            changes,
+            conditional,
+            counters,
+            row_cache,
+            sqlite,
+        )
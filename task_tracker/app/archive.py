@@ -0,0 +1,90 @@
+"""Move completed tasks out of ``Task`` into the ``ArchivedTask`` table.
+
+Finished work piles up in ``app_task`` although most pages only look at
+what is still open or recently done, and every list, count and index
+over the table pays for it. ``archive_tasks`` moves completed tasks that
+nobody has touched for a while into ``app_archivedtask``, with their
+assignees, a chunk of tasks per transaction so writers are never locked
+out for long.
+
+Archived tasks stay reachable: the task detail page falls back to the
+archive, and search and export include it on request (``?archived=1``).
+They leave the lists and the dashboard counters, which describe
+``Task``.
+"""
+from django.db import transaction
+from django.db.models import Prefetch
+from django.utils import timezone
+
+from . import bulk
+from .models import ArchivedTask, Task, Worker
+
+ArchivedAssignment = ArchivedTask.assignees.through
+
+BATCH_SIZE = 500
+
+# Copied over as they are; the archive keeps the task's id.
+FIELDS = (
+    "id",
+    "name",
+    "description",
+    "deadline",
+    "is_complete",
+    "priority",
+    "task_type_id",
+    "updated_at",
+)
+
+
+def archivable(cutoff):
+    """Completed tasks last changed before ``cutoff``."""
+    return Task.objects.filter(is_complete=True, updated_at__lt=cutoff)
+
+
+def archive_batch(cutoff, ids):
+    """Move the tasks among ``ids`` that are still archivable, in one
+    transaction; return how many moved."""
+    with transaction.atomic():
+        # Read again under the transaction: a task may have been reopened
+        # or edited since the ids were picked.
+        targets = archivable(cutoff).filter(pk__in=ids)
+        rows = list(targets.values(*FIELDS))
+        if not rows:
+            return 0
+        now = timezone.now()
+        ArchivedTask.objects.bulk_create(
+            [ArchivedTask(archived_at=now, **row) for row in rows]
+        )
+        moved = [row["id"] for row in rows]
+        ArchivedAssignment.objects.bulk_create([
+            ArchivedAssignment(archivedtask_id=task_id, worker_id=worker_id)
+            for task_id, worker_id in bulk.Assignment.objects.filter(
+                task_id__in=moved
+            ).values_list("task_id", "worker_id")
+        ])
+        # Settles the counters and drops the assignee rows as well.
+        bulk.delete(Task.objects.filter(pk__in=moved))
+    return len(rows)
+
+
+def archive_tasks(older_than, batch_size=BATCH_SIZE):
+    """Archive the completed tasks unchanged for ``older_than`` (a
+    ``timedelta``), ``batch_size`` at a time; yield each batch's count."""
+    cutoff = timezone.now() - older_than
+    after = 0
+    while True:
+        ids = list(
+            archivable(cutoff).filter(pk__gt=after).order_by("pk")
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        if not ids:
+            return
+        yield archive_batch(cutoff, ids)
+        after = ids[-1]
+
+
+def archived_queryset():
+    """``ArchivedTask``s loaded the way the task detail page needs."""
+    return ArchivedTask.objects.select_related("task_type").prefetch_related(
+        Prefetch("assignees", queryset=Worker.objects.only("id", "username"))
+    )
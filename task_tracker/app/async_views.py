@@ -0,0 +1,204 @@
+"""Async versions of the read-only views, for serving under ASGI.
+
+Each one borrows its queryset, filters and context from the sync view in
+``app.views`` and only swaps the blocking ORM calls for their async
+counterparts, so both stay in step. ``app.urls`` picks these when
+``settings.ASYNC_READ_VIEWS`` is on.
+
+Templates are returned as ``TemplateResponse``s, which the ASGI handler
+renders off the event loop.
+"""
+from functools import partial, wraps
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.mixins import AccessMixin
+from django.contrib.auth.views import redirect_to_login
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.shortcuts import aget_object_or_404
+from django.template.response import TemplateResponse
+from django.views import View
+
+from . import archive, conditional, counters, live, views, workload
+from .pagination import CursorPaginator, InvalidCursor
+
+
+def login_required(view_func):
+    """Async ``login_required`` that also resolves ``request.user``.
+
+    Loading the user here means nothing touches the lazy ``request.user``
+    (and so the database) synchronously later in the request.
+    """
+    @wraps(view_func)
+    async def wrapper(request, *args, **kwargs):
+        request.user = await request.auser()
+        if not request.user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        return await view_func(request, *args, **kwargs)
+    return wrapper
+
+
+class AsyncLoginRequiredMixin(AccessMixin):
+    async def dispatch(self, request, *args, **kwargs):
+        request.user = await request.auser()
+        if not request.user.is_authenticated:
+            return self.handle_no_permission()
+        return await super().dispatch(request, *args, **kwargs)
+
+
+async def get_page(paginator, request):
+    try:
+        return await paginator.apage(request.GET.get("cursor"))
+    except InvalidCursor as e:
+        raise Http404(str(e))
+
+
+async def conditional_response(request, view, render):
+    """Await ``render()`` unless the client's copy of the page is current.
+
+    See ``conditional.ConditionalGetMixin``; the validators are computed
+    by the sync ``view``.
+    """
+    validators = await sync_to_async(conditional.get_validators)(
+        request, view
+    )
+    if validators is None:
+        return await render()
+
+    response = conditional.not_modified(request, *validators)
+    if response is None:
+        response = await render()
+    return conditional.set_validators(response, *validators)
+
+
+@login_required
+async def index(request):
+    """View function for the home page of the site."""
+    context = views.dashboard_context(await counters.aget_counts())
+    return TemplateResponse(request, "app/index.html", context)
+
+
+@login_required
+async def tasks_live(request):
+    """View function for the live updates of a task list (see
+    ``app.live``), as Server-Sent Events."""
+    if not isinstance(request, ASGIRequest):
+        # A WSGI server reads the whole of a streamed response into memory
+        # first, which this one never ends.
+        return JsonResponse(
+            {"error": "Live updates are only served under ASGI."},
+            status=501,
+        )
+    # A reconnecting browser sends the id of the last event it got.
+    since = request.headers.get("Last-Event-ID", request.GET.get("since"))
+    try:
+        ids = [int(pk) for pk in request.GET.get("ids", "").split(",") if pk]
+        since = None if since is None else int(since)
+    except ValueError:
+        return JsonResponse(
+            {"error": "ids and since must be integers."}, status=400
+        )
+
+    response = StreamingHttpResponse(
+        live.stream(ids, since), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    # Stop a reverse proxy from holding events back.
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+class AsyncCursorListView(AsyncLoginRequiredMixin, View):
+    """Async counterpart of a cursor-paginated ``ListView``."""
+    sync_view = None
+
+    async def get(self, request, *args, **kwargs):
+        view = self.sync_view()
+        view.setup(request, *args, **kwargs)
+        return await conditional_response(
+            request, view, partial(self.render, request, view)
+        )
+
+    async def render(self, request, view):
+        # Validating the filters may look up model choices, so building the
+        # queryset is the one step that stays sync.
+        paginator = CursorPaginator(
+            await sync_to_async(view.get_queryset)(),
+            view.paginate_by,
+            view.get_cursor_ordering(),
+        )
+        page = await get_page(paginator, request)
+        context = {
+            "view": view,
+            "paginator": paginator,
+            "page_obj": page,
+            "is_paginated": page.has_other_pages(),
+            "object_list": page.object_list,
+        }
+        context.update(await self.get_extra_context(view, page))
+        return TemplateResponse(request, self.template_name, context)
+
+    async def get_extra_context(self, view, page):
+        return {}
+
+
+class TasksView(AsyncCursorListView):
+    """View function for the list of all tasks."""
+    sync_view = views.TasksView
+    template_name = "app/task_list.html"
+
+    async def get_extra_context(self, view, page):
+        return await sync_to_async(view.get_list_context)()
+
+
+class TasksDetailView(AsyncLoginRequiredMixin, View):
+    """View function for the detail view of a task."""
+
+    async def get(self, request, pk):
+        view = views.TasksDetailView()
+        view.setup(request, pk=pk)
+        return await conditional_response(
+            request, view, partial(self.render, request, view, pk)
+        )
+
+    async def render(self, request, view, pk):
+        try:
+            task = await aget_object_or_404(view.get_queryset(), pk=pk)
+        except Http404:
+            task = await aget_object_or_404(archive.archived_queryset(), pk=pk)
+
+        return TemplateResponse(
+            request, "app/task_detail.html", {"object": task, "task": task}
+        )
+
+
+class WorkersView(AsyncCursorListView):
+    """View function for the list of all workers."""
+    sync_view = views.WorkersView
+    template_name = "app/worker_list.html"
+
+    async def get_extra_context(self, view, page):
+        await workload.aattach_summaries(page.object_list)
+        return {}
+
+
+class WorkerDetailView(AsyncLoginRequiredMixin, View):
+    """View function for the detail view of a worker."""
+
+    async def get(self, request, pk):
+        view = views.WorkerDetailView()
+        view.setup(request, pk=pk)
+        return await conditional_response(
+            request, view, partial(self.render, request, view, pk)
+        )
+
+    async def render(self, request, view, pk):
+        view.object = await aget_object_or_404(view.get_queryset(), pk=pk)
+        await workload.aattach_summaries([view.object])
+
+        paginator = view.get_tasks_paginator()
+        page = await get_page(paginator, request)
+
+        context = {"object": view.object, "worker": view.object}
+        context.update(views.tasks_page_context(paginator, page))
+        return TemplateResponse(request, "app/worker_detail.html", context)
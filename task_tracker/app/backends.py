@@ -0,0 +1,89 @@
+"""An authentication backend that keeps logged-in workers in a cache.
+
+``AuthenticationMiddleware`` loads ``request.user`` through the backend's
+``get_user()`` on every request, and async views ``request.auser()``
+through ``aget_user()``. ``CachedModelBackend`` answers both from the
+``auth`` cache, which holds each worker with their position, and falls
+back to one query on a miss.
+
+A worker's entry is dropped whenever they are saved (a password change
+or a login included) or deleted, and when their position is renamed or
+deleted. Queryset ``update()`` calls bypass this; entries also expire
+after ``USER_CACHE_TIMEOUT`` seconds.
+"""
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import caches
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .models import Position, Worker
+
+CACHE_ALIAS = "auth"
+
+
+def get_cache():
+    return caches[CACHE_ALIAS]
+
+
+def cache_key(pk):
+    return f"worker:{pk}"
+
+
+def forget(pks):
+    get_cache().delete_many([cache_key(pk) for pk in pks])
+
+
+class CachedModelBackend(ModelBackend):
+    def get_user(self, user_id):
+        cache = get_cache()
+        key = cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            try:
+                user = Worker.objects.select_related("position").get(
+                    pk=user_id
+                )
+            except Worker.DoesNotExist:
+                return None
+            cache.set(key, user, settings.USER_CACHE_TIMEOUT)
+        return user if self.user_can_authenticate(user) else None
+
+    async def aget_user(self, user_id):
+        # What request.auser() calls, in the async views.
+        cache = get_cache()
+        key = cache_key(user_id)
+        user = await cache.aget(key)
+        if user is None:
+            try:
+                user = await Worker.objects.select_related("position").aget(
+                    pk=user_id
+                )
+            except Worker.DoesNotExist:
+                return None
+            await cache.aset(key, user, settings.USER_CACHE_TIMEOUT)
+        return user if self.user_can_authenticate(user) else None
+
+
+@receiver(post_save, sender=Worker)
+@receiver(post_delete, sender=Worker)
+def forget_worker(sender, instance, **kwargs):
+    forget([instance.pk])
+
+
+def forget_workers_of(position):
+    forget(
+        Worker.objects.filter(position=position).values_list("pk", flat=True)
+    )
+
+
+@receiver(post_save, sender=Position)
+def forget_workers_of_saved_position(sender, instance, created, **kwargs):
+    if not created:
+        forget_workers_of(instance)
+
+
+@receiver(pre_delete, sender=Position)
+def forget_workers_of_deleted_position(sender, instance, **kwargs):
+    # Before the delete sets their position to NULL.
+    forget_workers_of(instance)
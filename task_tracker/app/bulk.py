@@ -0,0 +1,147 @@
+"""Set-based edits of many tasks at once.
+
+Every action is one ``UPDATE``/``DELETE`` per statement-sized chunk of
+tasks instead of a ``save()`` per task, so no per-object signals run:
+the counters are settled from one grouped query taken before the write,
+and the change feed gets one ``INSERT ... SELECT`` per statement.
+"""
+from itertools import islice
+
+from django.db import connections, router, transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from . import changes, conditional, counters
+from .models import Change, Task
+
+Assignment = Task.assignees.through
+
+# Stay well under SQLite's bound-parameter limit for "id IN (...)".
+CHUNK_SIZE = 900
+
+ACTIONS = (
+    ("complete", "Mark completed"),
+    ("reopen", "Mark in progress"),
+    ("priority", "Set priority"),
+    ("type", "Set type"),
+    ("reassign", "Reassign to"),
+    ("delete", "Delete"),
+)
+
+
+def chunks(ids, size=CHUNK_SIZE):
+    ids = iter(ids)
+    while chunk := list(islice(ids, size)):
+        yield chunk
+
+
+def counter_deltas(targets, change):
+    """Counter deltas for applying ``change`` to every task in ``targets``.
+
+    ``change`` maps an ``(is_complete, priority)`` state to the new one, or
+    to ``None`` when the tasks are deleted.
+    """
+    deltas = {}
+    states = targets.order_by().values_list(
+        "is_complete", "priority"
+    ).annotate(n=Count("pk"))
+    for is_complete, priority, n in states:
+        new = change((is_complete, priority))
+        for name in counters.task_counters(is_complete, priority):
+            deltas[name] = deltas.get(name, 0) - n
+        for name in counters.task_counters(*new) if new else ():
+            deltas[name] = deltas.get(name, 0) + n
+    return deltas
+
+
+def update(targets, change, **fields):
+    deltas = counter_deltas(targets, change)
+    # Before the UPDATE, which may take the tasks out of ``targets``.
+    changes.record_bulk(Change.UPDATED, targets, fields)
+    # A single UPDATE; Django turns joined filters into an id subquery.
+    updated = Task.objects.filter(
+        pk__in=targets.order_by().values("pk")
+    ).update(updated_at=timezone.now(), **fields)
+    counters.adjust(deltas)
+    return updated
+
+
+def reassign(targets, worker):
+    ids = list(targets.order_by().values_list("pk", flat=True))
+    removed = 0
+    for chunk in chunks(ids):
+        removed += Assignment.objects.filter(task_id__in=chunk).delete()[0]
+        conditional.touch(Task.objects.filter(pk__in=chunk))
+        changes.record_bulk(
+            Change.ASSIGNEES,
+            Task.objects.filter(pk__in=chunk),
+            {"assignees": [worker.pk]},
+        )
+    Assignment.objects.bulk_create(
+        [Assignment(task_id=pk, worker_id=worker.pk) for pk in ids],
+        batch_size=CHUNK_SIZE,
+    )
+    counters.adjust({counters.ASSIGNMENTS: len(ids) - removed})
+    return len(ids)
+
+
+def delete_rows(ids):
+    """``DELETE`` the tasks ``ids`` in one statement.
+
+    Unlike ``QuerySet.delete()``, this sends no per-object signals and
+    follows no relations: the caller settles the counters and the change
+    feed, and removes the assignee rows, the only rows pointing at a task.
+    """
+    connection = connections[router.db_for_write(Task)]
+    table = connection.ops.quote_name(Task._meta.db_table)
+    placeholders = ", ".join(["%s"] * len(ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {table} WHERE id IN ({placeholders})", ids
+        )
+
+
+def delete(targets):
+    deltas = counter_deltas(targets, lambda state: None)
+    # The ids are read first: the filter may join through the assignee
+    # rows that are about to go.
+    ids = list(targets.order_by().values_list("pk", flat=True))
+    for chunk in chunks(ids):
+        changes.record_bulk(Change.DELETED, Task.objects.filter(pk__in=chunk))
+        deltas[counters.ASSIGNMENTS] = deltas.get(
+            counters.ASSIGNMENTS, 0
+        ) - Assignment.objects.filter(task_id__in=chunk).delete()[0]
+        # No per-object pre/post_delete: the counters are settled below.
+        delete_rows(chunk)
+    counters.adjust(deltas)
+    return len(ids)
+
+
+def apply(action, targets, priority=None, task_type=None, worker=None):
+    """Run ``action`` on the ``targets`` queryset; return how many tasks."""
+    with transaction.atomic():
+        if action == "complete":
+            count = update(
+                targets, lambda state: (True, state[1]), is_complete=True
+            )
+        elif action == "reopen":
+            count = update(
+                targets, lambda state: (False, state[1]), is_complete=False
+            )
+        elif action == "priority":
+            count = update(
+                targets, lambda state: (state[0], priority), priority=priority
+            )
+        elif action == "type":
+            count = update(
+                targets, lambda state: state, task_type_id=task_type.pk
+            )
+        elif action == "reassign":
+            count = reassign(targets, worker)
+        elif action == "delete":
+            count = delete(targets)
+        else:
+            raise ValueError(f"Unknown bulk action {action!r}")
+
+    counters.invalidate_overdue()
+    return count
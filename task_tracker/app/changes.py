@@ -0,0 +1,195 @@
+"""An append-only feed of changes to tasks and workers.
+
+Every create, update and delete of a ``Task`` or ``Worker``, and every
+change to a task's assignees, appends a ``Change`` in the same
+transaction as the write. Clients that keep a copy of the data poll
+``ChangesView`` (``/changes/?since=<cursor>``) for the entries after the
+last one they saw instead of reloading whole pages.
+
+The cursor is the id of the last entry seen. Ids only grow and, as SQLite
+runs one write transaction at a time, they become visible in order and
+without gaps: a client never skips an entry committed late.
+
+Entries carry what the change wrote, so a client can apply it without
+fetching the object: ``created`` and ``updated`` entries hold the fields
+saved (all of them for a ``save()``, only those changed for a bulk edit;
+merge them into the copy) and an ``assignees`` entry holds the task's
+whole list of assignee ids. Deleting a worker removes them from their
+tasks' assignees without an entry per task.
+
+Writes that bypass signals call ``record_tasks()`` (``import_tasks``) or,
+when every task gets the same entry, the much cheaper ``record_bulk()``
+(``app.bulk``) themselves. ``manage.py compact_changes`` deletes old
+entries; a client whose cursor is older than what is left must reload.
+"""
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+from django.db.models import Max
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Change, Task, Worker
+
+Assignment = Task.assignees.through
+
+# Stay well under SQLite's bound-parameter limit for "id IN (...)".
+CHUNK_SIZE = 900
+
+TASK_FIELDS = (
+    "name",
+    "description",
+    "deadline",
+    "is_complete",
+    "priority",
+    "task_type_id",
+)
+WORKER_FIELDS = ("username", "first_name", "last_name", "position_id")
+# As named in save(update_fields=...).
+WORKER_FIELD_NAMES = {"username", "first_name", "last_name", "position"}
+
+
+def snapshot(instance, fields):
+    return {field: getattr(instance, field) for field in fields}
+
+
+def record(model, object_id, action, data=None):
+    Change.objects.create(
+        model=model, object_id=object_id, action=action, data=data
+    )
+
+
+def task_assignees(ids):
+    """Task id -> its assignees' ids, for each task in ``ids``."""
+    assignees = {pk: [] for pk in ids}
+    rows = Assignment.objects.filter(task_id__in=ids).order_by(
+        "task_id", "worker_id"
+    ).values_list("task_id", "worker_id")
+    for task_id, worker_id in rows:
+        assignees[task_id].append(worker_id)
+    return assignees
+
+
+def task_states(action, ids):
+    """Task id -> the ``data`` of a ``created``, ``updated`` or
+    ``assignees`` entry, for each task in ``ids``."""
+    if action == Change.ASSIGNEES:
+        return {
+            pk: {"assignees": workers}
+            for pk, workers in task_assignees(ids).items()
+        }
+    rows = Task.objects.filter(pk__in=ids).values("id", *TASK_FIELDS)
+    return {row.pop("id"): row for row in rows}
+
+
+def record_tasks(action, ids):
+    """Append an ``action`` entry for each task in ``ids``, reading their
+    state from the database."""
+    ids = list(ids)
+    for start in range(0, len(ids), CHUNK_SIZE):
+        states = task_states(action, ids[start:start + CHUNK_SIZE])
+        Change.objects.bulk_create([
+            Change(model=Change.TASK, object_id=pk, action=action, data=data)
+            for pk, data in states.items()
+        ])
+
+
+def record_bulk(action, queryset, data=None):
+    """Append the same ``action`` entry, holding ``data``, for every task
+    in ``queryset``.
+
+    One ``INSERT ... SELECT``: nothing is loaded into Python. Run it
+    before a delete, or before an update that may take tasks out of
+    ``queryset``.
+    """
+    ids_sql, params = queryset.order_by().values("pk").query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {Change._meta.db_table}
+                (model, object_id, action, data, created_at)
+            SELECT %s, id, %s, %s, %s
+            FROM {Task._meta.db_table}
+            WHERE id IN ({ids_sql})
+            ORDER BY id
+            """,
+            (
+                Change.TASK,
+                action,
+                None if data is None else json.dumps(
+                    data, cls=DjangoJSONEncoder
+                ),
+                connection.ops.adapt_datetimefield_value(timezone.now()),
+                *params,
+            ),
+        )
+
+
+def latest_cursor():
+    return Change.objects.aggregate(latest=Max("pk"))["latest"] or 0
+
+
+def oldest_cursor():
+    """The earliest cursor the feed can still continue from."""
+    oldest = Change.objects.order_by("pk").values_list("pk", flat=True)
+    first = oldest.first()
+    return 0 if first is None else first - 1
+
+
+@receiver(post_save, sender=Task)
+def record_saved_task(sender, instance, created, **kwargs):
+    record(
+        Change.TASK,
+        instance.pk,
+        Change.CREATED if created else Change.UPDATED,
+        snapshot(instance, TASK_FIELDS),
+    )
+
+
+@receiver(post_delete, sender=Task)
+def record_deleted_task(sender, instance, **kwargs):
+    record(Change.TASK, instance.pk, Change.DELETED)
+
+
+@receiver(post_save, sender=Worker)
+def record_saved_worker(sender, instance, created, update_fields, **kwargs):
+    # Logging in saves only last_login, which the feed leaves out.
+    if update_fields and not WORKER_FIELD_NAMES & update_fields:
+        return
+    record(
+        Change.WORKER,
+        instance.pk,
+        Change.CREATED if created else Change.UPDATED,
+        snapshot(instance, WORKER_FIELDS),
+    )
+
+
+@receiver(post_delete, sender=Worker)
+def record_deleted_worker(sender, instance, **kwargs):
+    record(Change.WORKER, instance.pk, Change.DELETED)
+
+
+@receiver(m2m_changed, sender=Assignment)
+def record_assignees(sender, instance, action, reverse, pk_set, **kwargs):
+    if action in ("post_add", "post_remove") and not pk_set:
+        return
+    if action == "pre_clear" and reverse:
+        # Which tasks lose this worker is only known before the clear.
+        instance._changed_task_ids = list(
+            Assignment.objects.filter(worker_id=instance.pk).values_list(
+                "task_id", flat=True
+            )
+        )
+        return
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if not reverse:
+        ids = [instance.pk]
+    elif action == "post_clear":
+        ids = instance._changed_task_ids
+    else:
+        ids = pk_set
+    record_tasks(Change.ASSIGNEES, ids)
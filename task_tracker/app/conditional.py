@@ -0,0 +1,171 @@
+"""Conditional GET (``ETag``/``Last-Modified``) for the read views.
+
+``Task.updated_at`` and ``Worker.updated_at`` are bumped by ``auto_now``;
+the receivers below also bump them for changes that show up on a page
+without saving the row itself: assignees, and renamed or deleted task
+types, positions and workers.
+
+A view opts in with ``get_validators()``, which describes its page with
+one or two cheap queries and returns ``(state, last_modified)``. The
+ETag hashes that state with everything else the page depends on, so an
+unchanged page is answered with a 304 before any template work.
+``last_modified`` is only given where a single timestamp covers the
+whole page; lists also change when rows are deleted, which only the ETag
+notices, through the change feed cursor (see ``app.changes``). No
+validator counts rows: each is an index lookup.
+"""
+import hashlib
+
+from django.contrib import messages
+from django.db.models import Max, Min
+from django.db.models.signals import m2m_changed, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.http import http_date, quote_etag
+
+from . import changes
+from .models import Position, Task, TaskType, Worker
+
+Assignment = Task.assignees.through
+
+
+def touch(queryset):
+    """Bump ``updated_at`` for every row of ``queryset`` in one UPDATE."""
+    return queryset.update(updated_at=timezone.now())
+
+
+def task_state():
+    """What a page listing tasks depends on among them.
+
+    Both parts are index lookups, whatever the filters: the latest
+    ``updated_at``, and the change feed cursor, which also moves when a
+    task is deleted. Any change to any task retires every list's ETag.
+    """
+    latest = Task.objects.aggregate(latest=Max("updated_at"))["latest"]
+    return latest, changes.latest_cursor()
+
+
+def workload_state():
+    """``task_state`` plus when the next open task falls overdue: overdue
+    counts move with the clock exactly then."""
+    next_due = Task.objects.filter(
+        is_complete=False, deadline__gte=timezone.now()
+    ).aggregate(next_due=Min("deadline"))["next_due"]
+    return (*task_state(), next_due)
+
+
+def has_pending_messages(request):
+    # A page carrying a one-off message must not be cached: a later 304
+    # would show the message again from the browser's copy.
+    return len(messages.get_messages(request)) > 0
+
+
+def get_validators(request, view):
+    """``(etag, last_modified)`` for ``view``'s page, or ``None``."""
+    if has_pending_messages(request):
+        return None
+    validators = view.get_validators()
+    if validators is None:
+        return None
+
+    state, last_modified = validators
+    # The CSRF secret is rendered into every form on the page.
+    key = repr((
+        request.user.pk,
+        request.META.get("CSRF_COOKIE"),
+        request.get_full_path(),
+        state,
+    ))
+    digest = hashlib.md5(key.encode(), usedforsecurity=False).hexdigest()
+    return quote_etag(digest), last_modified
+
+
+def not_modified(request, etag, last_modified):
+    """The 304 response for an unchanged page, or ``None``."""
+    return get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=last_modified and int(last_modified.timestamp()),
+    )
+
+
+def set_validators(response, etag, last_modified):
+    response["ETag"] = etag
+    if last_modified:
+        response["Last-Modified"] = http_date(last_modified.timestamp())
+    # Let browsers keep the page, but always revalidate it with us.
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ("Cookie",))
+    return response
+
+
+class ConditionalGetMixin:
+    """Answer ``If-None-Match``/``If-Modified-Since`` before rendering."""
+
+    def get_validators(self):
+        return None
+
+    def get(self, request, *args, **kwargs):
+        validators = get_validators(request, self)
+        if validators is None:
+            return super().get(request, *args, **kwargs)
+
+        response = not_modified(request, *validators)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        return set_validators(response, *validators)
+
+
+@receiver(m2m_changed, sender=Assignment)
+def touch_reassigned_tasks(sender, instance, action, reverse, pk_set,
+                           **kwargs):
+    if action not in ("post_add", "pre_remove", "pre_clear"):
+        return
+    if not reverse:
+        touch(Task.objects.filter(pk=instance.pk))
+    elif action == "pre_clear":
+        touch(Task.objects.filter(assignees=instance))
+    elif pk_set:
+        touch(Task.objects.filter(pk__in=pk_set))
+
+
+@receiver(post_save, sender=Worker)
+def touch_tasks_of_saved_worker(sender, instance, created, update_fields,
+                                **kwargs):
+    # Tasks show their assignees' usernames. Logging in saves only
+    # last_login, which no page shows.
+    if created or (update_fields and "username" not in update_fields):
+        return
+    touch(Task.objects.filter(assignees=instance))
+
+
+@receiver(pre_delete, sender=Worker)
+def touch_tasks_of_deleted_worker(sender, instance, **kwargs):
+    touch(Task.objects.filter(assignees=instance))
+
+
+@receiver(post_save, sender=TaskType)
+def touch_tasks_of_saved_type(sender, instance, created, **kwargs):
+    if not created:
+        touch(Task.objects.filter(task_type=instance))
+
+
+@receiver(pre_delete, sender=TaskType)
+def touch_tasks_of_deleted_type(sender, instance, **kwargs):
+    touch(Task.objects.filter(task_type=instance))
+
+
+@receiver(post_save, sender=Position)
+def touch_workers_of_saved_position(sender, instance, created, **kwargs):
+    if not created:
+        touch(Worker.objects.filter(position=instance))
+
+
+@receiver(pre_delete, sender=Position)
+def touch_workers_of_deleted_position(sender, instance, **kwargs):
+    touch(Worker.objects.filter(position=instance))
@@ -0,0 +1,279 @@
+"""Dashboard counters kept up to date by signals instead of COUNT(*).
+
+Each counter is a row in ``Counter``. Saves, deletes and assignee changes
+adjust the affected rows with a single ``UPDATE ... SET value = value + d``.
+Deletes and assignee changes run their signals inside the write's own
+transaction. ``post_save`` runs after the save, in the same transaction
+only within an ``atomic()`` block: under autocommit the adjustment commits
+separately, and a failure in between leaves the counters off by that
+save. Writes that bypass signals (``QuerySet.update()``,
+``bulk_create()``, raw SQL) must call ``adjust()`` themselves;
+``manage.py recount`` repairs any drift and restores missing rows.
+
+"Overdue" changes as time passes without any write, so it cannot be
+maintained incrementally. It is an indexed range count on
+(is_complete, deadline), cached for ``OVERDUE_TTL`` seconds and dropped
+whenever a task changes.
+"""
+import asyncio
+import logging
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, Count, F, Q, When
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Counter, Task, Worker
+
+logger = logging.getLogger("app.counters")
+
+OVERDUE_TTL = 60
+OVERDUE_CACHE_KEY = "counters:overdue"
+
+TASKS = "tasks"
+TASKS_OPEN = "tasks_open"
+TASKS_COMPLETE = "tasks_complete"
+WORKERS = "workers"
+ASSIGNMENTS = "assignments"
+
+Assignment = Task.assignees.through
+
+
+def priority_counter(priority):
+    return f"tasks_priority_{priority}"
+
+
+def task_counters(is_complete, priority):
+    """Names of the counters a task with these values contributes to."""
+    return (
+        TASKS,
+        TASKS_COMPLETE if is_complete else TASKS_OPEN,
+        priority_counter(priority),
+    )
+
+
+def tasks_delta(states, sign=1):
+    """Deltas for adding (or, with ``sign=-1``, removing) tasks.
+
+    ``states`` is an iterable of ``(is_complete, priority)`` pairs; use it
+    to settle the counters after bulk writes that send no signals.
+    """
+    deltas = {}
+    for state in states:
+        for name in task_counters(*state):
+            deltas[name] = deltas.get(name, 0) + sign
+    return deltas
+
+
+def counter_names():
+    return (
+        TASKS, TASKS_OPEN, TASKS_COMPLETE, WORKERS, ASSIGNMENTS,
+        *(priority_counter(value) for value, _ in Task.PRIORITY_CHOICES),
+    )
+
+
+def compute():
+    """Count everything from scratch. Expensive: scans every table."""
+    totals = Task.objects.aggregate(
+        **{
+            TASKS: Count("pk"),
+            TASKS_OPEN: Count("pk", filter=Q(is_complete=False)),
+            TASKS_COMPLETE: Count("pk", filter=Q(is_complete=True)),
+        },
+        **{
+            priority_counter(value): Count("pk", filter=Q(priority=value))
+            for value, _ in Task.PRIORITY_CHOICES
+        },
+    )
+    totals[WORKERS] = Worker.objects.count()
+    totals[ASSIGNMENTS] = Assignment.objects.count()
+    return totals
+
+
+def recount():
+    """Overwrite every counter with a fresh count; return the old values."""
+    with transaction.atomic():
+        old = dict(Counter.objects.values_list("name", "value"))
+        totals = compute()
+        Counter.objects.bulk_create(
+            [Counter(name=name, value=n) for name, n in totals.items()],
+            update_conflicts=True,
+            unique_fields=["name"],
+            update_fields=["value"],
+        )
+    invalidate_overdue()
+    return old, totals
+
+
+def adjust(deltas):
+    """Apply ``{name: delta}`` to the counters in one UPDATE."""
+    deltas = {name: delta for name, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    updated = Counter.objects.filter(name__in=deltas).update(
+        value=F("value") + Case(
+            *[When(name=name, then=delta) for name, delta in deltas.items()]
+        )
+    )
+    if updated < len(deltas):
+        # A counter row is missing (e.g. the table was flushed), so there
+        # is no baseline to add to. Counting afresh scans every table: too
+        # slow for the request that got here.
+        missing = set(deltas) - set(
+            Counter.objects.filter(name__in=deltas).values_list(
+                "name", flat=True
+            )
+        )
+        logger.warning(
+            "Counters %s are missing; run \"manage.py recount\".",
+            ", ".join(sorted(missing)),
+        )
+
+
+def invalidate_overdue():
+    cache.delete(OVERDUE_CACHE_KEY)
+
+
+def overdue_count():
+    return cache.get_or_set(
+        OVERDUE_CACHE_KEY,
+        lambda: Task.objects.filter(
+            is_complete=False, deadline__lt=timezone.now()
+        ).count(),
+        OVERDUE_TTL,
+    )
+
+
+def get_count(name):
+    """Return the value of one counter."""
+    value = Counter.objects.filter(name=name).values_list("value", flat=True)
+    return value.first() or 0
+
+
+def get_counts():
+    """Return every counter, plus ``overdue``, without touching app_task."""
+    counts = dict.fromkeys(counter_names(), 0)
+    counts.update(Counter.objects.values_list("name", "value"))
+    counts["overdue"] = overdue_count()
+    return counts
+
+
+async def aoverdue_count():
+    count = await cache.aget(OVERDUE_CACHE_KEY)
+    if count is None:
+        count = await Task.objects.filter(
+            is_complete=False, deadline__lt=timezone.now()
+        ).acount()
+        await cache.aset(OVERDUE_CACHE_KEY, count, OVERDUE_TTL)
+    return count
+
+
+async def aget_counts():
+    """Async ``get_counts()``: the counter rows and overdue run together."""
+    async def counter_rows():
+        return [
+            row async for row in Counter.objects.values_list("name", "value")
+        ]
+
+    rows, overdue = await asyncio.gather(counter_rows(), aoverdue_count())
+    counts = dict.fromkeys(counter_names(), 0)
+    counts.update(rows)
+    counts["overdue"] = overdue
+    return counts
+
+
+def _stored_task_state(pk):
+    # Read the row rather than trusting the instance, which may be stale.
+    return Task.objects.filter(pk=pk).values_list(
+        "is_complete", "priority"
+    ).first()
+
+
+@receiver(pre_save, sender=Task)
+def remember_task_state(sender, instance, **kwargs):
+    instance._counter_state = (
+        None if instance._state.adding else _stored_task_state(instance.pk)
+    )
+
+
+@receiver(post_save, sender=Task)
+def count_saved_task(sender, instance, created, **kwargs):
+    deltas = dict.fromkeys(
+        task_counters(instance.is_complete, instance.priority), 1
+    )
+    old = instance._counter_state
+    if not created and old is not None:
+        for name in task_counters(*old):
+            deltas[name] = deltas.get(name, 0) - 1
+
+    adjust(deltas)
+    invalidate_overdue()
+
+
+@receiver(pre_delete, sender=Task)
+def count_deleted_task(sender, instance, **kwargs):
+    # pre_delete runs inside the deletion's transaction, while the row and
+    # its assignments still exist to be counted.
+    state = _stored_task_state(instance.pk)
+    if state is None:
+        return
+
+    deltas = dict.fromkeys(task_counters(*state), -1)
+    deltas[ASSIGNMENTS] = -Assignment.objects.filter(
+        task_id=instance.pk
+    ).count()
+    adjust(deltas)
+
+
+@receiver(post_delete, sender=Task)
+def forget_overdue(sender, instance, **kwargs):
+    invalidate_overdue()
+
+
+@receiver(post_save, sender=Worker)
+def count_saved_worker(sender, instance, created, **kwargs):
+    if created:
+        adjust({WORKERS: 1})
+
+
+@receiver(pre_delete, sender=Worker)
+def count_deleted_worker_assignments(sender, instance, **kwargs):
+    adjust({
+        ASSIGNMENTS: -Assignment.objects.filter(
+            worker_id=instance.pk
+        ).count()
+    })
+
+
+@receiver(post_delete, sender=Worker)
+def count_deleted_worker(sender, instance, **kwargs):
+    adjust({WORKERS: -1})
+
+
+@receiver(m2m_changed, sender=Assignment)
+def count_assignments(sender, instance, action, reverse, pk_set, **kwargs):
+    # post_add's pk_set only holds rows that were actually inserted, but
+    # remove/clear report what was asked for, so count what really exists
+    # before the rows go (the related manager runs both in one atomic).
+    if action == "post_add":
+        adjust({ASSIGNMENTS: len(pk_set)})
+        return
+    if action not in ("pre_remove", "pre_clear"):
+        return
+
+    own, other = ("worker_id", "task_id") if reverse else (
+        "task_id", "worker_id"
+    )
+    rows = Assignment.objects.filter(**{own: instance.pk})
+    if action == "pre_remove":
+        rows = rows.filter(**{f"{other}__in": pk_set})
+    adjust({ASSIGNMENTS: -rows.count()})
@@ -0,0 +1,85 @@
+"""Streaming task exports.
+
+Rows are produced from ``QuerySet.iterator()``, which reads the result in
+chunks and runs the assignee prefetch once per chunk, so memory use is
+bounded by ``CHUNK_SIZE`` however many tasks are exported. Several
+querysets (tasks, then archived tasks) stream one after the other.
+"""
+import csv
+import json
+from itertools import chain
+
+from django.db.models import Prefetch
+
+from .models import Worker
+
+CHUNK_SIZE = 2000
+
+COLUMNS = (
+    "id",
+    "name",
+    "description",
+    "deadline",
+    "is_complete",
+    "priority",
+    "task_type",
+    "assignees",
+)
+
+
+class Echo:
+    """File-like object whose ``write`` hands back the line to stream."""
+
+    def write(self, value):
+        return value
+
+
+def export_queryset(queryset):
+    return queryset.select_related("task_type").prefetch_related(
+        Prefetch("assignees", queryset=Worker.objects.only("id", "username"))
+    ).only(
+        "id",
+        "name",
+        "description",
+        "deadline",
+        "is_complete",
+        "priority",
+        "task_type__name",
+    )
+
+
+def iter_records(*querysets, chunk_size=None):
+    tasks = chain.from_iterable(
+        queryset.iterator(chunk_size=chunk_size or CHUNK_SIZE)
+        for queryset in querysets
+    )
+    for task in tasks:
+        yield {
+            "id": task.id,
+            "name": task.name,
+            "description": task.description,
+            "deadline": task.deadline.isoformat(),
+            "is_complete": task.is_complete,
+            "priority": task.priority,
+            "task_type": task.task_type.name if task.task_type else None,
+            "assignees": [worker.username for worker in task.assignees.all()],
+        }
+
+
+def csv_lines(*querysets, chunk_size=None):
+    writer = csv.writer(Echo())
+    yield writer.writerow(COLUMNS)
+    for record in iter_records(*querysets, chunk_size=chunk_size):
+        record["assignees"] = ";".join(record["assignees"])
+        yield writer.writerow([record[column] for column in COLUMNS])
+
+
+def ndjson_lines(*querysets, chunk_size=None):
+    for record in iter_records(*querysets, chunk_size=chunk_size):
+        yield json.dumps(record, ensure_ascii=False) + "\n"
+
+
+FORMATS = {
+    "csv": (csv_lines, "text/csv"),
+    "ndjson": (ndjson_lines, "application/x-ndjson"),
+}
@@ -1,6 +1,10 @@
 from django.contrib.auth import get_user_model
 from django.contrib.auth.forms import UserCreationForm
 from django import forms
+from django.urls import reverse_lazy
+
+from . import bulk, search
+from .models import Task, TaskType, fold_case
 
 
 User = get_user_model()
@@ -17,25 +21,9 @@ class WorkerCreationForm(UserCreationForm):
         )
 
     def clean_email(self):
-        email = self.cleaned_data.get("email")
-
-        if User.objects.filter(email=email).exists():
-            raise forms.ValidationError(
-                "A user with this email already exists."
-            )
-
-        return email
-
-    # ✅ Extra safety: atomic save
-    def save(self, commit=True):
-
-        user = super().save(commit=False)
-        user.email = user.email.lower()
-
-        if commit:
-            user.save()
-
-        return user
+        # Lowercased before validation, so the uniqueness check (the
+        # Lower(email) constraint on Worker) sees what will be stored.
+        return fold_case(self.cleaned_data["email"])
 
 
 class WorkerUpdateForm(forms.ModelForm):
@@ -49,17 +37,202 @@ class WorkerUpdateForm(forms.ModelForm):
             "position",
         )
 
-    def clean_email(self):
-        email = self.cleaned_data.get("email")
 
-        # ✅ Allow user to keep their own email
-        qs = User.objects.filter(email=email)
-        if self.instance.pk:
-            qs = qs.exclude(pk=self.instance.pk)
+class AutocompleteSelectMultiple(forms.SelectMultiple):
+    """A ``<select multiple>`` holding only the selected objects.
+
+    The other choices are never rendered: the script in
+    ``static/js/autocomplete.js`` fetches them from ``url`` as the user
+    types. Validation still runs against the field's whole queryset.
+    """
 
-        if qs.exists():
-            raise forms.ValidationError(
-                "A user with this email already exists."
+    def __init__(self, url, attrs=None):
+        super().__init__(attrs)
+        self.url = url
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        context["widget"]["attrs"]["data-autocomplete-url"] = self.url
+        return context
+
+    def optgroups(self, name, value, attrs=None):
+        pks = [pk for pk in value if str(pk).isdigit()]
+        if not pks:
+            return []
+        choices = self.choices
+        selected = choices.queryset.filter(pk__in=pks)
+        return [
+            (None, [self.create_option(
+                name, *choices.choice(obj), True, index, attrs=attrs
+            )], index)
+            for index, obj in enumerate(selected)
+        ]
+
+
+class TaskForm(forms.ModelForm):
+    class Meta:
+        model = Task
+        fields = (
+            "name",
+            "description",
+            "deadline",
+            "is_complete",
+            "priority",
+            "task_type",
+            "assignees",
+        )
+        widgets = {
+            "assignees": AutocompleteSelectMultiple(
+                reverse_lazy("app:workers-autocomplete")
+            ),
+        }
+
+
+class TaskFilterForm(forms.Form):
+    """Query-string filters for the task list, applied in SQL."""
+
+    STATUS_CHOICES = (
+        ("", "Any status"),
+        ("open", "In progress"),
+        ("complete", "Completed"),
+    )
+    ORDERING_CHOICES = (
+        ("deadline", "Deadline (soonest first)"),
+        ("-deadline", "Deadline (latest first)"),
+        ("name", "Name (A-Z)"),
+        ("-name", "Name (Z-A)"),
+        ("-id", "Newest first"),
+    )
+
+    q = forms.CharField(required=False, label="Search")
+    status = forms.ChoiceField(choices=STATUS_CHOICES, required=False)
+    priority = forms.ChoiceField(
+        choices=(("", "Any priority"),) + Task.PRIORITY_CHOICES,
+        required=False,
+    )
+    type = forms.ModelChoiceField(
+        queryset=TaskType.objects.all(),
+        required=False,
+        empty_label="Any type",
+    )
+    assignee = forms.CharField(required=False, label="Assignee username")
+    deadline_after = forms.DateTimeField(
+        required=False, label="Deadline after (YYYY-MM-DD)"
+    )
+    deadline_before = forms.DateTimeField(
+        required=False, label="Deadline before (YYYY-MM-DD)"
+    )
+    ordering = forms.ChoiceField(choices=ORDERING_CHOICES, required=False)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for field in self.fields.values():
+            field.widget.attrs.update(
+                {"class": "form-control mr-2", "placeholder": field.label}
             )
 
-        return email
+    def get_ordering(self):
+        # Lenient like filter(): a bad value elsewhere keeps the ordering.
+        self.is_valid()
+        return (self.cleaned_data.get("ordering") or "deadline",)
+
+    def filter(self, queryset):
+        """Narrow ``queryset`` by every field that validated.
+
+        Invalid values are ignored rather than emptying the list, so a
+        typo in one parameter does not hide the effect of the others.
+        """
+        self.is_valid()
+        data = self.cleaned_data
+
+        if data.get("q"):
+            queryset = search.filter_tasks(queryset, data["q"])
+
+        if data.get("status") == "open":
+            queryset = queryset.filter(is_complete=False)
+        elif data.get("status") == "complete":
+            queryset = queryset.filter(is_complete=True)
+
+        if data.get("priority"):
+            queryset = queryset.filter(priority=data["priority"])
+        if data.get("type"):
+            queryset = queryset.filter(task_type=data["type"])
+        if data.get("assignee"):
+            queryset = queryset.filter(
+                assignees__username=data["assignee"]
+            )
+        if data.get("deadline_after"):
+            queryset = queryset.filter(deadline__gte=data["deadline_after"])
+        if data.get("deadline_before"):
+            queryset = queryset.filter(deadline__lt=data["deadline_before"])
+
+        return queryset
+
+
+class TaskBulkActionForm(forms.Form):
+    """Which tasks a bulk action applies to, and with what values."""
+
+    SCOPE_CHOICES = (
+        ("selected", "Selected tasks"),
+        ("filter", "All tasks matching the filter"),
+    )
+
+    action = forms.ChoiceField(choices=bulk.ACTIONS)
+    scope = forms.ChoiceField(choices=SCOPE_CHOICES, initial="selected")
+    ids = forms.CharField(required=False, widget=forms.MultipleHiddenInput)
+    priority = forms.ChoiceField(
+        choices=(("", "Priority"),) + Task.PRIORITY_CHOICES,
+        required=False,
+    )
+    task_type = forms.ModelChoiceField(
+        queryset=TaskType.objects.all(),
+        required=False,
+        empty_label="Type",
+    )
+    assignee = forms.CharField(required=False, label="Assignee username")
+
+    def clean_ids(self):
+        try:
+            return [int(pk) for pk in self.data.getlist("ids")]
+        except ValueError:
+            raise forms.ValidationError("Invalid task selection.")
+
+    def clean_assignee(self):
+        username = self.cleaned_data["assignee"].strip()
+        if not username:
+            return None
+        worker = User.objects.filter(username=username).only("id").first()
+        if worker is None:
+            raise forms.ValidationError(f"No worker named {username!r}.")
+        return worker
+
+    def clean(self):
+        cleaned_data = super().clean()
+        action = cleaned_data.get("action")
+        required = {
+            "priority": "priority",
+            "type": "task_type",
+            "reassign": "assignee",
+        }.get(action)
+        if required and not cleaned_data.get(required):
+            self.add_error(required, "This action needs a value.")
+        if cleaned_data.get("scope") == "selected" and not cleaned_data.get(
+            "ids"
+        ):
+            raise forms.ValidationError("Select at least one task.")
+        return cleaned_data
+
+    def get_targets(self, filter_form):
+        """The tasks to act on: the selection, or everything filtered."""
+        if self.cleaned_data["scope"] == "filter":
+            return filter_form.filter(Task.objects.all())
+        return Task.objects.filter(pk__in=self.cleaned_data["ids"])
+
+    def apply(self, filter_form):
+        return bulk.apply(
+            self.cleaned_data["action"],
+            self.get_targets(filter_form),
+            priority=self.cleaned_data["priority"],
+            task_type=self.cleaned_data["task_type"],
+            worker=self.cleaned_data["assignee"],
+        )
@@ -0,0 +1,237 @@
+"""A queue of background jobs, kept in the database.
+
+Work too slow for a request (a bulk edit over thousands of tasks,
+deleting a worker with thousands of assignments) is stored as a ``Job``
+with ``enqueue()``; the view answers at once and the user polls
+``JobStatusView``. ``manage.py run_jobs`` runs each job in a separate
+process by calling the handler registered for its name with
+``@handler``.
+
+SQLite has no ``SELECT ... FOR UPDATE``, so a job is claimed with a
+conditional ``UPDATE`` that matches only while the job is still
+claimable. The database applies writes one at a time, so of several
+workers going for the same job exactly one sees its row updated.
+
+A claim lasts ``JOB_VISIBILITY_TIMEOUT`` seconds, and a thread of the
+worker renews it every third of that while the handler runs: a job whose
+worker died becomes claimable again once its claim expires, while a slow
+one is never run twice at once. Each claim has its own lease, and the
+outcome is recorded only while that lease holds, so a worker that lost
+its claim (stalled past it) cannot overwrite the next attempt.
+
+Finished jobs are kept for their status page until ``manage.py
+purge_jobs`` deletes them.
+
+A job that raises is queued again ``JOB_RETRY_DELAY * 2 ** (attempts -
+1)`` seconds later, and fails after ``max_attempts`` runs. ``JobError``
+fails it straight away, for errors a retry would not fix.
+"""
+import logging
+import threading
+import time
+import traceback
+import uuid
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, connections
+from django.db.models import F, Q
+from django.http import QueryDict
+from django.utils import timezone
+
+from .forms import TaskBulkActionForm, TaskFilterForm
+from .models import Job, Worker
+
+logger = logging.getLogger("app.jobs")
+
+HANDLERS = {}
+
+# Due jobs a worker tries in turn when others claim the first ones.
+CLAIM_CANDIDATES = 10
+
+
+class JobError(Exception):
+    """A job failure that retrying would not fix."""
+
+
+def handler(name):
+    """Register the decorated function as the handler of ``name`` jobs."""
+    def register(func):
+        HANDLERS[name] = func
+        return func
+    return register
+
+
+def enqueue(name, created_by=None, **kwargs):
+    """Queue a ``name`` job; its handler gets ``kwargs``, which must be
+    JSON-serialisable."""
+    if name not in HANDLERS:
+        raise ValueError(f"Unknown job {name!r}")
+    return Job.objects.create(
+        name=name,
+        kwargs=kwargs,
+        created_by=created_by,
+        run_after=timezone.now(),
+        max_attempts=settings.JOB_MAX_ATTEMPTS,
+    )
+
+
+def claimable(now):
+    return Q(status=Job.QUEUED, run_after__lte=now) | Q(
+        status=Job.RUNNING,
+        locked_until__lt=now,
+        attempts__lt=F("max_attempts"),
+    )
+
+
+def fail_expired(now):
+    """Fail the jobs whose last allowed attempt ran out of time."""
+    return Job.objects.filter(
+        status=Job.RUNNING,
+        locked_until__lt=now,
+        attempts__gte=F("max_attempts"),
+    ).update(
+        status=Job.FAILED,
+        error="Timed out.",
+        lease="",
+        locked_until=None,
+        finished_at=now,
+    )
+
+
+def lock_expiry(now):
+    return now + timedelta(seconds=settings.JOB_VISIBILITY_TIMEOUT)
+
+
+def claim():
+    """Claim the next due job and return it, or ``None`` if none is due."""
+    now = timezone.now()
+    fail_expired(now)
+    candidates = Job.objects.filter(claimable(now)).order_by(
+        "run_after", "pk"
+    ).values_list("pk", flat=True)[:CLAIM_CANDIDATES]
+    for pk in candidates:
+        lease = uuid.uuid4().hex
+        claimed = Job.objects.filter(claimable(now), pk=pk).update(
+            status=Job.RUNNING,
+            attempts=F("attempts") + 1,
+            lease=lease,
+            locked_until=lock_expiry(now),
+        )
+        if claimed:
+            return Job.objects.get(pk=pk)
+    return None
+
+
+def renew(job):
+    """Extend the claim on ``job``; return whether it still held."""
+    return Job.objects.filter(
+        pk=job.pk, lease=job.lease, status=Job.RUNNING
+    ).update(locked_until=lock_expiry(timezone.now())) == 1
+
+
+@contextmanager
+def heartbeat(job):
+    """Keep renewing the claim on ``job`` while the block runs."""
+    stop = threading.Event()
+
+    def beat():
+        try:
+            while not stop.wait(settings.JOB_VISIBILITY_TIMEOUT / 3):
+                try:
+                    if not renew(job):
+                        logger.warning("Lost the claim on job %s", job)
+                        return
+                except DatabaseError:
+                    # The handler may hold the write lock; try next time.
+                    logger.exception("Could not renew the claim on %s", job)
+        finally:
+            # This thread's own connection.
+            connections.close_all()
+
+    thread = threading.Thread(target=beat, name=f"job-{job.pk}-heartbeat")
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def finish(job, **fields):
+    """Record the outcome of ``job``, unless its claim was lost."""
+    return Job.objects.filter(pk=job.pk, lease=job.lease).update(
+        lease="", locked_until=None, **fields
+    )
+
+
+def run(job):
+    """Run a claimed ``job`` and record how it went."""
+    try:
+        with heartbeat(job):
+            result = HANDLERS[job.name](**job.kwargs)
+    except Exception as e:
+        logger.exception("Job %s failed", job)
+        now = timezone.now()
+        if isinstance(e, JobError) or job.attempts >= job.max_attempts:
+            fields = {"status": Job.FAILED, "finished_at": now}
+        else:
+            delay = settings.JOB_RETRY_DELAY * 2 ** (job.attempts - 1)
+            fields = {
+                "status": Job.QUEUED,
+                "run_after": now + timedelta(seconds=delay),
+            }
+        finish(job, error=traceback.format_exc(), **fields)
+    else:
+        finish(
+            job,
+            status=Job.DONE,
+            result=result,
+            error="",
+            finished_at=timezone.now(),
+        )
+
+
+def work(stop, burst=False, poll_interval=1.0):
+    """Run jobs until the ``stop`` event is set or, with ``burst``, until
+    none is due; return how many ran."""
+    ran = 0
+    while not stop.is_set():
+        # Like a request, each job starts with a usable connection.
+        close_old_connections()
+        job = claim()
+        if job is None:
+            if burst:
+                break
+            stop.wait(poll_interval)
+            continue
+        started = time.perf_counter()
+        run(job)
+        ran += 1
+        logger.info(
+            "Ran %s job #%s in %.0f ms",
+            job.name, job.pk, (time.perf_counter() - started) * 1000,
+        )
+    close_old_connections()
+    return ran
+
+
+@handler("bulk_action")
+def bulk_action(data, query):
+    """Apply a ``TaskBulkActionForm`` submission (``data``) with the task
+    list's filters (``query``), both urlencoded."""
+    form = TaskBulkActionForm(QueryDict(data))
+    if not form.is_valid():
+        raise JobError(form.errors.as_text())
+    count = form.apply(TaskFilterForm(QueryDict(query)))
+    return {"action": form.cleaned_data["action"], "count": count}
+
+
+@handler("delete_worker")
+def delete_worker(pk):
+    worker = Worker.objects.filter(pk=pk).first()
+    if worker is None:
+        raise JobError(f"No worker with id {pk}.")
+    worker.delete()
+    return {"deleted": worker.username}
@@ -0,0 +1,293 @@
+"""Live updates of open task lists, over Server-Sent Events.
+
+A task list open in a browser connects to ``/tasks/live/`` with the ids
+of the tasks it shows and the change feed cursor it was rendered at (see
+``app.changes``). The stream then sends:
+
+``updated``, ``completed``
+    ``{"id": ..., "html": ...}`` when a shown task changes; ``html`` is
+    its new row, which replaces the old one. ``completed`` is an update
+    that marks the task complete.
+``deleted``
+    ``{"id": ...}`` when a shown task is deleted or archived.
+``created``
+    ``{"count": ...}`` for tasks created since; the list may not show
+    them where they belong without reloading, so it only says so.
+``reload``
+    when the stream cannot bring the list up to date: it fell too far
+    behind. The stream ends.
+
+Connections do not poll the database. One ``Broadcaster`` per process
+reads the feed every ``LIVE_POLL_INTERVAL`` seconds, renders each
+changed row once (through ``app.row_cache``) and hands every connection
+the events of the tasks it shows. An idle connection costs a queue and a
+coroutine waiting on it, so a process holds thousands of them; that
+needs an ASGI server, where they are not a thread each.
+
+Every batch of events ends with an ``id:`` line holding the cursor, as
+do the keep-alives, so a browser that reconnects (sending
+``Last-Event-ID``) resumes where it left off: the entries it missed are
+read for its own tasks alone.
+"""
+import asyncio
+import bisect
+import contextvars
+import json
+import logging
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+
+from . import changes, row_cache
+from .models import Change, Task
+
+logger = logging.getLogger("app.live")
+
+# Feed entries read per poll; a bigger backlog takes several.
+BATCH_SIZE = 1000
+# A reconnecting list further behind than this many entries reloads.
+CATCH_UP_LIMIT = 10_000
+# Batches a connection may fall behind before it is told to reload.
+QUEUE_SIZE = 100
+# Rows a list may ask to follow: more than a page never shows.
+MAX_IDS = 100
+# How long a browser waits before reconnecting, in milliseconds.
+RETRY_MS = 3000
+
+RELOAD = "event: reload\ndata: {}\n\n"
+
+
+def event(name, data):
+    return f"event: {name}\ndata: {json.dumps(data)}\n\n"
+
+
+def cursor_line(cursor):
+    # An event with an id and no data only moves the browser's
+    # Last-Event-ID: it is not dispatched.
+    return f"id: {cursor}\n\n"
+
+
+class Batch:
+    """The events of a run of feed entries, up to ``cursor``.
+
+    ``events`` maps a task id to the entry id of its last change and the
+    event for it; only tasks some connection shows are in it.
+    """
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+        self.created = []
+        self.events = {}
+        # Whether more entries were left to read.
+        self.full = False
+
+    def chunk_for(self, subscriber):
+        """The part of the batch ``subscriber`` has not seen yet."""
+        if not self.events and not self.created:
+            return ""
+        after = subscriber.cursor
+        shown = sorted(
+            self.events[pk] for pk in subscriber.ids if pk in self.events
+        )
+        parts = [chunk for pk, chunk in shown if pk > after]
+        created = len(self.created) - bisect.bisect(self.created, after)
+        if created:
+            parts.append(event("created", {"count": created}))
+        if parts:
+            parts.append(cursor_line(self.cursor))
+        return "".join(parts)
+
+
+def read_batch(after, watched, upto=None, limit=BATCH_SIZE):
+    """The events of the task entries after cursor ``after`` (and up to
+    ``upto``), for the tasks in ``watched``."""
+    entries = Change.objects.filter(model=Change.TASK, pk__gt=after)
+    if upto is not None:
+        entries = entries.filter(pk__lte=upto)
+    entries = list(
+        entries.order_by("pk").values_list(
+            "pk", "object_id", "action", "data"
+        )[:limit]
+    )
+
+    batch = Batch(entries[-1][0] if entries else after)
+    last, deleted, completed = {}, set(), set()
+    for pk, object_id, action, data in entries:
+        if action == Change.CREATED:
+            batch.created.append(pk)
+        if object_id not in watched:
+            continue
+        last[object_id] = pk
+        if action == Change.DELETED:
+            deleted.add(object_id)
+        elif data and data.get("is_complete") is True:
+            completed.add(object_id)
+
+    # A task changed several times is sent once, as it is now.
+    tasks = row_cache.with_row_data(
+        Task.objects.filter(pk__in=last.keys() - deleted)
+    )
+    tasks = list(tasks)
+    for task, html in zip(tasks, row_cache.rendered_rows(tasks)):
+        name = (
+            "completed"
+            if task.pk in completed and task.is_complete
+            else "updated"
+        )
+        batch.events[task.pk] = (
+            last[task.pk], event(name, {"id": task.pk, "html": html})
+        )
+    # Tasks gone by the time their rows are read were deleted since.
+    for pk in last.keys() - batch.events.keys():
+        batch.events[pk] = (last[pk], event("deleted", {"id": pk}))
+    batch.full = len(entries) == limit
+    return batch
+
+
+def catch_up(since, upto, ids):
+    """The batch bringing a list at cursor ``since`` up to ``upto``, or
+    ``None`` if it must reload."""
+    if since < changes.oldest_cursor() or upto - since > CATCH_UP_LIMIT:
+        return None
+    return read_batch(since, ids, upto=upto, limit=CATCH_UP_LIMIT)
+
+
+class Subscriber:
+    """One open task list: the tasks it shows and how far it has got."""
+
+    def __init__(self, ids, cursor):
+        self.ids = frozenset(ids)
+        self.cursor = cursor
+        self.queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+
+    def send(self, batch):
+        chunk = batch.chunk_for(self)
+        if not chunk:
+            return True
+        try:
+            self.queue.put_nowait(chunk)
+        except asyncio.QueueFull:
+            return False
+        return True
+
+
+class Broadcaster:
+    """Reads the change feed for all the connections of this process.
+
+    It runs while anyone is connected, from the cursor the feed was at
+    when the first of them arrived. Its reads go through a thread of its
+    own, which keeps one database connection for them.
+    """
+
+    def __init__(self):
+        self.subscribers = set()
+        self.watched = Counter()
+        self.cursor = None
+        self.task = None
+        self.executor = ThreadPoolExecutor(1, thread_name_prefix="live")
+
+    @property
+    def running(self):
+        return self.task is not None
+
+    def subscribe(self, subscriber, latest):
+        """Add ``subscriber``; return the cursor from which the broadcaster
+        sends it batches. ``latest`` is where to start if idle."""
+        self.subscribers.add(subscriber)
+        self.watched.update(subscriber.ids)
+        if self.task is None:
+            self.cursor = latest
+            # A fresh context: the request's (its profile, its thread for
+            # sync calls) ends before the broadcaster does.
+            self.task = asyncio.create_task(
+                self.run(), context=contextvars.Context()
+            )
+        return self.cursor
+
+    def unsubscribe(self, subscriber):
+        if subscriber not in self.subscribers:
+            return
+        self.subscribers.discard(subscriber)
+        self.watched.subtract(subscriber.ids)
+        for pk in subscriber.ids:
+            if self.watched[pk] <= 0:
+                del self.watched[pk]
+
+    def read(self, after):
+        close_old_connections()
+        return read_batch(after, self.watched)
+
+    async def poll(self):
+        """Read the next batch and hand it out; return whether more
+        entries are waiting."""
+        batch = await asyncio.get_running_loop().run_in_executor(
+            self.executor, self.read, self.cursor
+        )
+        for subscriber in list(self.subscribers):
+            if not subscriber.send(batch):
+                # Too far behind to catch up in memory.
+                self.unsubscribe(subscriber)
+                subscriber.queue = reload_queue()
+        self.cursor = batch.cursor
+        return batch.full
+
+    async def run(self):
+        try:
+            while self.subscribers:
+                try:
+                    more = await self.poll()
+                except Exception:
+                    logger.exception("Reading the change feed failed")
+                    more = False
+                if not more:
+                    await asyncio.sleep(settings.LIVE_POLL_INTERVAL)
+        finally:
+            self.task = None
+
+
+def reload_queue():
+    queue = asyncio.Queue()
+    queue.put_nowait(RELOAD)
+    return queue
+
+
+broadcaster = Broadcaster()
+
+
+async def stream(ids, since=None):
+    """The event stream of a task list showing ``ids``, rendered at cursor
+    ``since`` (now, if ``None``)."""
+    yield f"retry: {RETRY_MS}\n\n"
+    latest = None
+    if since is None or not broadcaster.running:
+        latest = await sync_to_async(changes.latest_cursor)()
+    if since is None:
+        since = latest
+
+    subscriber = Subscriber(list(ids)[:MAX_IDS], since)
+    upto = broadcaster.subscribe(subscriber, latest)
+    try:
+        if since < upto:
+            batch = await sync_to_async(catch_up)(since, upto, subscriber.ids)
+            if batch is None:
+                yield RELOAD
+                return
+            yield batch.chunk_for(subscriber) or cursor_line(upto)
+            subscriber.cursor = upto
+
+        while True:
+            try:
+                chunk = await asyncio.wait_for(
+                    subscriber.queue.get(), settings.LIVE_HEARTBEAT
+                )
+            except TimeoutError:
+                # Everything up to the broadcaster's cursor has been sent.
+                chunk = cursor_line(max(subscriber.cursor, broadcaster.cursor))
+            yield chunk
+            if chunk is RELOAD:
+                return
+    finally:
+        broadcaster.unsubscribe(subscriber)
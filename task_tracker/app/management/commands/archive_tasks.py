@@ -0,0 +1,50 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app import archive
+
+
+class Command(BaseCommand):
+    help = (
+        "Move completed tasks unchanged for --older-than days from the "
+        "task table into the archive, --batch-size tasks per transaction. "
+        "Archived tasks keep their pages and can be included in search and "
+        "export."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than", type=int, required=True, metavar="DAYS",
+            help="Archive tasks completed and unchanged for this many days.",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=archive.BATCH_SIZE,
+        )
+        parser.add_argument(
+            "--pause", type=float, default=0.0,
+            help="Seconds to wait between batches, to let other writers in.",
+        )
+
+    def handle(self, *args, **options):
+        if options["older_than"] < 0:
+            raise CommandError("--older-than cannot be negative.")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        started = time.perf_counter()
+        total = 0
+        batches = archive.archive_tasks(
+            timedelta(days=options["older_than"]), options["batch_size"]
+        )
+        for moved in batches:
+            total += moved
+            self.stdout.write(f"Archived {total} tasks...")
+            if options["pause"]:
+                time.sleep(options["pause"])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {total} tasks in "
+            f"{time.perf_counter() - started:.1f} s."
+        ))
@@ -0,0 +1,117 @@
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient, override_settings
+from django.urls import reverse
+
+from app.models import Task, Worker
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare requests per second of the sync and async read views "
+        "under the same concurrency, against the configured database. "
+        "Each mode runs in its own process through Django's ASGI handler."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=1000)
+        parser.add_argument("--concurrency", type=int, default=50)
+        parser.add_argument(
+            "--child",
+            action="store_true",
+            help="Run one mode in this process and print JSON (internal).",
+        )
+
+    def handle(self, *args, **options):
+        if options["child"]:
+            # The in-process client sends Host: testserver.
+            hosts = [*settings.ALLOWED_HOSTS, "testserver"]
+            with override_settings(ALLOWED_HOSTS=hosts):
+                result = asyncio.run(
+                    self.run(options["requests"], options["concurrency"])
+                )
+            self.stdout.write(json.dumps(result))
+            return
+
+        results = {}
+        for mode, flag in (("sync", "0"), ("async", "1")):
+            proc = subprocess.run(
+                [
+                    sys.executable, sys.argv[0], "bench_read_views", "--child",
+                    "--requests", str(options["requests"]),
+                    "--concurrency", str(options["concurrency"]),
+                ],
+                env={**os.environ, "ASYNC_READ_VIEWS": flag},
+                capture_output=True,
+                text=True,
+            )
+            if proc.returncode:
+                raise CommandError(proc.stderr)
+            results[mode] = json.loads(proc.stdout.splitlines()[-1])
+
+        self.stdout.write(
+            f"{options['requests']} requests, "
+            f"concurrency {options['concurrency']}"
+        )
+        self.stdout.write(
+            f"{'mode':<6} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} "
+            f"{'errors':>7}"
+        )
+        for mode, result in results.items():
+            self.stdout.write(
+                f"{mode:<6} {result['rps']:>9.1f} {result['p50_ms']:>9.1f} "
+                f"{result['p95_ms']:>9.1f} {result['errors']:>7}"
+            )
+
+    async def get_paths(self):
+        task = await Task.objects.order_by("pk").afirst()
+        worker = await Worker.objects.order_by("pk").afirst()
+        if task is None or worker is None:
+            raise CommandError(
+                "The benchmark needs at least one task and one worker."
+            )
+        return worker, [
+            reverse("app:index"),
+            reverse("app:tasks"),
+            reverse("app:tasks-detail", kwargs={"pk": task.pk}),
+            reverse("app:workers"),
+            reverse("app:workers-detail", kwargs={"pk": worker.pk}),
+        ]
+
+    async def run(self, total, concurrency):
+        worker, paths = await self.get_paths()
+        client = AsyncClient()
+        await client.aforce_login(worker)
+
+        latencies = []
+        errors = 0
+        remaining = iter(range(total))
+
+        async def hammer():
+            nonlocal errors
+            for i in remaining:
+                started = time.perf_counter()
+                response = await client.get(paths[i % len(paths)])
+                latencies.append(time.perf_counter() - started)
+                errors += response.status_code != 200
+
+        started = time.perf_counter()
+        await asyncio.gather(*(hammer() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+        quantiles = statistics.quantiles(latencies, n=20)
+        return {
+            "async": settings.ASYNC_READ_VIEWS,
+            "rps": total / elapsed,
+            "p50_ms": statistics.median(latencies) * 1000,
+            "p95_ms": quantiles[18] * 1000,
+            "errors": errors,
+        }
@@ -0,0 +1,223 @@
+import json
+import platform
+import statistics
+import time
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, reverse
+
+from app import urls
+from app.models import Task, Worker
+
+# Query strings for routes that do nothing useful without one.
+QUERIES = {
+    "tasks-search": {"q": "report"},
+    "workers-autocomplete": {"q": "perf00"},
+}
+
+# Routes about objects that seed_perf_data does not create, and the live
+# stream, which never ends.
+SKIPPED = {"jobs-detail", "tasks-live"}
+
+# Extra variants of the busiest page.
+SCENARIOS = {
+    "tasks?status=open&priority=HIGH": (
+        "tasks", {"status": "open", "priority": "HIGH"}
+    ),
+    "tasks?ordering=-deadline": ("tasks", {"ordering": "-deadline"}),
+}
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Request every GET route of the app through the test client and "
+        "record p50/p95 latency, query count and response size per route "
+        "as JSON. With --compare, check the results against a saved "
+        "baseline and fail if any route's median got slower than "
+        "--threshold or it runs more queries. Seed data first "
+        "(seed_perf_data)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=20)
+        parser.add_argument("--warmup", type=int, default=2)
+        parser.add_argument(
+            "--output", help="Write the results to this JSON file."
+        )
+        parser.add_argument(
+            "--compare", help="Baseline JSON file to check against."
+        )
+        parser.add_argument(
+            "--threshold", type=float, default=0.25,
+            help="Allowed p50 slowdown as a fraction (default 0.25).",
+        )
+        parser.add_argument(
+            "--min-delta-ms", type=float, default=5.0,
+            help="Ignore slowdowns smaller than this many milliseconds.",
+        )
+        parser.add_argument(
+            "--routes", nargs="*",
+            help="Only run these route (or scenario) names.",
+        )
+
+    def handle(self, *args, **options):
+        task = Task.objects.order_by("pk").first()
+        worker = Worker.objects.order_by("pk").first()
+        if task is None or worker is None:
+            raise CommandError(
+                "The benchmark needs at least one task and one worker; "
+                "run seed_perf_data first."
+            )
+
+        targets = self.get_targets(task, worker)
+        if options["routes"]:
+            targets = {
+                name: target for name, target in targets.items()
+                if name in options["routes"]
+            }
+
+        # The test client sends Host: testserver.
+        hosts = [*settings.ALLOWED_HOSTS, "testserver"]
+        with override_settings(ALLOWED_HOSTS=hosts):
+            client = Client()
+            client.force_login(worker)
+            routes = {
+                name: self.measure(client, target, options)
+                for name, target in targets.items()
+            }
+
+        results = {
+            "meta": {
+                "tasks": Task.objects.count(),
+                "workers": Worker.objects.count(),
+                "requests": options["requests"],
+                "database": connection.vendor,
+                "django": django.get_version(),
+                "python": platform.python_version(),
+            },
+            "routes": routes,
+        }
+        self.print_table(routes)
+
+        if options["output"]:
+            Path(options["output"]).write_text(
+                json.dumps(results, indent=2) + "\n"
+            )
+            self.stdout.write(f"Wrote {options['output']}")
+
+        if options["compare"]:
+            baseline = json.loads(Path(options["compare"]).read_text())
+            regressions = self.compare(baseline["routes"], routes, options)
+            if regressions:
+                raise CommandError(
+                    "Regressions against the baseline:\n"
+                    + "\n".join(regressions)
+                )
+            self.stdout.write(self.style.SUCCESS(
+                "No regressions against the baseline."
+            ))
+
+    def get_targets(self, task, worker):
+        """Route name -> (path, query) for each GET route in app.urls."""
+        targets = {}
+        for pattern in urls.urlpatterns:
+            if not isinstance(pattern, URLPattern):
+                continue
+            view_class = getattr(pattern.callback, "view_class", None)
+            if view_class is not None and not hasattr(view_class, "get"):
+                continue
+            if pattern.name in SKIPPED:
+                continue
+
+            kwargs = {}
+            if "pk" in pattern.pattern.converters:
+                kwargs["pk"] = (
+                    worker.pk if pattern.name.startswith("workers")
+                    else task.pk
+                )
+            targets[pattern.name] = (
+                reverse(f"{urls.app_name}:{pattern.name}", kwargs=kwargs),
+                QUERIES.get(pattern.name, {}),
+            )
+        for name, (route, query) in SCENARIOS.items():
+            targets[name] = (reverse(f"{urls.app_name}:{route}"), query)
+        return targets
+
+    def measure(self, client, target, options):
+        path, query = target
+        for _ in range(options["warmup"]):
+            self.fetch(client, path, query)
+
+        latencies = []
+        for _ in range(options["requests"]):
+            started = time.perf_counter()
+            response, size = self.fetch(client, path, query)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+        # Counted separately: capturing queries slows them down.
+        with CaptureQueriesContext(connection) as queries:
+            self.fetch(client, path, query)
+
+        return {
+            "path": path,
+            "query": query,
+            "status": response.status_code,
+            "p50_ms": round(statistics.median(latencies), 2),
+            "p95_ms": round(percentile(latencies, 95), 2),
+            "queries": len(queries),
+            "bytes": size,
+        }
+
+    def fetch(self, client, path, query):
+        response = client.get(path, query)
+        if response.streaming:
+            size = sum(len(chunk) for chunk in response.streaming_content)
+        else:
+            size = len(response.content)
+        return response, size
+
+    def compare(self, baseline, routes, options):
+        regressions = []
+        for name, result in routes.items():
+            before = baseline.get(name)
+            if before is None:
+                continue
+            # The median: with a few dozen requests p95 is one outlier.
+            slower = result["p50_ms"] - before["p50_ms"]
+            if (
+                slower > options["min_delta_ms"]
+                and slower > before["p50_ms"] * options["threshold"]
+            ):
+                regressions.append(
+                    f"  {name}: p50 {before['p50_ms']} -> "
+                    f"{result['p50_ms']} ms"
+                )
+            if result["queries"] > before["queries"]:
+                regressions.append(
+                    f"  {name}: {before['queries']} -> "
+                    f"{result['queries']} queries"
+                )
+        return regressions
+
+    def print_table(self, routes):
+        width = max(len(name) for name in routes) if routes else 5
+        self.stdout.write(
+            f"{'route':<{width}} {'status':>6} {'p50 ms':>8} {'p95 ms':>8} "
+            f"{'queries':>7} {'bytes':>10}"
+        )
+        for name, r in routes.items():
+            self.stdout.write(
+                f"{name:<{width}} {r['status']:>6} {r['p50_ms']:>8.1f} "
+                f"{r['p95_ms']:>8.1f} {r['queries']:>7} {r['bytes']:>10}"
+            )
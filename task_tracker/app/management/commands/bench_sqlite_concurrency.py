@@ -0,0 +1,210 @@
+import multiprocessing
+import queue
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import (
+    DEFAULT_DB_ALIAS,
+    OperationalError,
+    close_old_connections,
+    connection,
+    connections,
+    transaction,
+)
+from django.test import override_settings
+
+from app import replica
+from app.models import Task
+
+# name -> (database settings, pragmas, reads go to a replica copy)
+PROFILES = {
+    # Django's defaults: rollback journal, a connection per request.
+    "default": (
+        {"CONN_MAX_AGE": 0, "CONN_HEALTH_CHECKS": False, "OPTIONS": {}},
+        {"journal_mode": "DELETE"},
+        False,
+    ),
+    "production": (
+        settings.PRODUCTION_DATABASE,
+        settings.PRODUCTION_SQLITE_PRAGMAS,
+        False,
+    ),
+    "replica": (
+        settings.PRODUCTION_DATABASE,
+        settings.PRODUCTION_SQLITE_PRAGMAS,
+        True,
+    ),
+}
+PRIORITIES = ("HIGH", "MEDIUM", "LOW")
+
+
+def read(rng, task_ids):
+    """A page of the task list and its count."""
+    offset = rng.randrange(max(len(task_ids) - 20, 1))
+    list(
+        Task.objects.select_related("task_type")
+        .prefetch_related("assignees")
+        .order_by("-deadline")[offset:offset + 20]
+    )
+    Task.objects.filter(is_complete=False).count()
+
+
+def write(rng, task_ids):
+    """Edit one task the way the update view does: read, then save."""
+    with transaction.atomic():
+        task = Task.objects.get(pk=rng.choice(task_ids))
+        task.priority = rng.choice(PRIORITIES)
+        task.save()
+
+
+def run_worker(profile, paths, seed, task_ids, write_ratio, until, results):
+    database, pragmas, use_replica = PROFILES[profile]
+    # Leave the connection inherited from the parent alone (SQLite
+    # connections must not be used across a fork) and open our own to
+    # the scratch copies.
+    inherited = connections[DEFAULT_DB_ALIAS]
+    aliases = (DEFAULT_DB_ALIAS, replica.REPLICA)[:len(paths)]
+    for alias, path in zip(aliases, paths):
+        settings_dict = {
+            **inherited.settings_dict, **database, "NAME": str(path)
+        }
+        settings.DATABASES[alias] = settings_dict
+        connections[alias] = inherited.__class__(settings_dict, alias)
+
+    rng = random.Random(seed)
+    reads = writes = locked = 0
+    latencies = []
+    with override_settings(SQLITE_PRAGMAS=pragmas):
+        while time.monotonic() < until:
+            # Each operation stands for one request: with CONN_MAX_AGE = 0
+            # the connection is closed and reopened between them.
+            close_old_connections()
+            operation = write if rng.random() < write_ratio else read
+            started = time.perf_counter()
+            try:
+                if operation is read and use_replica:
+                    with replica.use_replica():
+                        read(rng, task_ids)
+                else:
+                    operation(rng, task_ids)
+            except OperationalError as e:
+                if "locked" not in str(e):
+                    raise
+                locked += 1
+                continue
+            latencies.append((time.perf_counter() - started) * 1000)
+            if operation is write:
+                writes += 1
+            else:
+                reads += 1
+        for alias in aliases:
+            connections[alias].close()
+    results.put((reads, writes, locked, latencies))
+
+
+class Command(BaseCommand):
+    help = (
+        "Run mixed read/write load from several processes against scratch "
+        "copies of the database, once with Django's default SQLite "
+        "settings and once with the production profile (DATABASE_PROFILE), "
+        "and compare throughput, latency and \"database is locked\" errors. "
+        "The replica profile is production with the reads sent to a "
+        "second copy (REPLICA_DATABASE)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--processes", type=int, default=4)
+        parser.add_argument("--seconds", type=float, default=5.0)
+        parser.add_argument(
+            "--write-ratio", type=float, default=0.2,
+            help="Fraction of operations that write (default 0.2).",
+        )
+        parser.add_argument(
+            "--profiles", nargs="*", choices=sorted(PROFILES),
+            default=list(PROFILES),
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("This benchmark is for SQLite databases.")
+        task_ids = list(Task.objects.values_list("pk", flat=True))
+        if not task_ids:
+            raise CommandError("No tasks to work on; run seed_perf_data.")
+
+        self.stdout.write(
+            f"{options['processes']} processes, {options['seconds']} s, "
+            f"{options['write_ratio']:.0%} writes, {len(task_ids)} tasks"
+        )
+        self.stdout.write(
+            f"{'profile':<11} {'ops/s':>8} {'reads/s':>8} {'writes/s':>8} "
+            f"{'locked':>6} {'p50 ms':>7} {'p95 ms':>7}"
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            for name in options["profiles"]:
+                paths = [Path(tmp) / f"{name}.sqlite3"]
+                if PROFILES[name][2]:
+                    paths.append(Path(tmp) / f"{name}-replica.sqlite3")
+                for path in paths:
+                    self.copy_database(path)
+                result = self.run_profile(name, paths, task_ids, options)
+                self.stdout.write(
+                    f"{name:<11} {result['ops']:>8.1f} "
+                    f"{result['reads']:>8.1f} {result['writes']:>8.1f} "
+                    f"{result['locked']:>6} {result['p50_ms']:>7.1f} "
+                    f"{result['p95_ms']:>7.1f}"
+                )
+
+    def copy_database(self, path):
+        # A backup never finishes while our own write is pending.
+        if connection.in_atomic_block:
+            raise CommandError("Cannot copy the database in a transaction.")
+        connection.ensure_connection()
+        target = sqlite3.connect(path)
+        try:
+            connection.connection.backup(target)
+        finally:
+            target.close()
+
+    def run_profile(self, name, paths, task_ids, options):
+        context = multiprocessing.get_context("fork")
+        results = context.Queue()
+        until = time.monotonic() + options["seconds"]
+        workers = [
+            context.Process(target=run_worker, args=(
+                name, paths, seed, task_ids, options["write_ratio"], until,
+                results,
+            ))
+            for seed in range(options["processes"])
+        ]
+        for worker in workers:
+            worker.start()
+        try:
+            # A worker that crashed never reports; don't wait forever.
+            totals = [
+                results.get(timeout=options["seconds"] + 60) for _ in workers
+            ]
+        except queue.Empty:
+            raise CommandError(f"A worker of the {name} profile failed.")
+        for worker in workers:
+            worker.join()
+
+        reads = sum(t[0] for t in totals)
+        writes = sum(t[1] for t in totals)
+        latencies = sorted(ms for t in totals for ms in t[3])
+        seconds = options["seconds"]
+        return {
+            "ops": (reads + writes) / seconds,
+            "reads": reads / seconds,
+            "writes": writes / seconds,
+            "locked": sum(t[2] for t in totals),
+            "p50_ms": statistics.median(latencies) if latencies else 0,
+            "p95_ms": (
+                latencies[int(len(latencies) * 0.95)] if latencies else 0
+            ),
+        }
@@ -0,0 +1,56 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+
+from app import row_cache
+from app.models import Worker
+from app.views import TasksView
+
+
+class Command(BaseCommand):
+    help = (
+        "Time rendering one page of the task list with the row cache "
+        "cold (emptied before each render) and warm. The page is fetched "
+        "once; only the template rendering is timed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=500)
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        user = Worker.objects.order_by("pk").first()
+        if user is None:
+            raise CommandError("The benchmark needs at least one worker.")
+
+        request = RequestFactory().get("/tasks/")
+        request.user = user
+        view = TasksView.as_view(paginate_by=options["rows"])
+        rows = len(view(request).context_data["object_list"])
+
+        cache = row_cache.get_cache()
+        results = {}
+        for mode in ("cold", "warm"):
+            timings = []
+            for _ in range(options["repeat"]):
+                # A fresh response each time: render() only runs once.
+                response = view(request)
+                if mode == "cold":
+                    cache.clear()
+                started = time.perf_counter()
+                response.render()
+                timings.append(time.perf_counter() - started)
+            results[mode] = timings
+
+        self.stdout.write(
+            f"{rows} rows, {options['repeat']} renders each, "
+            f"{type(cache).__name__}"
+        )
+        self.stdout.write(f"{'cache':<6} {'median ms':>10} {'min ms':>8}")
+        for mode, timings in results.items():
+            self.stdout.write(
+                f"{mode:<6} {statistics.median(timings) * 1000:>10.1f} "
+                f"{min(timings) * 1000:>8.1f}"
+            )
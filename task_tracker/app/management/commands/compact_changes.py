@@ -0,0 +1,50 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max
+from django.utils import timezone
+
+from app import changes
+from app.models import Change
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete change feed entries older than --older-than days, "
+        "--batch-size at a time. The newest entry is always kept, so the "
+        "feed can tell clients whose cursor is too old to continue."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than", type=int, default=30, metavar="DAYS",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        if options["older_than"] < 0:
+            raise CommandError("--older-than cannot be negative.")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        cutoff = timezone.now() - timedelta(days=options["older_than"])
+        # Ids grow with time: delete by id range, which the primary key
+        # serves, up to the last entry old enough.
+        last = Change.objects.filter(created_at__lt=cutoff).aggregate(
+            last=Max("pk")
+        )["last"]
+        last = min(last or 0, changes.latest_cursor() - 1)
+
+        deleted = 0
+        start = changes.oldest_cursor()
+        while start < last:
+            end = min(start + options["batch_size"], last)
+            deleted += Change.objects.filter(
+                pk__gt=start, pk__lte=end
+            ).delete()[0]
+            start = end
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {deleted} changes; the feed now starts after "
+            f"{changes.oldest_cursor()}."
+        ))
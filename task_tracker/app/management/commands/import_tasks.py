@@ -0,0 +1,182 @@
+import csv
+import json
+from itertools import islice
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from app import changes, counters
+from app.models import Change, Task, TaskType, Worker
+
+Assignment = Task.assignees.through
+
+PRIORITIES = {value for value, _ in Task.PRIORITY_CHOICES}
+TRUE_VALUES = {"1", "true", "yes", "y"}
+
+
+class RowError(ValueError):
+    pass
+
+
+def read_csv(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            assignees = row.get("assignees") or ""
+            row["assignees"] = [
+                name.strip() for name in assignees.split(";") if name.strip()
+            ]
+            yield row
+
+
+def read_jsonl(path):
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+READERS = {"csv": read_csv, "jsonl": read_jsonl, "ndjson": read_jsonl}
+
+
+def parse_deadline(value):
+    value = str(value or "").strip()
+    try:
+        deadline = parse_datetime(value)
+        if deadline is None and parse_date(value) is not None:
+            deadline = parse_datetime(f"{value}T00:00:00")
+    except ValueError:
+        # Well formed, but no such date (say 2024-02-30).
+        deadline = None
+    if deadline is None:
+        raise RowError(f"invalid deadline {value!r}")
+    if timezone.is_naive(deadline):
+        deadline = timezone.make_aware(deadline)
+    return deadline
+
+
+def parse_bool(value):
+    if isinstance(value, bool):
+        return value
+    return str(value or "").strip().lower() in TRUE_VALUES
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-import tasks from a CSV or JSON Lines file (the columns of "
+        "the task export). Task types are created as needed; assignees "
+        "are matched by username. Each batch is inserted in one "
+        "transaction with bulk_create."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument(
+            "--format",
+            choices=sorted(READERS),
+            help="Input format; defaults to the file extension.",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        path = Path(options["path"])
+        file_format = options["format"] or path.suffix.lstrip(".").lower()
+        if file_format not in READERS:
+            raise CommandError(
+                f"Cannot tell the format of {path}; pass --format."
+            )
+        if not path.exists():
+            raise CommandError(f"{path} does not exist.")
+
+        self.task_types = dict(TaskType.objects.values_list("name", "id"))
+        self.workers = dict(Worker.objects.values_list("username", "id"))
+
+        rows = enumerate(READERS[file_format](path), start=1)
+        imported = skipped = 0
+        try:
+            while batch := list(islice(rows, options["batch_size"])):
+                created, errors = self.import_batch(batch)
+                imported += created
+                skipped += len(errors)
+                for line, error in errors:
+                    self.stderr.write(f"Row {line}: {error}")
+                self.stdout.write(f"Imported {imported} tasks...")
+        except (csv.Error, json.JSONDecodeError, UnicodeDecodeError) as e:
+            raise CommandError(
+                f"Could not read {path} after {imported} tasks: {e}"
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {imported} tasks, skipped {skipped} rows."
+        ))
+
+    def build_task(self, row):
+        name = (row.get("name") or "").strip()
+        if not name:
+            raise RowError("missing name")
+
+        priority = (row.get("priority") or "MEDIUM").strip().upper()
+        if priority not in PRIORITIES:
+            raise RowError(f"unknown priority {priority!r}")
+
+        assignee_ids = []
+        for username in row.get("assignees") or []:
+            if username not in self.workers:
+                raise RowError(f"unknown assignee {username!r}")
+            assignee_ids.append(self.workers[username])
+
+        task = Task(
+            name=name[:100],
+            description=row.get("description") or "",
+            deadline=parse_deadline(row.get("deadline")),
+            is_complete=parse_bool(row.get("is_complete")),
+            priority=priority,
+            task_type_id=self.task_type_id(row.get("task_type")),
+        )
+        return task, assignee_ids
+
+    def task_type_id(self, name):
+        name = (name or "").strip()
+        if not name:
+            return None
+        if name not in self.task_types:
+            self.task_types[name] = TaskType.objects.create(name=name).id
+        return self.task_types[name]
+
+    def import_batch(self, batch):
+        errors = []
+        with transaction.atomic():
+            tasks, assignee_ids = [], []
+            for line, row in batch:
+                try:
+                    task, ids = self.build_task(row)
+                except (RowError, TypeError, AttributeError) as e:
+                    errors.append((line, e))
+                    continue
+                tasks.append(task)
+                assignee_ids.append(ids)
+
+            Task.objects.bulk_create(tasks)
+            links = [
+                Assignment(task_id=task.pk, worker_id=worker_id)
+                for task, ids in zip(tasks, assignee_ids)
+                for worker_id in dict.fromkeys(ids)
+            ]
+            Assignment.objects.bulk_create(links)
+
+            # bulk_create sends no signals, so settle the counters and the
+            # change feed here.
+            deltas = counters.tasks_delta(
+                (task.is_complete, task.priority) for task in tasks
+            )
+            deltas[counters.ASSIGNMENTS] = len(links)
+            counters.adjust(deltas)
+            changes.record_tasks(Change.CREATED, [task.pk for task in tasks])
+            changes.record_tasks(
+                Change.ASSIGNEES, dict.fromkeys(link.task_id for link in links)
+            )
+
+        counters.invalidate_overdue()
+        return len(tasks), errors
@@ -0,0 +1,40 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from app.models import Job
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete the jobs that finished (done or failed) more than "
+        "--older-than days ago, --batch-size at a time. Their status "
+        "pages go with them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than", type=int, default=7, metavar="DAYS",
+        )
+        # Ids go in "id IN (...)": stay under SQLite's parameter limit.
+        parser.add_argument("--batch-size", type=int, default=900)
+
+    def handle(self, *args, **options):
+        if options["older_than"] < 0:
+            raise CommandError("--older-than cannot be negative.")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        cutoff = timezone.now() - timedelta(days=options["older_than"])
+        finished = Job.objects.filter(
+            status__in=(Job.DONE, Job.FAILED), finished_at__lt=cutoff
+        )
+        deleted = 0
+        # Short write transactions, leaving room for the job workers.
+        while batch := list(
+            finished.values_list("pk", flat=True)[:options["batch_size"]]
+        ):
+            deleted += Job.objects.filter(pk__in=batch).delete()[0]
+
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} jobs."))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from app import search
+from app.models import Task
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the full-text search index over task names and "
+        "descriptions from the app_task table."
+    )
+
+    def handle(self, *args, **options):
+        if not search.uses_fts():
+            self.stdout.write("Database has no FTS index; nothing to do.")
+            return
+
+        with transaction.atomic():
+            search.rebuild()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt search index for {Task.objects.count()} tasks."
+        ))
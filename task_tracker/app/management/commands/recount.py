@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from app import counters
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the dashboard counters from the task and worker tables "
+        "and report any drift."
+    )
+
+    def handle(self, *args, **options):
+        old, totals = counters.recount()
+
+        drifted = 0
+        for name, value in totals.items():
+            previous = old.get(name)
+            if previous != value:
+                drifted += 1
+                self.stdout.write(f"{name}: {previous} -> {value}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Recounted {len(totals)} counters, {drifted} had drifted."
+        ))
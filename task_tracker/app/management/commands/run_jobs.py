@@ -0,0 +1,88 @@
+import multiprocessing
+import signal
+import threading
+from contextlib import contextmanager
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from app import jobs
+
+
+@contextmanager
+def on_stop_signals(handler):
+    """Call ``handler`` on Ctrl-C or SIGTERM inside the block."""
+    previous = {
+        signum: signal.signal(signum, handler)
+        for signum in (signal.SIGINT, signal.SIGTERM)
+    }
+    try:
+        yield
+    finally:
+        for signum, old in previous.items():
+            signal.signal(signum, old)
+
+
+def work_process(burst, poll_interval, total):
+    # The parent stops us with SIGTERM once Ctrl-C reaches it; finish the
+    # job at hand first rather than die halfway through it.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+    ran = jobs.work(stop, burst, poll_interval)
+    with total.get_lock():
+        total.value += ran
+
+
+class Command(BaseCommand):
+    help = (
+        "Run queued background jobs on --processes worker processes until "
+        "stopped with Ctrl-C or SIGTERM; a job being run is finished "
+        "first. With --burst, exit once no job is due."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--processes", type=int, default=1)
+        parser.add_argument(
+            "--poll-interval", type=float, default=1.0,
+            help="Seconds to wait when no job is due (default 1).",
+        )
+        parser.add_argument("--burst", action="store_true")
+
+    def handle(self, *args, **options):
+        if options["processes"] < 1:
+            raise CommandError("--processes must be at least 1.")
+        burst, poll_interval = options["burst"], options["poll_interval"]
+
+        if options["processes"] == 1:
+            stop = threading.Event()
+            with on_stop_signals(lambda signum, frame: stop.set()):
+                ran = jobs.work(stop, burst, poll_interval)
+        else:
+            ran = self.run_pool(options["processes"], burst, poll_interval)
+
+        self.stdout.write(self.style.SUCCESS(f"Ran {ran} jobs."))
+
+    def run_pool(self, processes, burst, poll_interval):
+        # SQLite connections must not be used across a fork: each worker
+        # opens its own.
+        connections.close_all()
+        context = multiprocessing.get_context("fork")
+        total = context.Value("i", 0)
+        workers = [
+            context.Process(
+                target=work_process, args=(burst, poll_interval, total)
+            )
+            for _ in range(processes)
+        ]
+        for worker in workers:
+            worker.start()
+
+        def stop(signum, frame):
+            for worker in workers:
+                worker.terminate()
+
+        with on_stop_signals(stop):
+            for worker in workers:
+                worker.join()
+        return total.value
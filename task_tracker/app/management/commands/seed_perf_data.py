@@ -0,0 +1,221 @@
+import random
+from datetime import datetime, time, timedelta
+from itertools import accumulate
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from app import bulk, changes, counters
+from app.models import Change, Position, Task, TaskType, Worker
+
+Assignment = Task.assignees.through
+
+SCALES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+
+USERNAME_PREFIX = "perf"
+TASK_PREFIX = "Perf task"
+POSITIONS = (
+    "Developer", "Senior developer", "QA engineer", "Designer",
+    "Product manager", "Project manager", "DevOps engineer",
+    "Data analyst", "Support engineer", "Technical writer",
+    "Team lead", "Architect",
+)
+TASK_TYPES = (
+    "Bug", "Feature", "Refactoring", "Research", "Documentation",
+    "QA", "Deployment", "Support",
+)
+WORDS = (
+    "login form report export import dashboard cache query index page "
+    "search filter invoice email payment user profile settings upload "
+    "timeout error crash slow deploy release review test migration api "
+    "mobile layout button chart backup sync token session audit"
+).split()
+
+# How many assignees a task gets: 0 to 3, mostly one.
+FAN_OUT = (0, 1, 2, 3)
+FAN_OUT_WEIGHTS = (10, 55, 25, 10)
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the database with a synthetic, reproducible dataset for "
+        "benchmarks: tasks, one worker per 20 tasks spread over a fixed "
+        "set of positions, task types and 0-3 assignees per task, with a "
+        "few workers carrying most of the load. The same --seed and "
+        "--base-date always produce the same data. Rows are inserted with "
+        "bulk_create, the dashboard counters adjusted and the change feed "
+        "entries recorded to match."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scale", choices=sorted(SCALES), default="1k",
+            help="Number of tasks: 1k, 100k or 1m.",
+        )
+        parser.add_argument(
+            "--tasks", type=int, help="Exact number of tasks (overrides "
+            "--scale).",
+        )
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--base-date",
+            help="Deadlines fall within a year either side of this date "
+            "(YYYY-MM-DD); defaults to today.",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--clear",
+            action="store_true",
+            help="Delete previously seeded data first.",
+        )
+
+    def handle(self, *args, **options):
+        if options["clear"]:
+            self.clear()
+        elif Worker.objects.filter(
+            username__startswith=USERNAME_PREFIX
+        ).exists():
+            raise CommandError(
+                "Seeded data already exists; pass --clear to replace it."
+            )
+
+        if options["base_date"]:
+            base_date = parse_date(options["base_date"])
+            if base_date is None:
+                raise CommandError("--base-date must be YYYY-MM-DD.")
+        else:
+            base_date = timezone.localdate()
+        self.base = timezone.make_aware(datetime.combine(base_date, time()))
+
+        total = options["tasks"] or SCALES[options["scale"]]
+        self.rng = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+
+        with transaction.atomic():
+            positions = self.ensure(Position, POSITIONS)
+            task_types = self.ensure(TaskType, TASK_TYPES)
+            worker_ids = self.create_workers(max(total // 20, 5), positions)
+        self.stdout.write(f"Created {len(worker_ids)} workers.")
+
+        # A few workers take most tasks: weight the n-th by 1 / n.
+        cum_weights = list(accumulate(
+            1 / rank for rank in range(1, len(worker_ids) + 1)
+        ))
+        created = 0
+        while created < total:
+            size = min(self.batch_size, total - created)
+            self.create_tasks(
+                created, size, task_types, worker_ids, cum_weights
+            )
+            created += size
+            self.stdout.write(f"Created {created} tasks...")
+
+        counters.invalidate_overdue()
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {total} tasks for {len(worker_ids)} workers."
+        ))
+
+    def ensure(self, model, names):
+        existing = dict(
+            model.objects.filter(name__in=names).values_list("name", "id")
+        )
+        model.objects.bulk_create(
+            [model(name=name) for name in names if name not in existing]
+        )
+        ids = dict(
+            model.objects.filter(name__in=names).values_list("name", "id")
+        )
+        return [ids[name] for name in names]
+
+    def create_workers(self, count, positions):
+        rng = self.rng
+        workers = [
+            Worker(
+                username=f"{USERNAME_PREFIX}{n:07d}",
+                first_name=rng.choice(("Ann", "Bob", "Eve", "Ivan", "Olga")),
+                last_name=f"Tester{n}",
+                email=f"{USERNAME_PREFIX}{n}@example.com",
+                password="!",  # unusable
+                position_id=rng.choice(positions),
+            )
+            for n in range(count)
+        ]
+        Worker.objects.bulk_create(workers, batch_size=self.batch_size)
+        counters.adjust({counters.WORKERS: count})
+        # bulk_create sends no signals: feed clients learn of the workers
+        # here, before any deletion by --clear.
+        Change.objects.bulk_create(
+            [
+                Change(
+                    model=Change.WORKER,
+                    object_id=worker.pk,
+                    action=Change.CREATED,
+                    data=changes.snapshot(worker, changes.WORKER_FIELDS),
+                )
+                for worker in workers
+            ],
+            batch_size=self.batch_size,
+        )
+        return list(
+            Worker.objects.filter(
+                username__startswith=USERNAME_PREFIX
+            ).order_by("username").values_list("pk", flat=True)
+        )
+
+    def create_tasks(self, start, size, task_types, worker_ids, cum_weights):
+        rng = self.rng
+        tasks, assignees = [], []
+        for n in range(start, start + size):
+            deadline = self.base + timedelta(
+                minutes=rng.randrange(-365 * 24 * 60, 365 * 24 * 60)
+            )
+            past = deadline < self.base
+            tasks.append(Task(
+                name=f"{TASK_PREFIX} {n}: {' '.join(rng.sample(WORDS, 3))}",
+                description=" ".join(rng.choices(WORDS, k=rng.randint(5, 30))),
+                deadline=deadline,
+                is_complete=rng.random() < (0.7 if past else 0.1),
+                priority=rng.choices(
+                    ("HIGH", "MEDIUM", "LOW"), weights=(2, 5, 3)
+                )[0],
+                task_type_id=rng.choice(task_types),
+            ))
+            fan_out = rng.choices(FAN_OUT, weights=FAN_OUT_WEIGHTS)[0]
+            assignees.append(set(rng.choices(
+                worker_ids, cum_weights=cum_weights, k=fan_out
+            )))
+
+        with transaction.atomic():
+            Task.objects.bulk_create(tasks)
+            links = [
+                Assignment(task_id=task.pk, worker_id=worker_id)
+                for task, ids in zip(tasks, assignees)
+                for worker_id in sorted(ids)
+            ]
+            Assignment.objects.bulk_create(links)
+
+            deltas = counters.tasks_delta(
+                (task.is_complete, task.priority) for task in tasks
+            )
+            deltas[counters.ASSIGNMENTS] = len(links)
+            counters.adjust(deltas)
+            # As import_tasks does; bulk.delete() records their deletion.
+            changes.record_tasks(Change.CREATED, [task.pk for task in tasks])
+            changes.record_tasks(
+                Change.ASSIGNEES, dict.fromkeys(link.task_id for link in links)
+            )
+
+    def clear(self):
+        deleted = bulk.apply(
+            "delete", Task.objects.filter(name__startswith=TASK_PREFIX)
+        )
+        # With their signals, which settle the counters and the change
+        # feed, and with whatever else points at them.
+        removed = Worker.objects.filter(
+            username__startswith=USERNAME_PREFIX
+        ).delete()[1].get(Worker._meta.label, 0)
+        self.stdout.write(
+            f"Deleted {deleted} seeded tasks and {removed} workers."
+        )
@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from app import replica
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy the primary SQLite database over the replica "
+        "(REPLICA_DATABASE) with SQLite's online backup, in one pass. The "
+        "copy reads the primary in a single transaction: in WAL mode "
+        "(DATABASE_PROFILE=production) its writers carry on, otherwise "
+        "they wait until it ends. The replica is locked for the whole "
+        "copy, so its readers wait for it, up to their busy_timeout. With "
+        "--interval, repeat every that many seconds."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--interval", type=float)
+
+    def handle(self, *args, **options):
+        if not replica.is_configured():
+            raise CommandError("No replica database; set REPLICA_DATABASE.")
+        primary = connections[DEFAULT_DB_ALIAS]
+        target = connections[replica.REPLICA]
+        if primary.vendor != "sqlite" or target.vendor != "sqlite":
+            raise CommandError("sync_replica copies SQLite databases only.")
+
+        while True:
+            started = time.perf_counter()
+            self.sync(primary, target)
+            self.stdout.write(
+                f"Synced the replica in "
+                f"{(time.perf_counter() - started) * 1000:.0f} ms."
+            )
+            if options["interval"] is None:
+                break
+            time.sleep(options["interval"])
+
+    def sync(self, primary, target):
+        # Copying to a new file and renaming it over the replica would
+        # spare its readers the wait, but connections kept open
+        # (CONN_MAX_AGE) would go on reading the old file, and the
+        # replica's -wal/-shm files would no longer match it.
+        primary.ensure_connection()
+        target.ensure_connection()
+        primary.connection.backup(target.connection)
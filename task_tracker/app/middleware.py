@@ -0,0 +1,187 @@
+"""Opt-in per-request profiling: SQL, template and view time.
+
+Enable with ``REQUEST_INSTRUMENTATION``. Every request then gets a
+``Server-Timing`` header (visible in the browser's network panel) and a
+JSON log line on the ``app.instrumentation`` logger, with warnings for
+slow requests, slow queries and queries repeated with only their
+parameters changed, the usual sign of an N+1 loop.
+
+Queries are seen through an execute wrapper on every database
+connection, and template renders by wrapping ``Template.render`` the way
+Django's test runner does. Both report to the profile of the request in
+progress, found through a context variable, so queries run from async
+views in ``sync_to_async`` threads are counted too. The wrapper is added
+as connections open, so a connection already open in another thread when
+the middleware loads is missed; WSGI and ASGI handlers load it at start-up,
+before any.
+"""
+import json
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.template import base
+
+logger = logging.getLogger("app.instrumentation")
+
+_profile = ContextVar("request_profile", default=None)
+
+
+class RequestProfile:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = []  # (sql, duration, template)
+        self.templates = []  # names of the templates being rendered
+        self.template_time = 0.0
+
+    @property
+    def db_time(self):
+        return sum(duration for _, duration, _ in self.queries)
+
+    def repeated_queries(self, threshold):
+        """``(sql, count, template)`` for SQL run at least ``threshold``
+        times, whatever the parameters."""
+        counts = Counter((sql, template) for sql, _, template in self.queries)
+        return [
+            (sql, count, template)
+            for (sql, template), count in counts.most_common()
+            if count >= threshold
+        ]
+
+
+def record_query(execute, sql, params, many, context):
+    profile = _profile.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        template = profile.templates[-1] if profile.templates else None
+        profile.queries.append(
+            (sql, time.perf_counter() - started, template)
+        )
+
+
+_template_render = base.Template.render
+
+
+def render_template(self, context):
+    profile = _profile.get()
+    if profile is None:
+        return _template_render(self, context)
+
+    # Includes render inside their parent: only the outermost counts
+    # towards the time, but each is named while it runs.
+    outermost = not profile.templates
+    profile.templates.append(self.name or "<unknown>")
+    started = time.perf_counter()
+    try:
+        return _template_render(self, context)
+    finally:
+        profile.templates.pop()
+        if outermost:
+            profile.template_time += time.perf_counter() - started
+
+
+def add_query_wrapper(connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def install():
+    """Hook into template rendering and every (future) DB connection."""
+    base.Template.render = render_template
+    connection_created.connect(add_query_wrapper)
+    for connection in connections.all(initialized_only=True):
+        add_query_wrapper(connection)
+
+
+def ms(seconds):
+    return round(seconds * 1000, 2)
+
+
+class InstrumentationMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_INSTRUMENTATION:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        install()
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        profile = RequestProfile()
+        token = _profile.set(profile)
+        try:
+            response = self.get_response(request)
+        finally:
+            _profile.reset(token)
+        return self.report(request, response, profile)
+
+    async def __acall__(self, request):
+        profile = RequestProfile()
+        token = _profile.set(profile)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _profile.reset(token)
+        return self.report(request, response, profile)
+
+    def report(self, request, response, profile):
+        total = time.perf_counter() - profile.started
+        match = request.resolver_match
+        view = match.view_name if match else None
+
+        response["Server-Timing"] = ", ".join((
+            f'db;dur={ms(profile.db_time)};desc="{len(profile.queries)} '
+            f'queries"',
+            f"template;dur={ms(profile.template_time)}",
+            f"total;dur={ms(total)}",
+        ))
+
+        record = {
+            "method": request.method,
+            "path": request.path,
+            "view": view,
+            "status": response.status_code,
+            "queries": len(profile.queries),
+            "db_ms": ms(profile.db_time),
+            "template_ms": ms(profile.template_time),
+            "total_ms": ms(total),
+        }
+        logger.info(json.dumps(record))
+
+        if ms(total) >= settings.SLOW_REQUEST_MS:
+            logger.warning(json.dumps({"slow_request": record}))
+        for sql, duration, template in profile.queries:
+            if ms(duration) >= settings.SLOW_QUERY_MS:
+                logger.warning(json.dumps({"slow_query": {
+                    "view": view,
+                    "template": template,
+                    "ms": ms(duration),
+                    "sql": sql,
+                }}))
+        for sql, count, template in profile.repeated_queries(
+            settings.REPEATED_QUERY_THRESHOLD
+        ):
+            logger.warning(json.dumps({"repeated_query": {
+                "view": view,
+                "template": template,
+                "count": count,
+                "sql": sql,
+            }}))
+        return response
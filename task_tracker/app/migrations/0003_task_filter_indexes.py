@@ -0,0 +1,29 @@
+# Generated by Django 6.0 on 2026-10-18 20:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0002_alter_task_description'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['deadline'], name='task_deadline_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['is_complete', 'deadline'], name='task_complete_deadline_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['priority', 'deadline'], name='task_priority_deadline_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['task_type', 'deadline'], name='task_type_deadline_idx'),
+        ),
+    ]
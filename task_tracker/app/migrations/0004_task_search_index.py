@@ -0,0 +1,66 @@
+# Generated by Django 6.0 on 2026-10-18 20:40
+
+from django.db import migrations
+
+
+# External-content FTS5 table over app_task: the text lives only in
+# app_task, the index stores tokens keyed by the task id (rowid).
+CREATE_SQL = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS app_task_fts USING fts5(
+        name, description, content='app_task', content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS app_task_fts_ai AFTER INSERT ON app_task
+    BEGIN
+        INSERT INTO app_task_fts(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS app_task_fts_ad AFTER DELETE ON app_task
+    BEGIN
+        INSERT INTO app_task_fts(app_task_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS app_task_fts_au
+    AFTER UPDATE OF name, description ON app_task
+    BEGIN
+        INSERT INTO app_task_fts(app_task_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO app_task_fts(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    "INSERT INTO app_task_fts(app_task_fts) VALUES ('rebuild')",
+)
+
+DROP_SQL = (
+    "DROP TRIGGER IF EXISTS app_task_fts_ai",
+    "DROP TRIGGER IF EXISTS app_task_fts_ad",
+    "DROP TRIGGER IF EXISTS app_task_fts_au",
+    "DROP TABLE IF EXISTS app_task_fts",
+)
+
+
+def run_sqlite(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != "sqlite":
+            return
+        for sql in statements:
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0003_task_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(run_sqlite(CREATE_SQL), run_sqlite(DROP_SQL)),
+    ]
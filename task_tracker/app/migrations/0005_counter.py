@@ -0,0 +1,45 @@
+# Generated by Django 6.0 on 2026-10-18 21:05
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def seed_counters(apps, schema_editor):
+    Counter = apps.get_model("app", "Counter")
+    Task = apps.get_model("app", "Task")
+    Worker = apps.get_model("app", "Worker")
+    db = schema_editor.connection.alias
+
+    tasks = Task.objects.using(db)
+    totals = tasks.aggregate(
+        tasks=Count("pk"),
+        tasks_open=Count("pk", filter=Q(is_complete=False)),
+        tasks_complete=Count("pk", filter=Q(is_complete=True)),
+        tasks_priority_HIGH=Count("pk", filter=Q(priority="HIGH")),
+        tasks_priority_MEDIUM=Count("pk", filter=Q(priority="MEDIUM")),
+        tasks_priority_LOW=Count("pk", filter=Q(priority="LOW")),
+    )
+    totals["workers"] = Worker.objects.using(db).count()
+    totals["assignments"] = Task.assignees.through.objects.using(db).count()
+
+    Counter.objects.using(db).bulk_create(
+        [Counter(name=name, value=value) for name, value in totals.items()]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0004_task_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Counter',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(seed_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 6.0 on 2026-10-18 21:40
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """Cover (worker_id, task_id) on the auto-created assignees table.
+
+    The default worker_id index still has to visit each row for its
+    task_id; this one answers "tasks of worker X" from the index alone.
+    """
+
+    dependencies = [
+        ('app', '0005_counter'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            "CREATE INDEX app_task_assignees_worker_task_idx "
+            "ON app_task_assignees (worker_id, task_id)",
+            "DROP INDEX app_task_assignees_worker_task_idx",
+        ),
+    ]
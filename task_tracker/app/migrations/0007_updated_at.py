@@ -0,0 +1,85 @@
+# Generated by Django 6.0 on 2026-10-18 22:10
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+# Adding or removing a column with a non-constant default makes Django
+# rebuild the SQLite table, which drops the full-text triggers from 0004:
+# restore them after the rebuild, both ways.
+FTS_TRIGGERS_SQL = (
+    """
+    CREATE TRIGGER IF NOT EXISTS app_task_fts_ai AFTER INSERT ON app_task
+    BEGIN
+        INSERT INTO app_task_fts(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS app_task_fts_ad AFTER DELETE ON app_task
+    BEGIN
+        INSERT INTO app_task_fts(app_task_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS app_task_fts_au
+    AFTER UPDATE OF name, description ON app_task
+    BEGIN
+        INSERT INTO app_task_fts(app_task_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO app_task_fts(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+)
+
+
+def restore_fts_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for sql in FTS_TRIGGERS_SQL:
+        schema_editor.execute(sql)
+    schema_editor.execute(
+        "INSERT INTO app_task_fts(app_task_fts) VALUES ('rebuild')"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0006_assignment_worker_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            migrations.RunPython.noop,
+            restore_fts_triggers,
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='updated_at',
+            field=models.DateTimeField(
+                auto_now=True, default=django.utils.timezone.now
+            ),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='worker',
+            name='updated_at',
+            field=models.DateTimeField(
+                auto_now=True, default=django.utils.timezone.now
+            ),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(
+                fields=['updated_at'], name='task_updated_idx'
+            ),
+        ),
+        migrations.RunPython(
+            restore_fts_triggers,
+            migrations.RunPython.noop,
+        ),
+    ]
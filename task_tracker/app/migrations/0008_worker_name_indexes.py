@@ -0,0 +1,27 @@
+# Generated by Django 6.0 on 2026-10-18 22:40
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0007_updated_at'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='worker',
+            index=models.Index(django.db.models.functions.text.Lower('username'), name='worker_username_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='worker',
+            index=models.Index(django.db.models.functions.text.Lower('first_name'), name='worker_first_name_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='worker',
+            index=models.Index(django.db.models.functions.text.Lower('last_name'), name='worker_last_name_lower_idx'),
+        ),
+    ]
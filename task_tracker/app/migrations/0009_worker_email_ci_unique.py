@@ -0,0 +1,49 @@
+# Generated by Django 6.0 on 2026-10-18 23:05
+
+import django.db.models.functions.text
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+
+def check_duplicate_emails(apps, schema_editor):
+    """Refuse to add the constraint while addresses clash, listing them."""
+    Worker = apps.get_model("app", "Worker")
+    duplicates = (
+        Worker.objects.using(schema_editor.connection.alias)
+        .exclude(email="")
+        .values(email_lower=Lower("email"))
+        .annotate(n=Count("pk"))
+        .filter(n__gt=1)
+        .order_by("email_lower")
+    )
+    if not duplicates:
+        return
+
+    lines = []
+    for row in duplicates:
+        usernames = Worker.objects.using(
+            schema_editor.connection.alias
+        ).filter(email__iexact=row["email_lower"]).values_list(
+            "username", flat=True
+        )
+        lines.append(f"  {row['email_lower']}: {', '.join(usernames)}")
+    raise RuntimeError(
+        "Workers share an email address (ignoring case); give each a "
+        "unique one before migrating:\n" + "\n".join(lines)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0008_worker_name_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_duplicate_emails, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='worker',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('email'), condition=models.Q(('email', ''), _negated=True), name='worker_email_ci_unique', violation_error_code='email_taken', violation_error_message='A user with this email already exists.'),
+        ),
+    ]
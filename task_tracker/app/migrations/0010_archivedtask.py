@@ -0,0 +1,79 @@
+# Generated by Django 6.0 on 2026-10-18 21:34
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+# Archived tasks get their own external-content FTS5 index, so searches
+# that include them can rank both tables the same way. Archived rows are
+# only ever inserted and deleted.
+CREATE_SQL = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS app_archivedtask_fts USING fts5(
+        name, description, content='app_archivedtask', content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS app_archivedtask_fts_ai
+    AFTER INSERT ON app_archivedtask
+    BEGIN
+        INSERT INTO app_archivedtask_fts(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS app_archivedtask_fts_ad
+    AFTER DELETE ON app_archivedtask
+    BEGIN
+        INSERT INTO app_archivedtask_fts(
+            app_archivedtask_fts, rowid, name, description
+        )
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+)
+
+DROP_SQL = (
+    "DROP TRIGGER IF EXISTS app_archivedtask_fts_ai",
+    "DROP TRIGGER IF EXISTS app_archivedtask_fts_ad",
+    "DROP TABLE IF EXISTS app_archivedtask_fts",
+)
+
+
+def run_sqlite(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != "sqlite":
+            return
+        for sql in statements:
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0009_worker_email_ci_unique'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedTask',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=100)),
+                ('description', models.TextField(blank=True)),
+                ('deadline', models.DateTimeField()),
+                ('is_complete', models.BooleanField(default=True)),
+                ('priority', models.CharField(choices=[('HIGH', 'High'), ('MEDIUM', 'Medium'), ('LOW', 'Low')], default='MEDIUM', max_length=15)),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField()),
+                ('assignees', models.ManyToManyField(related_name='archived_tasks', to=settings.AUTH_USER_MODEL)),
+                ('task_type', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='app.tasktype')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['deadline'], name='archivedtask_deadline_idx')],
+            },
+        ),
+        migrations.RunPython(run_sqlite(CREATE_SQL), run_sqlite(DROP_SQL)),
+    ]
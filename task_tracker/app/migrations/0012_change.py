@@ -0,0 +1,28 @@
+# Generated by Django 6.0 on 2026-10-18 22:04
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0011_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Change',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('model', models.CharField(choices=[('task', 'Task'), ('worker', 'Worker')], max_length=10)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('action', models.CharField(choices=[('created', 'Created'), ('updated', 'Updated'), ('deleted', 'Deleted'), ('assignees', 'Assignees changed')], max_length=10)),
+                ('data', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['created_at'], name='change_created_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.0 on 2026-10-18 22:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0012_change'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['name', 'id'], name='task_name_idx'),
+        ),
+    ]
@@ -1,5 +1,11 @@
+import string
+
 from django.contrib.auth.models import AbstractUser
+from django.core.exceptions import NON_FIELD_ERRORS, ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.db.models import Q
+from django.db.models.functions import Lower
 
 
 class Task(models.Model):
@@ -27,6 +33,67 @@ class Task(models.Model):
         "Worker",
         related_name="assigned_tasks"
     )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        # Back the task list filters: each one narrows on an equality
+        # column and then walks the deadline in order for pagination.
+        indexes = [
+            models.Index(fields=["deadline"], name="task_deadline_idx"),
+            models.Index(
+                fields=["is_complete", "deadline"],
+                name="task_complete_deadline_idx",
+            ),
+            models.Index(
+                fields=["priority", "deadline"],
+                name="task_priority_deadline_idx",
+            ),
+            models.Index(
+                fields=["task_type", "deadline"],
+                name="task_type_deadline_idx",
+            ),
+            # MAX(updated_at) for the conditional GET validators.
+            models.Index(fields=["updated_at"], name="task_updated_idx"),
+            # The name orderings, with the pagination tie-breaker.
+            models.Index(fields=["name", "id"], name="task_name_idx"),
+        ]
+
+
+class ArchivedTask(models.Model):
+    """A completed task moved out of ``Task`` by ``app.archive``.
+
+    It keeps the task's id (ids are never reused), so links to the task
+    keep working; ``updated_at`` is the task's last change.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    name = models.CharField(max_length=100)
+    description = models.TextField(blank=True)
+    deadline = models.DateTimeField()
+    is_complete = models.BooleanField(default=True)
+    priority = models.CharField(
+        max_length=15,
+        choices=Task.PRIORITY_CHOICES,
+        default="MEDIUM",
+    )
+    task_type = models.ForeignKey(
+        "TaskType",
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="+",
+    )
+    assignees = models.ManyToManyField(
+        "Worker",
+        related_name="archived_tasks",
+    )
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["deadline"], name="archivedtask_deadline_idx"
+            ),
+        ]
 
 
 class TaskType(models.Model):
@@ -36,12 +103,68 @@ class TaskType(models.Model):
         return self.name
 
 
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+def fold_case(value):
+    """Lowercase ``value`` the way ``Lower()`` does on SQLite, which folds
+    ASCII letters only: Python's ``lower()`` would fold others too, and
+    disagree with the database on what matches."""
+    return value.translate(_ASCII_LOWER)
+
+
 class Worker(AbstractUser):
     position = models.ForeignKey(
         "Position",
         on_delete=models.SET_NULL,
         null=True,
     )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta(AbstractUser.Meta):
+        # Case-insensitive prefix search for the assignee autocomplete,
+        # which queries these as ranges (see WorkerAutocompleteView).
+        indexes = [
+            models.Index(Lower("username"), name="worker_username_lower_idx"),
+            models.Index(
+                Lower("first_name"), name="worker_first_name_lower_idx"
+            ),
+            models.Index(
+                Lower("last_name"), name="worker_last_name_lower_idx"
+            ),
+        ]
+        constraints = [
+            # Email is optional, so only filled-in addresses must differ.
+            models.UniqueConstraint(
+                Lower("email"),
+                condition=~Q(email=""),
+                name="worker_email_ci_unique",
+                violation_error_code="email_taken",
+                violation_error_message=(
+                    "A user with this email already exists."
+                ),
+            ),
+        ]
+
+    def clean(self):
+        super().clean()
+        # Stored as the Lower(email) constraint compares it.
+        self.email = fold_case(self.email)
+
+    def validate_constraints(self, exclude=None):
+        # An expression constraint reports a non-field error; pin it on
+        # the email field, where forms show it.
+        try:
+            super().validate_constraints(exclude)
+        except ValidationError as e:
+            errors = e.error_dict.get(NON_FIELD_ERRORS, [])
+            taken = [error for error in errors if error.code == "email_taken"]
+            if taken:
+                errors[:] = [error for error in errors if error not in taken]
+                if not errors:
+                    del e.error_dict[NON_FIELD_ERRORS]
+                e.error_dict.setdefault("email", []).extend(taken)
+            raise
 
 
 class Position(models.Model):
@@ -49,3 +172,107 @@ class Position(models.Model):
 
     def __str__(self):
         return self.name
+
+
+class Counter(models.Model):
+    """A denormalised row count, maintained by ``app.counters``."""
+    name = models.CharField(max_length=50, primary_key=True)
+    value = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name}={self.value}"
+
+
+class Job(models.Model):
+    """A unit of background work, run by ``manage.py run_jobs``.
+
+    See ``app.jobs`` for how jobs are claimed, retried and timed out.
+    """
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = (
+        (QUEUED, "Queued"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    )
+
+    name = models.CharField(max_length=50)
+    kwargs = models.JSONField(default=dict)
+    status = models.CharField(
+        max_length=10, choices=STATUS_CHOICES, default=QUEUED
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    # Not claimed before this time: set on retries, for the backoff.
+    run_after = models.DateTimeField()
+    # While running, the claim expires at this time and the job may be
+    # claimed again; ``lease`` identifies the current claim.
+    locked_until = models.DateTimeField(null=True, blank=True)
+    lease = models.CharField(max_length=32, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_by = models.ForeignKey(
+        "Worker",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # The claim: queued jobs due first, expired claims next.
+            models.Index(
+                fields=["status", "run_after"], name="job_status_run_after_idx"
+            ),
+            models.Index(
+                fields=["status", "locked_until"],
+                name="job_status_locked_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
+
+
+class Change(models.Model):
+    """An entry of the change feed, appended by ``app.changes``.
+
+    The id is the feed's cursor: it only ever grows.
+    """
+    TASK = "task"
+    WORKER = "worker"
+    MODEL_CHOICES = ((TASK, "Task"), (WORKER, "Worker"))
+
+    CREATED = "created"
+    UPDATED = "updated"
+    DELETED = "deleted"
+    ASSIGNEES = "assignees"
+    ACTION_CHOICES = (
+        (CREATED, "Created"),
+        (UPDATED, "Updated"),
+        (DELETED, "Deleted"),
+        (ASSIGNEES, "Assignees changed"),
+    )
+
+    id = models.BigAutoField(primary_key=True)
+    model = models.CharField(max_length=10, choices=MODEL_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES)
+    # The object's state after the change; None for deletions.
+    data = models.JSONField(null=True, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # compact_changes trims by age.
+            models.Index(fields=["created_at"], name="change_created_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.action} {self.model} {self.object_id}"
@@ -0,0 +1,246 @@
+import base64
+import binascii
+import datetime
+import json
+from collections.abc import Sequence
+from functools import reduce
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage, Paginator
+from django.db import DatabaseError, connection
+from django.db.models import Q
+from django.http import Http404
+from django.utils.functional import cached_property
+
+from . import counters
+from .models import Task, Worker
+
+# Tables whose total a dashboard counter keeps exactly.
+COUNTERS = {Task: counters.TASKS, Worker: counters.WORKERS}
+
+# Below this many rows an exact COUNT(*) is cheap enough.
+ESTIMATE_MIN_ROWS = 10_000
+
+
+class InvalidCursor(InvalidPage):
+    pass
+
+
+class CursorPage(Sequence):
+    """A single page of a keyset-paginated queryset.
+
+    Mirrors the parts of ``django.core.paginator.Page`` the templates use,
+    but exposes ``next_cursor``/``previous_cursor`` instead of page numbers.
+    """
+
+    def __init__(self, object_list, paginator, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f"<CursorPage of {len(self.object_list)} objects>"
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Keyset paginator: seeks past the last row seen instead of OFFSET.
+
+    ``ordering`` is a sequence of local field names (``-`` for descending)
+    which, together with the primary key appended as a tie-breaker, defines
+    a total order. Pages are fetched with a ``WHERE (a, b) > (x, y)``
+    style predicate and ``LIMIT per_page + 1``, so no COUNT(*) is run and
+    the cost of a page does not depend on how deep it is.
+    """
+
+    def __init__(self, queryset, per_page, ordering):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.model = queryset.model
+
+        ordering = list(ordering)
+        pk_names = {"pk", self.model._meta.pk.name}
+        if not ordering or ordering[-1].lstrip("-") not in pk_names:
+            ordering.append("pk")
+        self.ordering = [
+            (name.lstrip("-"), name.startswith("-")) for name in ordering
+        ]
+
+    def _field(self, name):
+        if name == "pk":
+            return self.model._meta.pk
+        return self.model._meta.get_field(name)
+
+    def encode_cursor(self, obj, reverse):
+        values = []
+        for name, _ in self.ordering:
+            value = getattr(obj, self._field(name).attname)
+            if isinstance(value, (datetime.date, datetime.time)):
+                value = value.isoformat()
+            values.append(value)
+
+        payload = json.dumps([int(reverse), values], separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            reverse, raw_values = json.loads(
+                base64.urlsafe_b64decode(padded.encode())
+            )
+            if len(raw_values) != len(self.ordering):
+                raise ValueError
+            values = [
+                self._field(name).to_python(raw)
+                for (name, _), raw in zip(self.ordering, raw_values)
+            ]
+        except (
+            binascii.Error,
+            TypeError,
+            UnicodeDecodeError,
+            ValueError,
+            ValidationError,
+        ):
+            raise InvalidCursor("That cursor is not valid")
+        return bool(reverse), values
+
+    def _seek(self, values, reverse):
+        """Build ``(f1, f2, ...) > (v1, v2, ...)`` honouring each direction."""
+        clauses = []
+        for i, (name, descending) in enumerate(self.ordering):
+            lookup = "lt" if descending != reverse else "gt"
+            equal = {
+                self.ordering[j][0]: values[j] for j in range(i)
+            }
+            clauses.append(Q(**equal, **{f"{name}__{lookup}": values[i]}))
+        return reduce(lambda a, b: a | b, clauses)
+
+    def _order_by(self, reverse):
+        return [
+            f"-{name}" if descending != reverse else name
+            for name, descending in self.ordering
+        ]
+
+    def _page_queryset(self, cursor):
+        reverse, values = (False, None)
+        if cursor:
+            reverse, values = self.decode_cursor(cursor)
+
+        queryset = self.queryset.order_by(*self._order_by(reverse))
+        if values is not None:
+            queryset = queryset.filter(self._seek(values, reverse))
+
+        return reverse, values, queryset[:self.per_page + 1]
+
+    def _make_page(self, rows, reverse, values):
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if reverse:
+            rows.reverse()
+
+        # Walking backwards we came from a later page, and a forward cursor
+        # means there is an earlier one; the extra row answers the other side.
+        if reverse:
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, values is not None
+
+        next_cursor = previous_cursor = None
+        if rows and has_next:
+            next_cursor = self.encode_cursor(rows[-1], reverse=False)
+        if rows and has_previous:
+            previous_cursor = self.encode_cursor(rows[0], reverse=True)
+
+        return CursorPage(rows, self, next_cursor, previous_cursor)
+
+    def page(self, cursor=None):
+        reverse, values, queryset = self._page_queryset(cursor)
+        return self._make_page(list(queryset), reverse, values)
+
+    async def apage(self, cursor=None):
+        reverse, values, queryset = self._page_queryset(cursor)
+        rows = [row async for row in queryset]
+        return self._make_page(rows, reverse, values)
+
+
+class CursorPaginationMixin:
+    """Opt a ``ListView`` into keyset pagination.
+
+    Set ``cursor_ordering`` (or override ``get_cursor_ordering``) to enable
+    it; without it the view falls back to Django's offset paginator.
+    """
+
+    cursor_ordering = None
+    cursor_query_param = "cursor"
+
+    def get_cursor_ordering(self):
+        return self.cursor_ordering
+
+    def paginate_queryset(self, queryset, page_size):
+        ordering = self.get_cursor_ordering()
+        if not ordering:
+            return super().paginate_queryset(queryset, page_size)
+
+        paginator = CursorPaginator(queryset, page_size, ordering)
+        try:
+            page = paginator.page(
+                self.request.GET.get(self.cursor_query_param)
+            )
+        except InvalidCursor as e:
+            raise Http404(str(e))
+
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
+def table_row_estimate(model):
+    """The row count of ``model``'s table recorded by SQLite's ``ANALYZE``
+    (``sqlite_stat1``), or ``None`` when there is none."""
+    if connection.vendor != "sqlite":
+        return None
+    with connection.cursor() as cursor:
+        try:
+            cursor.execute(
+                "SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1",
+                [model._meta.db_table],
+            )
+        except DatabaseError:  # ANALYZE never ran
+            return None
+        row = cursor.fetchone()
+    return int(row[0].split()[0]) if row else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """A paginator that does not ``COUNT(*)`` whole large tables.
+
+    The total of an unfiltered queryset comes from its dashboard counter,
+    or from SQLite's statistics when they put the table above
+    ``ESTIMATE_MIN_ROWS`` rows; the latter is only as fresh as the last
+    ``ANALYZE`` (``PRAGMA optimize``). Filtered querysets are counted.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            model = queryset.model
+            if model in COUNTERS:
+                return counters.get_count(COUNTERS[model])
+            estimate = table_row_estimate(model)
+            if estimate is not None and estimate >= ESTIMATE_MIN_ROWS:
+                return estimate
+        return super().count
@@ -0,0 +1,125 @@
+"""Serve the read-only pages from a replica database.
+
+When ``settings.DATABASES`` has a ``replica`` alias (a copy of the
+database kept up to date by ``manage.py sync_replica``), views wrapped
+in ``replica_reads`` run their reads there, leaving the primary to the
+writes. Everything else, including every write, uses ``default``.
+
+The copy lags behind the primary, so after a user writes (any request
+that is not GET/HEAD/OPTIONS) ``PinPrimaryMiddleware`` sets a cookie
+that keeps their reads on the primary for ``REPLICA_PIN_SECONDS``, long
+enough for their own change to reach the replica.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.deprecation import MiddlewareMixin
+
+REPLICA = "replica"
+PIN_COOKIE = "pin_primary"
+READ_METHODS = ("GET", "HEAD", "OPTIONS")
+
+_use_replica = ContextVar("use_replica", default=False)
+
+
+def is_configured():
+    return REPLICA in settings.DATABASES
+
+
+def is_pinned(request):
+    return PIN_COOKIE in request.COOKIES
+
+
+def using_replica():
+    """Whether reads run now go to the replica."""
+    return _use_replica.get() and is_configured()
+
+
+@contextmanager
+def use_replica():
+    """Send the reads made inside the block to the replica."""
+    token = _use_replica.set(True)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+@contextmanager
+def reading_from_replica(request):
+    """``use_replica()`` for ``request``, unless it writes or its user is
+    pinned to the primary."""
+    if request.method not in READ_METHODS or is_pinned(request):
+        yield
+        return
+    # The session and its user must come from the primary: a new session
+    # is not on the replica yet.
+    if hasattr(request, "user"):
+        request.user.is_authenticated
+    with use_replica():
+        yield
+
+
+def replica_reads(view_func):
+    """Run ``view_func``'s reads on the replica, if there is one.
+
+    Template responses are rendered before returning: their templates
+    still query the database (related objects, paginated lists).
+    """
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def wrapper(request, *args, **kwargs):
+            if hasattr(request, "auser"):
+                request.user = await request.auser()
+            with reading_from_replica(request):
+                response = await view_func(request, *args, **kwargs)
+                if hasattr(response, "render"):
+                    response = await sync_to_async(response.render)()
+                return response
+    else:
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            with reading_from_replica(request):
+                response = view_func(request, *args, **kwargs)
+                if hasattr(response, "render"):
+                    response = response.render()
+                return response
+    return wrapper
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return REPLICA if using_replica() else None
+
+    def db_for_write(self, model, **hints):
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        # The replica gets its schema with its data, from sync_replica.
+        return False if db == REPLICA else None
+
+
+class PinPrimaryMiddleware(MiddlewareMixin):
+    def __init__(self, get_response):
+        if not is_configured():
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def process_response(self, request, response):
+        if request.method not in READ_METHODS:
+            response.set_cookie(
+                PIN_COOKIE,
+                "1",
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
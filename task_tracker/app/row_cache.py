@@ -0,0 +1,71 @@
+"""Rendered rows of ``task_list.html``, cached per task.
+
+Each entry is keyed on the task id and remembers the ``updated_at`` it
+was rendered from; it is only reused while that still matches, so every
+change that bumps the timestamp (see ``app.conditional``) also retires
+the row. Saving or deleting a task drops its entry straight away.
+
+A page is read with one ``get_many`` and its misses written back with
+one ``set_many``.
+"""
+from django.core.cache import caches
+from django.db.models import Prefetch
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.template.loader import get_template
+from django.utils.safestring import mark_safe
+
+from .models import Task, Worker
+
+CACHE_ALIAS = "task_rows"
+TEMPLATE_NAME = "includes/task_row.html"
+
+
+def get_cache():
+    return caches[CACHE_ALIAS]
+
+
+def cache_key(pk):
+    return f"task-row:{pk}"
+
+
+def with_row_data(queryset):
+    """Load along with each task what its row renders."""
+    # The row only shows the assignees' pk and username, so the prefetch
+    # skips the rest of the (wide) user row.
+    return queryset.select_related("task_type").prefetch_related(
+        Prefetch("assignees", queryset=Worker.objects.only("id", "username"))
+    )
+
+
+def rendered_rows(tasks):
+    """The row of each task in ``tasks``, in order."""
+    cache = get_cache()
+    keys = [cache_key(task.pk) for task in tasks]
+    cached = cache.get_many(keys)
+
+    template = get_template(TEMPLATE_NAME)
+    rows, misses = [], {}
+    for key, task in zip(keys, tasks):
+        version = task.updated_at.isoformat()
+        entry = cached.get(key)
+        if entry is not None and entry[0] == version:
+            rows.append(entry[1])
+            continue
+        html = template.render({"task": task})
+        misses[key] = (version, html)
+        rows.append(html)
+
+    if misses:
+        cache.set_many(misses)
+    return rows
+
+
+def render_rows(tasks):
+    return mark_safe("".join(rendered_rows(tasks)))
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def forget_row(sender, instance, **kwargs):
+    get_cache().delete(cache_key(instance.pk))
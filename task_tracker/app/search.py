@@ -0,0 +1,186 @@
+"""Full-text search over ``Task.name`` and ``Task.description``.
+
+On SQLite this is backed by the ``app_task_fts`` FTS5 table created in
+migration 0004 and kept in sync with ``app_task`` by triggers; archived
+tasks have their own ``app_archivedtask_fts`` (migration 0010). Other
+backends fall back to ``icontains``.
+
+Note that Django rebuilds a SQLite table for some ``ALTER`` operations,
+which drops its triggers: any migration that remakes ``app_task`` has to
+recreate them and rebuild the index. It keeps its own copy of
+``FTS_TRIGGERS_SQL``: importing this module would change the migration
+whenever the module does.
+"""
+from collections import namedtuple
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import ArchivedTask, Task
+
+# Private-use markers survive escape() untouched and never occur in
+# normal text, so they can be swapped for <mark> after escaping.
+_START, _END = "\ue000", "\ue001"
+
+SearchResult = namedtuple(
+    "SearchResult", ("id", "name", "snippet", "archived"), defaults=(False,)
+)
+
+FTS_TRIGGERS_SQL = (
+    """
+    CREATE TRIGGER IF NOT EXISTS app_task_fts_ai AFTER INSERT ON app_task
+    BEGIN
+        INSERT INTO app_task_fts(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS app_task_fts_ad AFTER DELETE ON app_task
+    BEGIN
+        INSERT INTO app_task_fts(app_task_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS app_task_fts_au
+    AFTER UPDATE OF name, description ON app_task
+    BEGIN
+        INSERT INTO app_task_fts(app_task_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO app_task_fts(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+)
+
+
+def uses_fts():
+    return connection.vendor == "sqlite"
+
+
+def fts_table(model):
+    return f"{model._meta.db_table}_fts"
+
+
+def search_terms(text):
+    """The whitespace-separated terms of ``text`` that hold a letter or a
+    digit. The tokenizer reduces any other (``-``, ``&``, ``...``) to
+    nothing, which matches no row and would empty the whole search."""
+    return [
+        term for term in text.split() if any(c.isalnum() for c in term)
+    ]
+
+
+def to_match_query(text):
+    """Turn free user input into a safe FTS5 MATCH expression.
+
+    Every term is quoted (so ``AND``, ``-`` or a stray ``"`` are never
+    parsed as syntax) and prefix-matched; terms are ANDed.
+    """
+    terms = [
+        '"{}"*'.format(term.replace('"', '""'))
+        for term in search_terms(text)
+    ]
+    return " ".join(terms)
+
+
+def filter_tasks(queryset, text):
+    """Restrict a ``Task`` or ``ArchivedTask`` queryset to rows matching
+    ``text``."""
+    match = to_match_query(text)
+    if not match:
+        return queryset
+
+    if not uses_fts():
+        for term in search_terms(text):
+            queryset = queryset.filter(
+                Q(name__icontains=term) | Q(description__icontains=term)
+            )
+        return queryset
+
+    table = fts_table(queryset.model)
+    return queryset.filter(
+        id__in=RawSQL(
+            f"SELECT rowid FROM {table} WHERE {table} MATCH %s", (match,)
+        )
+    )
+
+
+def _mark(fragment):
+    return mark_safe(
+        escape(fragment)
+        .replace(_START, "<mark>")
+        .replace(_END, "</mark>")
+    )
+
+
+def search_tasks(text, limit=50, include_archived=False):
+    """Return up to ``limit`` ``SearchResult``s, best match first.
+
+    ``name`` and ``snippet`` are escaped, with the matched terms wrapped in
+    ``<mark>``, and marked safe for the template. With
+    ``include_archived``, archived tasks are ranked alongside the others.
+    """
+    match = to_match_query(text)
+    if not match:
+        return []
+    models = (Task, ArchivedTask) if include_archived else (Task,)
+
+    if not uses_fts():
+        results = []
+        for model in models:
+            rows = filter_tasks(model.objects.all(), text).values_list(
+                "id", "name", "description"
+            )[:limit - len(results)]
+            results += [
+                SearchResult(
+                    pk,
+                    escape(name),
+                    escape(description[:120]),
+                    model is ArchivedTask,
+                )
+                for pk, name, description in rows
+            ]
+        return results
+
+    selects = []
+    for model in models:
+        table = fts_table(model)
+        selects.append(f"""
+            SELECT rowid,
+                   highlight({table}, 0, %s, %s),
+                   snippet({table}, 1, %s, %s, '…', 16),
+                   {int(model is ArchivedTask)},
+                   rank
+            FROM {table}
+            WHERE {table} MATCH %s
+        """)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            " UNION ALL ".join(selects) + " ORDER BY 5 LIMIT %s",
+            (_START, _END, _START, _END, match) * len(models) + (limit,),
+        )
+        return [
+            SearchResult(pk, _mark(name), _mark(snippet), bool(archived))
+            for pk, name, snippet, archived, rank in cursor.fetchall()
+        ]
+
+
+def rebuild():
+    """Repopulate the FTS indexes from ``app_task`` and
+    ``app_archivedtask`` in one pass each."""
+    if not uses_fts():
+        return
+    with connection.cursor() as cursor:
+        for sql in FTS_TRIGGERS_SQL:
+            cursor.execute(sql)
+        for table in (fts_table(Task), fts_table(ArchivedTask)):
+            cursor.execute(
+                f"INSERT INTO {table}({table}) VALUES ('rebuild')"
+            )
+            cursor.execute(
+                f"INSERT INTO {table}({table}) VALUES ('optimize')"
+            )
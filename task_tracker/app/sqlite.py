@@ -0,0 +1,21 @@
+"""Per-connection SQLite tuning (the ``SQLITE_PRAGMAS`` setting).
+
+SQLite keeps most settings per connection, so they are applied as each
+connection opens. ``journal_mode=WAL`` is the exception: it is stored in
+the database file, and once set it stays on for every later connection.
+"""
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+def apply_pragmas(connection, pragmas):
+    """Run ``PRAGMA name = value`` for each item on a raw connection."""
+    for name, value in pragmas.items():
+        connection.execute(f"PRAGMA {name} = {value}").fetchall()
+
+
+@receiver(connection_created)
+def tune_sqlite_connection(sender, connection, **kwargs):
+    if connection.vendor == "sqlite" and settings.SQLITE_PRAGMAS:
+        apply_pragmas(connection.connection, settings.SQLITE_PRAGMAS)
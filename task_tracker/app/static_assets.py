@@ -0,0 +1,200 @@
+"""Content-hashed, pre-compressed static files, served by Django itself.
+
+``collectstatic`` with ``CompressedManifestStaticFilesStorage`` copies
+each file under a name carrying a hash of its content
+(``css/style.3f2a9c1b.css``) and writes ``.gz`` and, when the Brotli
+package is installed, ``.br`` variants next to it. As a hashed name
+changes whenever its content does, browsers may keep those files for a
+year without asking again.
+
+``StaticFilesMiddleware`` (``SERVE_STATIC``) serves ``STATIC_ROOT``
+without a separate web server, under WSGI and ASGI alike. It looks the
+request up in an index of the collected files built at start-up, picks
+the smallest encoding the client accepts and answers before the session
+and authentication middleware run.
+"""
+import gzip
+import mimetypes
+import os
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.staticfiles.storage import (
+    ManifestStaticFilesStorage,
+    staticfiles_storage,
+)
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Already compressed formats gain nothing from another pass.
+COMPRESSIBLE = (
+    ".css", ".js", ".mjs", ".map", ".json", ".svg", ".txt", ".html",
+    ".xml", ".ico", ".ttf", ".otf", ".eot",
+)
+# (suffix, Content-Encoding), best first.
+ENCODINGS = ((".br", "br"), (".gz", "gzip"))
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+def compress(path):
+    """Write ``path.gz`` (and ``path.br``) where they are smaller."""
+    data = path.read_bytes()
+    variants = {".gz": gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants[".br"] = brotli.compress(data)
+    for suffix, compressed in variants.items():
+        target = path.with_name(path.name + suffix)
+        if len(compressed) < len(data) * 0.95:
+            target.write_bytes(compressed)
+        else:
+            target.unlink(missing_ok=True)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Manifest storage that also writes compressed copies of text files.
+
+    Names missing from the manifest, such as under the test runner where
+    ``collectstatic`` never ran, are served unhashed instead of raising.
+    """
+    manifest_strict = False
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        names = {*self.hashed_files, *self.hashed_files.values()}
+        for name in sorted(names):
+            if name.endswith(COMPRESSIBLE) and self.exists(name):
+                compress(Path(self.path(name)))
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
+
+
+class StaticFile:
+    def __init__(self, path, hashed):
+        self.path = path
+        self.hashed = hashed
+        stat = path.stat()
+        self.last_modified = int(stat.st_mtime)
+        self.content_type = (
+            mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        )
+        # Content-Encoding -> path, best first, then the file itself.
+        self.variants = [
+            (encoding, path.with_name(path.name + suffix))
+            for suffix, encoding in ENCODINGS
+            if path.with_name(path.name + suffix).exists()
+        ]
+
+    def choose(self, accept_encoding):
+        accepted = accepted_encodings(accept_encoding)
+        for encoding, path in self.variants:
+            if encoding in accepted:
+                return encoding, path
+        return None, self.path
+
+
+def accepted_encodings(header):
+    """The content codings an ``Accept-Encoding`` header allows: those
+    listed without ``q=0``, and ``*`` standing for any not listed."""
+    qvalues = {}
+    for token in header.split(","):
+        coding, *params = (part.strip() for part in token.split(";"))
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding:
+            qvalues[coding.lower()] = q
+    wildcard = qvalues.pop("*", 0.0)
+    return {
+        coding for _, coding in ENCODINGS
+        if qvalues.get(coding, wildcard) > 0
+    }
+
+
+def build_index(root, url):
+    """URL path -> ``StaticFile`` for every file collected in ``root``."""
+    hashed = set(getattr(staticfiles_storage, "hashed_files", {}).values())
+    index = {}
+    for directory, _, files in os.walk(root):
+        for filename in files:
+            if filename.endswith(tuple(s for s, _ in ENCODINGS)):
+                continue
+            path = Path(directory, filename)
+            name = path.relative_to(root).as_posix()
+            index[url + name] = StaticFile(path, name in hashed)
+    return index
+
+
+class StaticFilesMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.SERVE_STATIC or not settings.STATIC_ROOT:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        self.files = build_index(settings.STATIC_ROOT, settings.STATIC_URL)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        response = self.serve(request)
+        return response or self.get_response(request)
+
+    async def __acall__(self, request):
+        # Reading a small asset is quicker than a hop to a thread.
+        response = self.serve(request)
+        return response or await self.get_response(request)
+
+    def serve(self, request):
+        if request.method not in ("GET", "HEAD"):
+            return None
+        static_file = self.files.get(request.path)
+        if static_file is None:
+            return None
+
+        response = get_conditional_response(
+            request, last_modified=static_file.last_modified
+        )
+        if response is None:
+            encoding, path = static_file.choose(
+                request.headers.get("accept-encoding", "")
+            )
+            response = HttpResponse(
+                b"" if request.method == "HEAD" else path.read_bytes(),
+                content_type=static_file.content_type,
+            )
+            response["Content-Length"] = path.stat().st_size
+            if encoding:
+                response["Content-Encoding"] = encoding
+
+        response["Last-Modified"] = http_date(static_file.last_modified)
+        response["Cache-Control"] = (
+            IMMUTABLE if static_file.hashed
+            else f"public, max-age={settings.STATIC_MAX_AGE}"
+        )
+        if static_file.variants:
+            patch_vary_headers(response, ("Accept-Encoding",))
+        return response
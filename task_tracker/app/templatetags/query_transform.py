@@ -6,9 +6,15 @@ register = template.Library()
 
 @register.simple_tag
 def query_transform(request, **kwargs):
-    pass
-# def query_transform(request, **kwargs):
-#     updated = request.GET.copy()
-#     for k, v in kwargs.items():
-#         updated[k] = v
-#     return updated.urlencode()
+    """Return the current query string with ``kwargs`` replaced.
+
+    Keeps any filters already in the URL so pagination links carry them
+    over; a value of ``None`` drops that key instead.
+    """
+    updated = request.GET.copy()
+    for k, v in kwargs.items():
+        if v is None:
+            updated.pop(k, None)
+        else:
+            updated[k] = v
+    return updated.urlencode()
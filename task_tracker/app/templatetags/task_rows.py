@@ -0,0 +1,12 @@
+from django import template
+
+from app import row_cache
+
+
+register = template.Library()
+
+
+@register.simple_tag
+def task_rows(tasks):
+    """Render the task list rows, reusing the cached ones."""
+    return row_cache.render_rows(tasks)
@@ -1,78 +1,1796 @@
-from django.test import TestCase
-from django.urls import reverse
+import asyncio
+import csv
+import gzip
+import importlib
+import json
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.db.models.functions import Lower
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.template import Context, Template
+from django.test import (
+    AsyncRequestFactory,
+    RequestFactory,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import clear_url_caches, reverse
 from django.contrib.auth import get_user_model
 from django.utils import timezone
+from task_tracker import asgi
+
+from .forms import WorkerCreationForm, WorkerUpdateForm, TaskFilterForm
+from . import (
+    async_views,
+    backends,
+    bulk,
+    changes,
+    counters,
+    export,
+    jobs,
+    live,
+    middleware,
+    replica,
+    row_cache,
+    search,
+    urls,
+    views,
+)
+from .models import (
+    ArchivedTask, Change, Counter, Job, Task, TaskType, Position,
+)
+from .pagination import CursorPaginator, EstimatedCountPaginator
+from .templatetags.query_transform import query_transform
 
-from .forms import WorkerCreationForm, WorkerUpdateForm
-from .models import Task, TaskType, Position
 
+User = get_user_model()
+
+
+class ModelStrTests(TestCase):
+
+    def test_task_type_str(self):
+        task_type = TaskType.objects.create(name="Bug")
+        self.assertEqual(str(task_type), "Bug")
+
+    def test_position_str(self):
+        position = Position.objects.create(name="Developer")
+        self.assertEqual(str(position), "Developer")
+
+
+class TaskModelTests(TestCase):
+
+    def test_task_assignees(self):
+        user = User.objects.create_user(
+            username="john",
+            password="pass"
+        )
+
+        task_type = TaskType.objects.create(name="Feature")
+
+        task = Task.objects.create(
+            name="Implement login",
+            deadline=timezone.now(),
+            task_type=task_type
+        )
+
+        task.assignees.add(user)
+
+        self.assertIn(user, task.assignees.all())
+        self.assertIn(task, user.assigned_tasks.all())
+
+
+# The auth cache of a deployment that shares one (AUTH_CACHE_DIR): a
+# request then loads neither its session nor its user.
+shared_auth_cache = override_settings(
+    AUTHENTICATION_BACKENDS=["app.backends.CachedModelBackend"],
+    SESSION_ENGINE="django.contrib.sessions.backends.cached_db",
+    SESSION_CACHE_ALIAS="auth",
+)
+
+
+class BaseViewTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username="testuser",
+            password="password"
+        )
+
+    def setUp(self):
+        self.client.login(username="testuser", password="password")
+
+
+class IndexViewTests(BaseViewTest):
+
+    def test_index_context(self):
+        response = self.client.get(reverse("app:index"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("num_tasks", response.context)
+        self.assertIn("num_workers", response.context)
+
+
+class CounterTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def assertCountersAccurate(self):
+        counts = counters.get_counts()
+        del counts["overdue"]
+        self.assertEqual(counts, counters.compute())
+
+    def test_task_lifecycle(self):
+        worker = User.objects.create_user(username="worker")
+        task = Task.objects.create(name="Task", deadline=timezone.now())
+        task.assignees.add(worker)
+        self.assertCountersAccurate()
+
+        task.is_complete = True
+        task.priority = "HIGH"
+        task.save()
+        self.assertCountersAccurate()
+
+        reloaded = Task.objects.only("id", "name").get(pk=task.pk)
+        reloaded.is_complete = False
+        reloaded.save()
+        self.assertCountersAccurate()
+
+        task.delete()
+        self.assertCountersAccurate()
+        self.assertEqual(counters.get_counts()[counters.TASKS], 0)
+
+    def test_assignment_changes(self):
+        workers = [
+            User.objects.create_user(username=f"worker{i}") for i in range(3)
+        ]
+        task = Task.objects.create(name="Task", deadline=timezone.now())
+
+        task.assignees.set(workers)
+        task.assignees.add(workers[0])
+        self.assertCountersAccurate()
+
+        task.assignees.remove(workers[0], workers[0].pk + 100)
+        self.assertCountersAccurate()
+
+        workers[1].assigned_tasks.clear()
+        self.assertCountersAccurate()
+
+        workers[2].delete()
+        self.assertCountersAccurate()
+        self.assertEqual(counters.get_counts()[counters.ASSIGNMENTS], 0)
+
+    def test_overdue(self):
+        Task.objects.create(
+            name="Late", deadline=timezone.now() - timedelta(hours=1)
+        )
+        Task.objects.create(
+            name="Done",
+            deadline=timezone.now() - timedelta(hours=1),
+            is_complete=True,
+        )
+
+        self.assertEqual(counters.get_counts()["overdue"], 1)
+
+    def test_recount_repairs_drift(self):
+        Task.objects.create(name="Task", deadline=timezone.now())
+        Task.objects.update(is_complete=True)
+
+        out = StringIO()
+        call_command("recount", stdout=out)
+
+        self.assertIn("tasks_complete: 0 -> 1", out.getvalue())
+        self.assertCountersAccurate()
+
+    def test_missing_counter_is_left_to_recount(self):
+        Counter.objects.filter(name=counters.WORKERS).delete()
+
+        with self.assertLogs("app.counters", "WARNING") as logs, \
+                self.assertNumQueries(2):
+            counters.adjust({counters.WORKERS: 1, counters.TASKS: 1})
+
+        self.assertIn("Counters workers are missing", logs.output[0])
+        self.assertFalse(
+            Counter.objects.filter(name=counters.WORKERS).exists()
+        )
+        call_command("recount", stdout=StringIO())
+        self.assertCountersAccurate()
+
+
+@shared_auth_cache
+class IndexViewQueryCountTests(BaseViewTest):
+
+    def test_index_does_not_count_tables(self):
+        for i in range(5):
+            Task.objects.create(name=f"Task {i}", deadline=timezone.now())
+        counters.overdue_count()
+
+        # user (then cached) + counters; overdue comes from the cache
+        with self.assertNumQueries(2):
+            self.client.get(reverse("app:index"))
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("app:index"))
+
+        self.assertEqual(response.context["num_tasks"], 5)
+        self.assertEqual(response.context["num_workers"], 1)
+
+
+class TaskListViewTests(BaseViewTest):
+
+    def test_task_list_view(self):
+        response = self.client.get(reverse("app:tasks"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context["object_list"]), 0)
+
+
+@shared_auth_cache
+class TaskListQueryCountTests(BaseViewTest):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.task_type = TaskType.objects.create(name="Bug")
+        cls.workers = [
+            User.objects.create(username=f"assignee{i}") for i in range(3)
+        ]
+
+    def create_tasks(self, count):
+        for i in range(count):
+            task = Task.objects.create(
+                name=f"Task {i}",
+                deadline=timezone.now(),
+                task_type=self.task_type,
+            )
+            task.assignees.set(self.workers)
+
+    def test_task_list_query_count_is_constant(self):
+        # ETag (latest updated_at, feed cursor) + tasks (joined with task
+        # type) + assignees + task types for the ETag and the forms; the
+        # session and the user come from the cache after the first request
+        self.create_tasks(1)
+        self.client.get(reverse("app:tasks"))
+        with self.assertNumQueries(5):
+            self.client.get(reverse("app:tasks"))
+
+        self.create_tasks(10)
+        with self.assertNumQueries(5):
+            response = self.client.get(reverse("app:tasks"))
+
+        self.assertContains(response, "assignee2")
+
+
+class TaskRowCacheTests(BaseViewTest):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.task_type = TaskType.objects.create(name="Bug")
+        cls.task = Task.objects.create(
+            name="Cached", deadline=timezone.now(), task_type=cls.task_type
+        )
+
+    def setUp(self):
+        super().setUp()
+        row_cache.get_cache().clear()
+
+    def cached_entry(self):
+        return row_cache.get_cache().get(row_cache.cache_key(self.task.pk))
+
+    def test_reuses_rows_of_the_same_version(self):
+        self.client.get(reverse("app:tasks"))
+        version, html = self.cached_entry()
+        self.assertIn("Cached", html)
+
+        key = row_cache.cache_key(self.task.pk)
+        row_cache.get_cache().set(key, (version, "<tr>From cache</tr>"))
+        response = self.client.get(reverse("app:tasks"))
+
+        self.assertContains(response, "From cache")
+
+    def test_save_invalidates_row(self):
+        self.client.get(reverse("app:tasks"))
+
+        self.task.name = "Renamed"
+        self.task.save()
+        self.assertIsNone(self.cached_entry())
+
+        self.assertContains(self.client.get(reverse("app:tasks")), "Renamed")
+
+    def test_related_rename_retires_row(self):
+        self.client.get(reverse("app:tasks"))
+
+        self.task_type.name = "Defect"
+        self.task_type.save()
+
+        self.assertContains(self.client.get(reverse("app:tasks")), "Defect")
+
+
+class CursorPaginatorTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        # Pairs of tasks share a deadline so the id tie-breaker matters.
+        for i in range(7):
+            Task.objects.create(
+                name=f"Task {i}",
+                deadline=now + timedelta(days=i // 2),
+            )
+        cls.expected = list(
+            Task.objects.order_by("deadline", "id").values_list(
+                "id", flat=True
+            )
+        )
+
+    def test_walks_forward_and_back(self):
+        paginator = CursorPaginator(
+            Task.objects.all(), 3, ("deadline", "id")
+        )
+
+        first = paginator.page()
+        second = paginator.page(first.next_cursor)
+        third = paginator.page(second.next_cursor)
+
+        self.assertFalse(first.has_previous())
+        self.assertFalse(third.has_next())
+        self.assertEqual(
+            [t.id for page in (first, second, third) for t in page],
+            self.expected,
+        )
+
+        back = paginator.page(third.previous_cursor)
+        self.assertEqual([t.id for t in back], self.expected[3:6])
+        self.assertEqual(
+            [t.id for t in paginator.page(back.previous_cursor)],
+            self.expected[:3],
+        )
+
+    def test_descending_ordering(self):
+        paginator = CursorPaginator(Task.objects.all(), 4, ("-deadline",))
+
+        first = paginator.page()
+        second = paginator.page(first.next_cursor)
+
+        self.assertEqual(
+            [t.id for t in first] + [t.id for t in second],
+            list(
+                Task.objects.order_by("-deadline", "id").values_list(
+                    "id", flat=True
+                )
+            ),
+        )
+
+    def test_page_does_not_count(self):
+        paginator = CursorPaginator(Task.objects.all(), 3, ("deadline",))
+
+        with self.assertNumQueries(1):
+            paginator.page()
+
+
+class TaskListPaginationTests(BaseViewTest):
+
+    def test_invalid_cursor_returns_404(self):
+        response = self.client.get(reverse("app:tasks"), {"cursor": "nope"})
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_next_link_keeps_query_string(self):
+        for i in range(25):
+            Task.objects.create(name=f"Task {i}", deadline=timezone.now())
+
+        response = self.client.get(reverse("app:tasks"), {"foo": "bar"})
+
+        self.assertEqual(len(response.context["object_list"]), 20)
+        self.assertContains(response, "foo=bar&amp;cursor=")
+
+
+class TaskFilterTests(BaseViewTest):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        now = timezone.now()
+        cls.bug = TaskType.objects.create(name="Bug")
+        cls.overdue = Task.objects.create(
+            name="Overdue",
+            deadline=now - timedelta(days=1),
+            priority="HIGH",
+            task_type=cls.bug,
+        )
+        cls.overdue.assignees.add(cls.user)
+        cls.done = Task.objects.create(
+            name="Done",
+            deadline=now - timedelta(days=2),
+            priority="HIGH",
+            is_complete=True,
+        )
+        cls.later = Task.objects.create(
+            name="Later",
+            deadline=now + timedelta(days=3),
+            priority="LOW",
+            task_type=cls.bug,
+        )
+
+    def get_tasks(self, **params):
+        response = self.client.get(reverse("app:tasks"), params)
+        return list(response.context["object_list"])
+
+    def test_overdue_high_priority_open_tasks(self):
+        self.assertEqual(
+            self.get_tasks(
+                status="open",
+                priority="HIGH",
+                deadline_before=timezone.now().isoformat(),
+            ),
+            [self.overdue],
+        )
+
+    def test_filter_by_type_and_assignee(self):
+        self.assertEqual(
+            self.get_tasks(type=self.bug.pk),
+            [self.overdue, self.later],
+        )
+        self.assertEqual(
+            self.get_tasks(assignee=self.user.username),
+            [self.overdue],
+        )
+
+    def test_ordering(self):
+        self.assertEqual(
+            self.get_tasks(ordering="-deadline"),
+            [self.later, self.overdue, self.done],
+        )
+
+    def test_invalid_value_is_ignored(self):
+        self.assertEqual(
+            self.get_tasks(status="complete", priority="URGENT"),
+            [self.done],
+        )
+        self.assertEqual(
+            self.get_tasks(ordering="name", priority="URGENT"),
+            [self.done, self.later, self.overdue],
+        )
+
+
+class TaskFilterQueryPlanTests(TestCase):
+    """The common task list filters must be served by an index."""
+
+    COMBINATIONS = (
+        {},
+        {"status": "open"},
+        {"status": "open", "deadline_before": "2030-01-01"},
+        {"priority": "HIGH"},
+        {"priority": "HIGH", "ordering": "-deadline"},
+        {"ordering": "name"},
+        {"ordering": "-name"},
+        {"status": "open", "priority": "HIGH"},
+        {"type": "1"},
+        {"assignee": "testuser"},
+        {"deadline_after": "2030-01-01", "deadline_before": "2031-01-01"},
+    )
+
+    @classmethod
+    def setUpTestData(cls):
+        TaskType.objects.create(pk=1, name="Bug")
+
+    def test_filters_never_scan_task_table(self):
+        for params in self.COMBINATIONS:
+            with self.subTest(params=params):
+                form = TaskFilterForm(params)
+                queryset = form.filter(Task.objects.all()).order_by(
+                    *form.get_ordering(), "pk"
+                )
+                plan = queryset[:21].explain()
+
+                self.assertIn("INDEX", plan)
+                self.assertNotRegex(plan, r"SCAN app_task\b(?! USING)")
+
+
+class WorkerTasksQueryPlanTests(BaseViewTest):
+    """The worker page's tasks are the worker's assignments, sorted."""
+
+    def test_tasks_page_reads_only_the_workers_assignments(self):
+        task = Task.objects.create(name="Task", deadline=timezone.now())
+        task.assignees.add(self.user)
+        view = views.WorkerDetailView(kwargs={"pk": self.user.pk})
+        view.object = self.user
+        paginator = view.get_tasks_paginator()
+        cursor = paginator.encode_cursor(task, reverse=False)
+
+        for page in (None, cursor):
+            with self.subTest(page=page), \
+                    CaptureQueriesContext(connection) as queries:
+                paginator.page(page)
+                with connection.cursor() as db:
+                    db.execute("EXPLAIN QUERY PLAN " + queries[0]["sql"])
+                    plan = str(db.fetchall())
+
+                self.assertIn(
+                    "SEARCH app_task_assignees USING COVERING INDEX "
+                    "app_task_assignees_worker_task_idx (worker_id=?)",
+                    plan,
+                )
+                self.assertIn(
+                    "SEARCH app_task USING INTEGER PRIMARY KEY", plan
+                )
+                # No index orders them: deadline lives on app_task.
+                self.assertIn("USE TEMP B-TREE FOR ORDER BY", plan)
+
+
+class TaskSearchTests(BaseViewTest):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.login = Task.objects.create(
+            name="Fix login redirect",
+            description="The login page loops after <b>logout</b>.",
+            deadline=timezone.now(),
+        )
+        cls.report = Task.objects.create(
+            name="Quarterly report",
+            description="Mention the login outage once.",
+            deadline=timezone.now(),
+        )
+
+    def test_ranked_and_highlighted(self):
+        results = search.search_tasks("login")
+
+        self.assertEqual(
+            [r.id for r in results], [self.login.pk, self.report.pk]
+        )
+        self.assertEqual(results[0].name, "Fix <mark>login</mark> redirect")
+        self.assertIn("&lt;b&gt;logout&lt;/b&gt;", results[0].snippet)
+
+    def test_prefix_match_and_syntax_is_not_parsed(self):
+        self.assertEqual(
+            [r.id for r in search.search_tasks('quart "AND')],
+            [],
+        )
+        self.assertEqual(
+            [r.id for r in search.search_tasks("quart")],
+            [self.report.pk],
+        )
+
+    def test_terms_without_letters_or_digits_are_ignored(self):
+        self.assertEqual(
+            [r.id for r in search.search_tasks("report - & ...")],
+            [self.report.pk],
+        )
+        self.assertEqual(search.to_match_query("- ..."), "")
+
+    def test_index_follows_updates_and_deletes(self):
+        self.report.name = "Annual summary"
+        self.report.description = ""
+        self.report.save()
+        self.login.delete()
+
+        self.assertEqual(search.search_tasks("login"), [])
+        self.assertEqual(
+            [r.id for r in search.search_tasks("annual")], [self.report.pk]
+        )
+
+    def test_task_list_q_parameter(self):
+        response = self.client.get(reverse("app:tasks"), {"q": "redirect"})
+
+        self.assertEqual(list(response.context["object_list"]), [self.login])
+
+    def test_search_view(self):
+        response = self.client.get(
+            reverse("app:tasks-search"), {"q": "outage"}
+        )
+
+        self.assertContains(response, "<mark>outage</mark>")
+
+    def test_rebuild_command(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO app_task_fts(app_task_fts) VALUES ('delete-all')"
+            )
+        self.assertEqual(search.search_tasks("login"), [])
+
+        call_command("rebuild_task_search", stdout=StringIO())
+
+        self.assertEqual(len(search.search_tasks("login")), 2)
+
+
+class TaskExportTests(BaseViewTest):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        bug = TaskType.objects.create(name="Bug")
+        for i in range(5):
+            task = Task.objects.create(
+                name=f"Task {i}",
+                description="Line one,\nline two",
+                deadline=timezone.now() + timedelta(days=i),
+                priority="HIGH" if i % 2 else "LOW",
+                task_type=bug,
+            )
+            task.assignees.add(cls.user)
+
+    def read(self, response):
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content).decode()
+
+    def test_csv_applies_filters(self):
+        response = self.client.get(
+            reverse("app:tasks-export-csv"), {"priority": "HIGH"}
+        )
+        rows = list(csv.DictReader(self.read(response).splitlines(True)))
+
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertEqual([row["name"] for row in rows], ["Task 1", "Task 3"])
+        self.assertEqual(rows[0]["description"], "Line one,\nline two")
+        self.assertEqual(rows[0]["assignees"], "testuser")
+        self.assertEqual(rows[0]["task_type"], "Bug")
+
+    def test_ndjson(self):
+        response = self.client.get(
+            reverse("app:tasks-export-ndjson"), {"ordering": "-deadline"}
+        )
+        records = [
+            json.loads(line) for line in self.read(response).splitlines()
+        ]
+
+        self.assertEqual(len(records), 5)
+        self.assertEqual(records[0]["name"], "Task 4")
+        self.assertEqual(records[0]["assignees"], ["testuser"])
+
+    def test_one_prefetch_per_chunk(self):
+        queryset = export.export_queryset(Task.objects.order_by("pk"))
+
+        # Main query plus one assignee prefetch for each of 3 chunks.
+        with self.assertNumQueries(4):
+            records = list(export.iter_records(queryset, chunk_size=2))
+
+        self.assertEqual(len(records), 5)
+
+
+class ImportTasksTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = User.objects.create_user(username="alice")
+        cls.bob = User.objects.create_user(username="bob")
+        TaskType.objects.create(name="Bug")
+
+    def setUp(self):
+        cache.clear()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def write(self, name, content):
+        path = Path(self.tmp.name) / name
+        path.write_text(content, encoding="utf-8")
+        return str(path)
+
+    def import_tasks(self, path, *args):
+        out, err = StringIO(), StringIO()
+        call_command("import_tasks", path, *args, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def test_csv_import(self):
+        path = self.write("tasks.csv", (
+            "name,description,deadline,is_complete,priority,task_type,"
+            "assignees\n"
+            "Fix login,Broken form,2030-01-02T10:00:00+00:00,false,HIGH,"
+            "Bug,alice;bob\n"
+            "Write docs,,2030-01-03,true,low,Docs,\n"
+            ",missing name,2030-01-03,,,,\n"
+            "Deploy,,2030-01-04,,,,carol\n"
+        ))
+
+        out, err = self.import_tasks(path, "--batch-size", "2")
+
+        self.assertIn("Imported 2 tasks, skipped 2 rows.", out)
+        self.assertIn("Row 3: missing name", err)
+        self.assertIn("Row 4: unknown assignee 'carol'", err)
+
+        task = Task.objects.get(name="Fix login")
+        self.assertEqual(task.task_type.name, "Bug")
+        self.assertEqual(
+            set(task.assignees.all()), {self.alice, self.bob}
+        )
+        docs = Task.objects.get(name="Write docs")
+        self.assertTrue(docs.is_complete)
+        self.assertEqual(docs.priority, "LOW")
+        self.assertEqual(docs.task_type.name, "Docs")
+
+        counts = counters.get_counts()
+        del counts["overdue"]
+        self.assertEqual(counts, counters.compute())
+        self.assertEqual(
+            [r.id for r in search.search_tasks("broken")], [task.pk]
+        )
+        self.assertEqual(
+            list(Change.objects.filter(model="task").values_list(
+                "object_id", "action", "data"
+            )),
+            [
+                (task.pk, "created", mock.ANY),
+                (docs.pk, "created", mock.ANY),
+                (task.pk, "assignees", {
+                    "assignees": sorted([self.alice.pk, self.bob.pk]),
+                }),
+            ],
+        )
+
+    def test_jsonl_import(self):
+        path = self.write("tasks.jsonl", "\n".join(
+            json.dumps({
+                "name": f"Task {i}",
+                "deadline": "2030-01-01T00:00:00Z",
+                "is_complete": i % 2 == 0,
+                "assignees": ["alice"],
+            })
+            for i in range(5)
+        ))
+
+        self.import_tasks(path)
+
+        self.assertEqual(self.alice.assigned_tasks.count(), 5)
+        self.assertEqual(Task.objects.filter(is_complete=True).count(), 3)
+
+    def test_impossible_deadline_skips_only_its_row(self):
+        path = self.write("tasks.csv", (
+            "name,deadline\n"
+            "Before,2030-01-02\n"
+            "Bad month,2024-13-45\n"
+            "Bad day,2024-02-30T10:00\n"
+            "After,2030-01-03\n"
+        ))
+
+        out, err = self.import_tasks(path)
+
+        self.assertIn("Imported 2 tasks, skipped 2 rows.", out)
+        self.assertIn("Row 2: invalid deadline '2024-13-45'", err)
+        self.assertIn("Row 3: invalid deadline '2024-02-30T10:00'", err)
+        self.assertEqual(
+            set(Task.objects.values_list("name", flat=True)),
+            {"Before", "After"},
+        )
+
+    def test_unknown_format(self):
+        with self.assertRaises(CommandError):
+            self.import_tasks(self.write("tasks.txt", ""))
+
+
+class TaskBulkActionTests(BaseViewTest):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.worker = User.objects.create_user(username="bulkworker")
+        for i in range(6):
+            task = Task.objects.create(
+                name=f"Task {i}",
+                deadline=timezone.now() + timedelta(days=i),
+                priority="HIGH" if i % 2 else "LOW",
+            )
+            task.assignees.add(cls.user)
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def post(self, data, query=""):
+        return self.client.post(f"{reverse('app:tasks-bulk')}{query}", data)
+
+    def assertCountersAccurate(self):
+        counts = counters.get_counts()
+        del counts["overdue"]
+        self.assertEqual(counts, counters.compute())
+
+    def test_complete_selected(self):
+        ids = list(Task.objects.values_list("pk", flat=True)[:2])
+
+        response = self.post({
+            "action": "complete", "scope": "selected", "ids": ids,
+        }, "?priority=LOW&cursor=abc")
+
+        self.assertRedirects(
+            response, f"{reverse('app:tasks')}?priority=LOW",
+            fetch_redirect_response=False,
+        )
+        self.assertEqual(
+            set(Task.objects.filter(is_complete=True).values_list(
+                "pk", flat=True
+            )),
+            set(ids),
+        )
+        self.assertCountersAccurate()
+
+    def test_priority_for_filter(self):
+        self.post(
+            {"action": "priority", "scope": "filter", "priority": "MEDIUM"},
+            "?priority=HIGH",
+        )
+
+        self.assertEqual(Task.objects.filter(priority="MEDIUM").count(), 3)
+        self.assertEqual(Task.objects.filter(priority="HIGH").count(), 0)
+        self.assertCountersAccurate()
+
+    def test_reassign_for_filter(self):
+        self.post(
+            {
+                "action": "reassign",
+                "scope": "filter",
+                "assignee": "bulkworker",
+            },
+            "?priority=LOW",
+        )
+
+        self.assertEqual(self.worker.assigned_tasks.count(), 3)
+        self.assertEqual(self.user.assigned_tasks.count(), 3)
+        self.assertCountersAccurate()
+
+    def test_delete_filtered_by_assignee(self):
+        Task.objects.create(name="Unassigned", deadline=timezone.now())
+
+        self.post(
+            {"action": "delete", "scope": "filter"}, "?assignee=testuser"
+        )
+
+        self.assertEqual(
+            list(Task.objects.values_list("name", flat=True)), ["Unassigned"]
+        )
+        self.assertEqual(self.user.assigned_tasks.count(), 0)
+        self.assertCountersAccurate()
+
+    def test_delete_leaves_nothing_pointing_at_the_tasks(self):
+        # bulk.delete_rows() follows no relations: any model pointing at a
+        # task besides the assignee rows must be handled in bulk.delete().
+        dependents = [
+            field.related_model
+            for field in Task._meta.get_fields(include_hidden=True)
+            if field.auto_created and not field.concrete
+        ]
+        self.assertEqual(dependents, [bulk.Assignment])
+
+    def test_invalid_action_reports_error(self):
+        response = self.post(
+            {"action": "priority", "scope": "selected", "ids": []}, ""
+        )
+        response = self.client.get(response.url)
+
+        messages = [str(m) for m in response.context["messages"]]
+        self.assertTrue(messages)
+        self.assertEqual(Task.objects.filter(priority="MEDIUM").count(), 0)
+
+
+class TaskArchiveTests(BaseViewTest):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.bug = TaskType.objects.create(name="Bug")
+        for i in range(5):
+            task = Task.objects.create(
+                name=f"Old task {i}",
+                description="Shipped the archive migration",
+                deadline=timezone.now() - timedelta(days=100 + i),
+                is_complete=True,
+                task_type=cls.bug,
+            )
+            task.assignees.add(cls.user)
+        cls.open = Task.objects.create(
+            name="Open task", deadline=timezone.now() - timedelta(days=100)
+        )
+        cls.recent = Task.objects.create(
+            name="Recent task",
+            description="Archive this later",
+            deadline=timezone.now(),
+            is_complete=True,
+        )
+        Task.objects.exclude(pk=cls.recent.pk).update(
+            updated_at=timezone.now() - timedelta(days=60)
+        )
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def archive(self, *args):
+        call_command(
+            "archive_tasks", "--older-than", "30", *args, stdout=StringIO()
+        )
+
+    def test_moves_old_completed_tasks_in_batches(self):
+        old = Task.objects.filter(name__startswith="Old")
+        old_ids = set(old.values_list("pk", flat=True))
+
+        with CaptureQueriesContext(connection) as queries:
+            self.archive("--batch-size", "2")
+
+        self.assertFalse(old.exists())
+        self.assertEqual(
+            set(Task.objects.values_list("pk", flat=True)),
+            {self.open.pk, self.recent.pk},
+        )
+        archived = ArchivedTask.objects.get(pk=min(old_ids))
+        self.assertEqual(
+            set(ArchivedTask.objects.values_list("pk", flat=True)), old_ids
+        )
+        self.assertEqual(archived.name, "Old task 0")
+        self.assertEqual(archived.task_type, self.bug)
+        self.assertEqual(list(archived.assignees.all()), [self.user])
+        # One transaction per batch of 2.
+        self.assertEqual(
+            sum(q["sql"].startswith("SAVEPOINT") for q in queries), 3
+        )
+        counts = counters.get_counts()
+        del counts["overdue"]
+        self.assertEqual(counts, counters.compute())
+
+    def test_detail_falls_back_to_archive(self):
+        task = Task.objects.get(name="Old task 1")
+        self.archive()
+
+        response = self.client.get(
+            reverse("app:tasks-detail", kwargs={"pk": task.pk})
+        )
+
+        self.assertContains(response, "(Archived)")
+        self.assertContains(response, "testuser")
+        self.assertNotContains(
+            response, reverse("app:tasks-update", kwargs={"pk": task.pk})
+        )
+        self.assertTrue(response.has_header("ETag"))
+        missing = self.client.get(
+            reverse("app:tasks-detail", kwargs={"pk": 10_000})
+        )
+        self.assertEqual(missing.status_code, 404)
+
+    def test_async_detail_falls_back_to_archive(self):
+        task = Task.objects.get(name="Old task 1")
+        self.archive()
+        request = RequestFactory().get("/")
+        request.user = self.user
+
+        async def auser():
+            return self.user
+
+        request.auser = auser
+        view = async_views.TasksDetailView.as_view()
+        response = async_to_sync(view)(request, pk=task.pk).render()
+
+        self.assertContains(response, "(Archived)")
+
+    def test_search_includes_archive_on_request(self):
+        self.archive()
+
+        self.assertEqual(search.search_tasks("archive"), [
+            search.SearchResult(
+                self.recent.pk,
+                "Recent task",
+                "<mark>Archive</mark> this later",
+            ),
+        ])
+        results = search.search_tasks("archive", include_archived=True)
+        self.assertEqual(len(results), 6)
+        self.assertEqual(sum(r.archived for r in results), 5)
+
+        response = self.client.get(
+            reverse("app:tasks-search"), {"q": "archive", "archived": "1"}
+        )
+        self.assertContains(response, "Old task 4")
+        self.assertContains(response, "Archived</span>", count=5)
+
+    def test_export_includes_archive_on_request(self):
+        self.archive()
+        url = reverse("app:tasks-export-ndjson")
+
+        hot = self.client.get(url, {"status": "complete"})
+        both = self.client.get(url, {"status": "complete", "archived": "1"})
+
+        def names(response):
+            return [
+                json.loads(line)["name"]
+                for line in b"".join(response.streaming_content).splitlines()
+            ]
+        self.assertEqual(names(hot), ["Recent task"])
+        self.assertEqual(names(both), [
+            "Recent task", *(f"Old task {i}" for i in range(4, -1, -1)),
+        ])
+
+
+@override_settings(BACKGROUND_JOBS=True, JOB_RETRY_DELAY=0)
+class JobQueueTests(BaseViewTest):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        for i in range(3):
+            Task.objects.create(name=f"Task {i}", deadline=timezone.now())
+
+    def run_jobs(self):
+        out = StringIO()
+        with self.assertLogs("app.jobs") as logs:
+            call_command("run_jobs", "--burst", stdout=out)
+        self.errors = [line for line in logs.output if "ERROR" in line]
+        return out.getvalue()
+
+    def test_bulk_action_runs_in_the_background(self):
+        response = self.client.post(
+            f"{reverse('app:tasks-bulk')}?status=open",
+            {"action": "complete", "scope": "filter"},
+            follow=True,
+        )
+        job = Job.objects.get()
+
+        self.assertContains(response, f"Queued as job #{job.pk}")
+        self.assertFalse(Task.objects.filter(is_complete=True).exists())
+        self.assertEqual(job.kwargs["query"], "status=open")
+        self.assertNotIn("csrfmiddlewaretoken", job.kwargs["data"])
+
+        self.assertIn("Ran 1 jobs.", self.run_jobs())
+
+        self.assertFalse(Task.objects.filter(is_complete=False).exists())
+        status = self.client.get(
+            reverse("app:jobs-detail", kwargs={"pk": job.pk})
+        ).json()
+        self.assertEqual(status["status"], Job.DONE)
+        self.assertEqual(status["result"], {"action": "complete", "count": 3})
+        self.assertEqual(status["attempts"], 1)
+
+    def test_worker_delete_runs_in_the_background(self):
+        worker = User.objects.create_user(username="leaving")
+
+        self.client.post(
+            reverse("app:workers-delete", kwargs={"pk": worker.pk})
+        )
+        self.assertTrue(User.objects.filter(pk=worker.pk).exists())
+        self.run_jobs()
+
+        self.assertFalse(User.objects.filter(pk=worker.pk).exists())
+        self.assertEqual(Job.objects.get().result, {"deleted": "leaving"})
+
+    def test_status_is_private_to_its_creator(self):
+        job = jobs.enqueue("delete_worker", pk=0)
+
+        response = self.client.get(
+            reverse("app:jobs-detail", kwargs={"pk": job.pk})
+        )
+
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(JOB_MAX_ATTEMPTS=2)
+    def test_retries_then_fails(self):
+        calls = []
+
+        def flaky():
+            calls.append(1)
+            raise RuntimeError("boom")
+
+        with mock.patch.dict(jobs.HANDLERS, {"flaky": flaky}):
+            job = jobs.enqueue("flaky")
+            self.run_jobs()
+
+        job.refresh_from_db()
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(len(self.errors), 2)
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(job.attempts, 2)
+        self.assertIn("RuntimeError: boom", job.error)
+
+    def test_retry_waits(self):
+        with override_settings(JOB_RETRY_DELAY=60):
+            with mock.patch.dict(jobs.HANDLERS, {"flaky": mock.Mock(
+                side_effect=RuntimeError
+            )}):
+                job = jobs.enqueue("flaky")
+                self.run_jobs()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertGreater(job.run_after, timezone.now())
+        self.assertIsNone(jobs.claim())
+
+    def test_job_error_is_not_retried(self):
+        job = jobs.enqueue("delete_worker", pk=0)
+
+        self.run_jobs()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(job.attempts, 1)
+        self.assertIn("No worker with id 0.", job.error)
+
+    def test_claim_is_exclusive_until_it_expires(self):
+        job = jobs.enqueue("delete_worker", pk=0)
+
+        first = jobs.claim()
+        self.assertEqual(first.pk, job.pk)
+        self.assertIsNone(jobs.claim())
+
+        # The first worker died: its claim runs out.
+        Job.objects.update(locked_until=timezone.now() - timedelta(1))
+        second = jobs.claim()
+
+        self.assertEqual(second.attempts, 2)
+        self.assertNotEqual(second.lease, first.lease)
+        self.assertEqual(jobs.finish(first, status=Job.DONE), 0)
+        self.assertEqual(jobs.finish(second, status=Job.DONE), 1)
+
+    @mock.patch.dict(jobs.HANDLERS, {"slow": lambda: time.sleep(0.2)})
+    def test_claim_is_renewed_while_the_job_runs(self):
+        job = jobs.enqueue("slow")
+        claimed = jobs.claim()
+        Job.objects.update(locked_until=timezone.now())
+
+        self.assertTrue(jobs.renew(claimed))
+        job.refresh_from_db()
+        self.assertGreater(job.locked_until, timezone.now() + timedelta(
+            seconds=settings.JOB_VISIBILITY_TIMEOUT - 10
+        ))
+
+        # The heartbeat thread has a connection of its own, which does not
+        # see the test's transaction: record its renewals instead.
+        renew = mock.Mock(return_value=True)
+        with override_settings(JOB_VISIBILITY_TIMEOUT=0.03), \
+                mock.patch.object(jobs, "renew", renew):
+            jobs.run(claimed)
+
+        self.assertGreater(renew.call_count, 1)
+        renew.assert_called_with(claimed)
+        self.assertEqual(Job.objects.get().status, Job.DONE)
+        self.assertFalse(jobs.renew(claimed))
+
+    def test_purge_deletes_old_finished_jobs(self):
+        old = timezone.now() - timedelta(days=8)
+        done = jobs.enqueue("delete_worker", pk=0)
+        failed = jobs.enqueue("delete_worker", pk=0)
+        recent = jobs.enqueue("delete_worker", pk=0)
+        queued = jobs.enqueue("delete_worker", pk=0)
+        Job.objects.filter(pk=done.pk).update(status=Job.DONE, finished_at=old)
+        Job.objects.filter(pk=failed.pk).update(
+            status=Job.FAILED, finished_at=old
+        )
+        Job.objects.filter(pk=recent.pk).update(
+            status=Job.DONE, finished_at=timezone.now()
+        )
+
+        out = StringIO()
+        call_command("purge_jobs", "--batch-size", "1", stdout=out)
+
+        self.assertIn("Deleted 2 jobs.", out.getvalue())
+        self.assertEqual(
+            set(Job.objects.values_list("pk", flat=True)),
+            {recent.pk, queued.pk},
+        )
+
+    @override_settings(JOB_MAX_ATTEMPTS=1)
+    def test_last_attempt_times_out(self):
+        jobs.enqueue("delete_worker", pk=0)
+        jobs.claim()
+        Job.objects.update(locked_until=timezone.now() - timedelta(1))
+
+        self.assertIsNone(jobs.claim())
+        job = Job.objects.get()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(job.error, "Timed out.")
+
+
+class ChangeFeedTests(BaseViewTest):
+
+    def setUp(self):
+        super().setUp()
+        self.cursor = changes.latest_cursor()
+
+    def new_changes(self):
+        return list(
+            Change.objects.filter(pk__gt=self.cursor).order_by("pk")
+            .values_list("model", "object_id", "action", "data")
+        )
+
+    def feed(self, **params):
+        return self.client.get(reverse("app:changes"), params)
+
+    def test_records_task_lifecycle(self):
+        task = Task.objects.create(name="Write docs", deadline=timezone.now())
+        task.assignees.add(self.user)
+        task.is_complete = True
+        task.save()
+        self.user.assigned_tasks.clear()
+        pk = task.pk
+        task.delete()
+
+        entries = self.new_changes()
+        self.assertEqual(
+            [(model, action) for model, _, action, _ in entries],
+            [
+                ("task", "created"),
+                ("task", "assignees"),
+                ("task", "updated"),
+                ("task", "assignees"),
+                ("task", "deleted"),
+            ],
+        )
+        self.assertTrue(all(entry[1] == pk for entry in entries))
+        self.assertEqual(entries[0][3]["name"], "Write docs")
+        self.assertEqual(entries[1][3], {"assignees": [self.user.pk]})
+        self.assertIs(entries[2][3]["is_complete"], True)
+        self.assertEqual(entries[3][3], {"assignees": []})
+        self.assertIsNone(entries[4][3])
+
+    def test_records_workers_but_not_logins(self):
+        worker = User.objects.create_user(username="newbie", password="pw")
+        self.client.login(username="newbie", password="pw")
+        worker.first_name = "New"
+        worker.save()
+
+        self.assertEqual(
+            [(action, data["first_name"])
+             for _, _, action, data in self.new_changes()],
+            [("created", ""), ("updated", "New")],
+        )
+
+    def test_bulk_actions_are_recorded(self):
+        tasks = [
+            Task.objects.create(name=f"Task {i}", deadline=timezone.now())
+            for i in range(3)
+        ]
+        self.cursor = changes.latest_cursor()
+
+        bulk.apply("complete", Task.objects.all())
+        bulk.apply("reassign", Task.objects.all(), worker=self.user)
+        bulk.apply("delete", Task.objects.filter(pk=tasks[0].pk))
+
+        entries = self.new_changes()
+        self.assertEqual(
+            [action for _, _, action, _ in entries],
+            ["updated"] * 3 + ["assignees"] * 3 + ["deleted"],
+        )
+        self.assertTrue(entries[0][3]["is_complete"])
+        self.assertEqual(entries[3][3], {"assignees": [self.user.pk]})
+
+    def test_feed_pages_through_deltas(self):
+        for i in range(3):
+            Task.objects.create(name=f"Task {i}", deadline=timezone.now())
+
+        first = self.feed(since=self.cursor, limit=2).json()
+        second = self.feed(since=first["cursor"], limit=2).json()
+        done = self.feed(since=second["cursor"]).json()
+
+        self.assertEqual(
+            [c["data"]["name"] for c in first["changes"] + second["changes"]],
+            ["Task 0", "Task 1", "Task 2"],
+        )
+        self.assertTrue(first["more"])
+        self.assertFalse(second["more"])
+        self.assertEqual(done["changes"], [])
+        self.assertEqual(done["cursor"], second["cursor"])
+
+    def test_feed_starts_from_the_latest_cursor(self):
+        response = self.feed().json()
+
+        self.assertEqual(response, {
+            "changes": [], "cursor": self.cursor, "more": False,
+        })
+        self.assertEqual(self.feed(since="x").status_code, 400)
+
+    def test_compaction_trims_old_entries(self):
+        for i in range(3):
+            Task.objects.create(name=f"Task {i}", deadline=timezone.now())
+        Change.objects.update(created_at=timezone.now() - timedelta(days=60))
+        latest = changes.latest_cursor()
+
+        call_command("compact_changes", "--batch-size", "2", stdout=StringIO())
 
-User = get_user_model()
+        # The newest entry stays, to tell which cursors can continue.
+        self.assertEqual(
+            list(Change.objects.values_list("pk", flat=True)), [latest]
+        )
+        self.assertEqual(self.feed(since=self.cursor).status_code, 410)
+        self.assertEqual(
+            self.feed(since=latest - 1).json()["changes"][0]["id"], latest
+        )
 
 
-class ModelStrTests(TestCase):
+def reroute():
+    importlib.reload(urls)
+    importlib.reload(importlib.import_module(settings.ROOT_URLCONF))
+    clear_url_caches()
 
-    def test_task_type_str(self):
-        task_type = TaskType.objects.create(name="Bug")
-        self.assertEqual(str(task_type), "Bug")
 
-    def test_position_str(self):
-        position = Position.objects.create(name="Developer")
-        self.assertEqual(str(position), "Developer")
+@contextmanager
+def live_updates():
+    """``LIVE_UPDATES`` on, with the stream routed."""
+    try:
+        with override_settings(LIVE_UPDATES=True):
+            reroute()
+            yield
+    finally:
+        reroute()
 
 
-class TaskModelTests(TestCase):
+class LiveUpdatesTests(BaseViewTest):
 
-    def test_task_assignees(self):
-        user = User.objects.create_user(
-            username="john",
-            password="pass"
+    def setUp(self):
+        super().setUp()
+        self.cursor = changes.latest_cursor()
+        self.shown = [
+            Task.objects.create(name=f"Shown {i}", deadline=timezone.now())
+            for i in range(3)
+        ]
+        self.ids = [task.pk for task in self.shown]
+
+    def test_batch_holds_events_of_watched_tasks(self):
+        cursor = changes.latest_cursor()
+        renamed, completed, deleted = self.shown
+        deleted_pk = deleted.pk
+        renamed.name = "Renamed"
+        renamed.save()
+        completed.is_complete = True
+        completed.save()
+        deleted.delete()
+        Task.objects.create(name="Elsewhere", deadline=timezone.now())
+
+        batch = live.read_batch(cursor, set(self.ids))
+
+        events = {
+            pk: chunk.split("\n")[0] for pk, (_, chunk) in batch.events.items()
+        }
+        self.assertEqual(events, {
+            renamed.pk: "event: updated",
+            completed.pk: "event: completed",
+            deleted_pk: "event: deleted",
+        })
+        self.assertIn("Renamed", batch.events[renamed.pk][1])
+        self.assertEqual(len(batch.created), 1)
+        self.assertEqual(batch.cursor, changes.latest_cursor())
+
+    def test_subscriber_gets_only_its_unseen_events(self):
+        cursor = changes.latest_cursor()
+        first, second, _ = self.shown
+        first.save()
+        seen = changes.latest_cursor()
+        second.save()
+        batch = live.read_batch(cursor, set(self.ids))
+
+        chunk = batch.chunk_for(live.Subscriber([first.pk, second.pk], seen))
+
+        self.assertIn(f'"id": {second.pk}', chunk)
+        self.assertNotIn(f'"id": {first.pk}', chunk)
+        self.assertTrue(chunk.endswith(f"id: {batch.cursor}\n\n"))
+        self.assertEqual(
+            batch.chunk_for(live.Subscriber([self.ids[2]], seen)), ""
         )
 
-        task_type = TaskType.objects.create(name="Feature")
+    async def read_stream(self, since):
+        # A broadcaster that is already running, at the current cursor:
+        # the stream catches up to it from "since" on its own.
+        broadcaster = live.Broadcaster()
+        broadcaster.task = mock.Mock()
+        broadcaster.cursor = await sync_to_async(changes.latest_cursor)()
+        with mock.patch.object(live, "broadcaster", broadcaster):
+            stream = live.stream(self.ids, since)
+            chunks = [await anext(stream), await anext(stream)]
+            await stream.aclose()
+        self.assertFalse(broadcaster.subscribers)
+        return chunks
+
+    def test_stream_catches_up_and_reloads_when_too_far_behind(self):
+        pk = self.shown[0].pk
+        self.shown[0].delete()
+
+        retry, caught_up = async_to_sync(self.read_stream)(self.cursor)
+        with mock.patch.object(live, "CATCH_UP_LIMIT", 1):
+            reload = async_to_sync(self.read_stream)(self.cursor)[1]
+
+        self.assertTrue(retry.startswith("retry:"))
+        self.assertIn("event: created\ndata: {\"count\": 3}", caught_up)
+        self.assertIn(f'event: deleted\ndata: {{"id": {pk}}}', caught_up)
+        self.assertEqual(reload, live.RELOAD)
+
+    async def open_streams(self, application, count, session, cursor):
+        disconnect = asyncio.Event()
+        starts, bodies = [], []
+
+        def receiver():
+            messages = iter([{"type": "http.request", "body": b""}])
+
+            async def receive():
+                for message in messages:
+                    return message
+                await disconnect.wait()
+                return {"type": "http.disconnect"}
+            return receive
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                starts.append(message)
+            elif message.get("body"):
+                bodies.append(message["body"])
+
+        scope = {
+            "type": "http",
+            "method": "GET",
+            "path": "/tasks/live/",
+            # At the broadcaster's cursor, there is nothing to catch up.
+            "query_string": f"ids={self.ids[0]}&since={cursor}".encode(),
+            "headers": [
+                (b"host", b"testserver"),
+                (b"cookie", f"sessionid={session}".encode()),
+            ],
+        }
+        threads = threading.active_count()
+        requests = [
+            asyncio.create_task(application(scope, receiver(), send))
+            for _ in range(count)
+        ]
+        while len(bodies) < count:
+            await asyncio.sleep(0.01)
+        open_threads = threading.active_count()
+        disconnect.set()
+        await asyncio.gather(*requests)
+        return starts, bodies, open_threads - threads
+
+    @shared_auth_cache
+    def test_asgi_application_streams_without_a_thread_each(self):
+        broadcaster = live.Broadcaster()
+        broadcaster.task = mock.Mock()
+        broadcaster.cursor = changes.latest_cursor()
+        self.client.login(username="testuser", password="password")
+        session = self.client.cookies["sessionid"].value
+        results = []
+        # On an event loop of its own, as under an ASGI server: the test's
+        # would run the sync calls in the test thread. Away from the test
+        # transaction, the session comes from the cache and the user from
+        # the mock.
+        server = threading.Thread(target=lambda: results.append(asyncio.run(
+            self.open_streams(application, 5, session, broadcaster.cursor)
+        )))
+        with live_updates():
+            application = asgi.StreamingASGIHandler()
+        with live_updates(), \
+                mock.patch.object(live, "broadcaster", broadcaster), \
+                mock.patch.object(
+                    backends.CachedModelBackend, "aget_user",
+                    mock.AsyncMock(return_value=self.user),
+                ), \
+                override_settings(ALLOWED_HOSTS=["testserver"]):
+            server.start()
+            server.join(10)
+        starts, bodies, new_threads = results[0]
+
+        self.assertEqual([start["status"] for start in starts], [200] * 5)
+        self.assertIn(
+            (b"Content-Type", b"text/event-stream"), starts[0]["headers"]
+        )
+        self.assertTrue(bodies[0].startswith(b"retry:"))
+        self.assertLess(new_threads, 5)
+        self.assertFalse(broadcaster.subscribers)
 
-        task = Task.objects.create(
-            name="Implement login",
-            deadline=timezone.now(),
-            task_type=task_type
+    def test_task_list_links_the_stream_when_enabled(self):
+        Task.objects.create(name="Listed", deadline=timezone.now())
+
+        self.assertNotContains(
+            self.client.get(reverse("app:tasks")), "data-live-url"
+        )
+        self.assertEqual(self.client.get("/tasks/live/").status_code, 404)
+        with live_updates():
+            url = reverse("app:tasks-live")
+            response = self.client.get(reverse("app:tasks"))
+            # Under WSGI the stream would never be sent.
+            wsgi = self.client.get(url)
+        self.assertContains(
+            response, f"{url}?since={changes.latest_cursor()}"
+        )
+        self.assertEqual(wsgi.status_code, 501)
+
+    def test_revalidated_list_keeps_a_resumable_cursor(self):
+        url = reverse("app:tasks")
+        self.client.get(url)
+        with live_updates():
+            first = self.client.get(url)
+            Change.objects.update(
+                created_at=timezone.now() - timedelta(days=60)
+            )
+            call_command("compact_changes", stdout=StringIO())
+            unchanged = self.client.get(
+                url, headers={"if-none-match": first["ETag"]}
+            )
+            self.shown[0].save()
+            call_command("compact_changes", stdout=StringIO())
+            changed = self.client.get(
+                url, headers={"if-none-match": first["ETag"]}
+            )
+
+        self.assertEqual(unchanged.status_code, 304)
+        self.assertIsNotNone(live.catch_up(
+            first.context["live_cursor"], changes.latest_cursor(), self.ids
+        ))
+        # The cursor the 304 would have kept is gone; the page is new.
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual(
+            changed.context["live_cursor"], changes.latest_cursor()
         )
 
-        task.assignees.add(user)
+    def test_stream_rejects_malformed_parameters(self):
+        request = AsyncRequestFactory().get("/tasks/live/", {"ids": "x"})
 
-        self.assertIn(user, task.assignees.all())
-        self.assertIn(task, user.assigned_tasks.all())
+        async def auser():
+            return self.user
 
+        request.auser = auser
+        response = async_to_sync(async_views.tasks_live)(request)
+
+        self.assertEqual(response.status_code, 400)
+
+
+class PerfBenchmarkTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def seed(self, *args):
+        call_command(
+            "seed_perf_data", "--tasks", "60", "--base-date", "2030-01-01",
+            *args, stdout=StringIO(),
+        )
+
+    def snapshot(self):
+        return [
+            (
+                task.name,
+                task.deadline,
+                task.priority,
+                task.task_type.name,
+                sorted(worker.username for worker in task.assignees.all()),
+            )
+            for task in Task.objects.order_by("name").select_related(
+                "task_type"
+            ).prefetch_related("assignees")
+        ]
+
+    def test_seed_is_reproducible(self):
+        self.seed()
+        first = self.snapshot()
+        with self.assertRaises(CommandError):
+            self.seed()
+
+        self.seed("--clear")
+
+        self.assertEqual(self.snapshot(), first)
+        self.assertEqual(len(first), 60)
+        self.assertEqual(User.objects.count(), 5)
+        counts = counters.get_counts()
+        del counts["overdue"]
+        self.assertEqual(counts, counters.compute())
+
+        # The feed saw every seeded row it was later told was deleted.
+        for model, count in ((Change.TASK, 60), (Change.WORKER, 5)):
+            entries = Change.objects.filter(model=model)
+            created = set(entries.filter(action=Change.CREATED).values_list(
+                "object_id", flat=True
+            ))
+            deleted = set(entries.filter(action=Change.DELETED).values_list(
+                "object_id", flat=True
+            ))
+            self.assertEqual(len(deleted), count)
+            self.assertLessEqual(deleted, created)
+
+    def test_bench_routes_baseline_and_compare(self):
+        self.seed()
+        baseline = Path(self.tmp.name) / "baseline.json"
+        bench = ["bench_routes", "--requests", "1", "--warmup", "0"]
+
+        call_command(*bench, "--output", str(baseline), stdout=StringIO())
+        results = json.loads(baseline.read_text())
+
+        routes = results["routes"]
+        self.assertNotIn("tasks-bulk", routes)
+        self.assertEqual(
+            {r["status"] for r in routes.values()}, {200}
+        )
+        self.assertGreater(routes["tasks"]["queries"], 0)
+
+        routes["tasks"]["queries"] -= 1
+        baseline.write_text(json.dumps(results))
+        with self.assertRaisesMessage(CommandError, "tasks: "):
+            call_command(
+                *bench, "--routes", "tasks", "--compare", str(baseline),
+                stdout=StringIO(),
+            )
+
+
+class SQLiteProfileTests(TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_pragmas_applied_to_new_connections(self):
+        wrapper = connections[DEFAULT_DB_ALIAS].__class__(
+            {
+                **connection.settings_dict,
+                "NAME": str(Path(self.tmp.name) / "db.sqlite3"),
+            },
+            "tuned",
+        )
+        self.addCleanup(wrapper.close)
+
+        with override_settings(
+            SQLITE_PRAGMAS=settings.PRODUCTION_SQLITE_PRAGMAS
+        ):
+            wrapper.ensure_connection()
+
+        with wrapper.cursor() as cursor:
+            values = {}
+            for name in ("journal_mode", "synchronous", "cache_size",
+                         "busy_timeout", "temp_store"):
+                cursor.execute(f"PRAGMA {name}")
+                values[name] = cursor.fetchone()[0]
+        self.assertEqual(values, {
+            "journal_mode": "wal",
+            "synchronous": 1,  # NORMAL
+            "cache_size": -20000,
+            "busy_timeout": 5000,
+            "temp_store": 2,  # MEMORY
+        })
+
+
+class SQLiteConcurrencyBenchmarkTests(TransactionTestCase):
+
+    def test_runs_both_profiles_on_copies(self):
+        task_type = TaskType.objects.create(name="Bug")
+        for n in range(30):
+            Task.objects.create(
+                name=f"Task {n}",
+                deadline=timezone.now(),
+                task_type=task_type,
+            )
+        out = StringIO()
+
+        call_command(
+            "bench_sqlite_concurrency", "--processes", "2",
+            "--seconds", "0.2", "--write-ratio", "0.5",
+            # The test runner forbids opening the replica alias.
+            "--profiles", "default", "production", stdout=out,
+        )
+
+        rows = {
+            line.split()[0]: line.split()[1:]
+            for line in out.getvalue().splitlines()[2:]
+        }
+        self.assertEqual(set(rows), {"default", "production"})
+        self.assertGreater(float(rows["production"][0]), 0)
+        # The scratch copies took the writes.
+        self.assertEqual(
+            Task.objects.filter(priority="MEDIUM").count(), 30
+        )
 
-class BaseViewTest(TestCase):
+
+class ReplicaRoutingTests(BaseViewTest):
 
     @classmethod
     def setUpTestData(cls):
-        cls.user = User.objects.create_user(
-            username="testuser",
-            password="password"
+        super().setUpTestData()
+        cls.task_type = TaskType.objects.create(name="Bug")
+        cls.task = Task.objects.create(
+            name="Task", deadline=timezone.now(), task_type=cls.task_type
         )
 
     def setUp(self):
-        self.client.login(username="testuser", password="password")
+        super().setUp()
+        # A "replica" that is the test database itself, so routed reads
+        # still find the test data.
+        patcher = mock.patch.dict(
+            settings.DATABASES, {replica.REPLICA: connection.settings_dict}
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        connections[replica.REPLICA] = connections[DEFAULT_DB_ALIAS]
+        self.addCleanup(connections.__delitem__, replica.REPLICA)
+
+    def request(self, method, path, data=None):
+        """The response and, for each query, whether it was routed to
+        the replica."""
+        routed = []
+
+        def record(execute, sql, params, many, context):
+            routed.append(replica.using_replica())
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(record):
+            response = getattr(self.client, method)(path, data)
+        return response, routed
+
+    def test_router(self):
+        router = replica.ReplicaRouter()
+
+        with replica.use_replica():
+            self.assertEqual(router.db_for_read(Task), replica.REPLICA)
+            self.assertIsNone(router.db_for_write(Task))
+        self.assertIsNone(router.db_for_read(Task))
+        self.assertFalse(router.allow_migrate(replica.REPLICA, "app"))
+        self.assertIsNone(router.allow_migrate(DEFAULT_DB_ALIAS, "app"))
+
+    def test_read_views_use_replica(self):
+        for path in (
+            reverse("app:index"),
+            reverse("app:tasks"),
+            reverse("app:tasks-detail", kwargs={"pk": self.task.pk}),
+            reverse("app:workers"),
+            reverse("app:workers-detail", kwargs={"pk": self.user.pk}),
+        ):
+            with self.subTest(path=path):
+                backends.get_cache().clear()
+                response, routed = self.request("get", path)
+
+                self.assertEqual(response.status_code, 200)
+                # Not cached, the session and the user come from the
+                # primary.
+                self.assertEqual(routed[:2], [False, False])
+                self.assertTrue(routed[2:])
+                self.assertTrue(all(routed[2:]))
+
+    def test_other_views_use_primary(self):
+        response, routed = self.request(
+            "get", reverse("app:tasks-search"), {"q": "task"}
+        )
 
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(any(routed))
 
-class IndexViewTests(BaseViewTest):
+    def test_write_pins_user_to_primary(self):
+        response, routed = self.request(
+            "post",
+            reverse("app:tasks-update", kwargs={"pk": self.task.pk}),
+            {
+                "name": "Renamed",
+                "description": "Renamed task",
+                "deadline": "2030-01-01 10:00",
+                "priority": "LOW",
+                "task_type": self.task_type.pk,
+                "assignees": [self.user.pk],
+            },
+        )
 
-    def test_index_context(self):
-        response = self.client.get(reverse("app:index"))
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(any(routed))
+        cookie = response.cookies[replica.PIN_COOKIE]
+        self.assertEqual(cookie["max-age"], settings.REPLICA_PIN_SECONDS)
 
-        self.assertEqual(response.status_code, 200)
-        self.assertIn("num_tasks", response.context)
-        self.assertIn("num_workers", response.context)
+        response, routed = self.request("get", reverse("app:tasks"))
 
+        self.assertContains(response, "Renamed")
+        self.assertFalse(any(routed))
 
-class TaskListViewTests(BaseViewTest):
 
-    def test_task_list_view(self):
-        response = self.client.get(reverse("app:tasks"))
+class QueryTransformTests(TestCase):
 
-        self.assertEqual(response.status_code, 200)
-        self.assertEqual(response.context["object_list"].count(), 0)
+    def test_replaces_and_drops_keys(self):
+        request = RequestFactory().get("/", {"status": "open", "page": "2"})
+
+        self.assertEqual(
+            query_transform(request, page=3), "status=open&page=3"
+        )
+        self.assertEqual(
+            query_transform(request, page=None), "status=open"
+        )
 
 
 class TaskDetailViewTests(BaseViewTest):
@@ -121,6 +1839,90 @@ class TaskCreateViewTests(BaseViewTest):
         self.assertTrue(Task.objects.filter(name="New task").exists())
 
 
+class TaskFormTests(BaseViewTest):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.workers = [
+            User.objects.create_user(
+                username=f"dev{i}", first_name="Ann", last_name=f"Lee{i}"
+            )
+            for i in range(15)
+        ]
+        cls.task = Task.objects.create(name="Task", deadline=timezone.now())
+        cls.task.assignees.add(cls.workers[3])
+
+    def test_renders_only_selected_assignees(self):
+        response = self.client.get(
+            reverse("app:tasks-update", kwargs={"pk": self.task.pk})
+        )
+
+        self.assertContains(response, "data-autocomplete-url")
+        self.assertContains(
+            response, f'<option value="{self.workers[3].pk}" selected>'
+        )
+        self.assertNotContains(response, "dev4")
+
+    def test_invalid_post_keeps_selection(self):
+        response = self.client.post(reverse("app:tasks-create"), {
+            "name": "",
+            "deadline": "2030-01-01 10:00",
+            "priority": "HIGH",
+            "assignees": [self.workers[5].pk],
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "dev5")
+        self.assertNotContains(response, "dev6")
+
+    def test_autocomplete(self):
+        url = reverse("app:workers-autocomplete")
+
+        results = self.client.get(url, {"q": "DEV1"}).json()["results"]
+        self.assertEqual(
+            [r["username"] for r in results],
+            ["dev1", "dev10", "dev11", "dev12", "dev13", "dev14"],
+        )
+
+        results = self.client.get(url, {"q": "lee3"}).json()["results"]
+        self.assertEqual([r["username"] for r in results], ["dev3"])
+
+        results = self.client.get(url, {"q": "ann"}).json()["results"]
+        self.assertEqual(len(results), 10)
+
+        self.assertEqual(self.client.get(url).json(), {"results": []})
+
+    def test_autocomplete_prefix_at_the_end_of_unicode(self):
+        url = reverse("app:workers-autocomplete")
+        last = chr(sys.maxunicode)
+        User.objects.create_user(username=f"dev{last}{last}")
+
+        results = self.client.get(url, {"q": f"dev{last}"}).json()["results"]
+
+        self.assertEqual(
+            [r["username"] for r in results], [f"dev{last}{last}"]
+        )
+        self.assertIsNone(views.prefix_upper_bound(last * 2))
+        self.assertEqual(views.prefix_upper_bound(f"a{last}"), "b")
+        self.assertEqual(views.prefix_upper_bound("\ud7ff"), "\ue000")
+
+    def test_autocomplete_folds_case_like_the_database(self):
+        User.objects.create_user(username="Ärger")
+
+        results = self.client.get(
+            reverse("app:workers-autocomplete"), {"q": "ÄR"}
+        ).json()["results"]
+
+        self.assertEqual([r["username"] for r in results], ["Ärger"])
+
+    def test_autocomplete_uses_indexes(self):
+        plan = views.WorkerAutocompleteView().get_queryset("dev").explain()
+
+        for name in ("username", "first_name", "last_name"):
+            self.assertIn(f"worker_{name}_lower_idx", plan)
+
+
 class WorkerListViewTests(BaseViewTest):
 
     def test_worker_list_view(self):
@@ -130,6 +1932,253 @@ class WorkerListViewTests(BaseViewTest):
         self.assertIn(self.user, response.context["object_list"])
 
 
+@shared_auth_cache
+class WorkerListQueryCountTests(BaseViewTest):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.position = Position.objects.create(name="Developer")
+        cls.tasks = [
+            Task.objects.create(name=f"Task {i}", deadline=timezone.now())
+            for i in range(3)
+        ]
+
+    def create_workers(self, prefix, count):
+        for i in range(count):
+            worker = User.objects.create(
+                username=f"{prefix}{i}",
+                position=self.position,
+            )
+            worker.assigned_tasks.set(self.tasks)
+
+    def test_worker_list_query_count_is_constant(self):
+        # ETag (the page's workers, latest task updated_at, feed cursor,
+        # next deadline) + workers (joined with position) + upcoming tasks
+        # + grouped workload counts; the session and the user come from
+        # the cache after the first request
+        self.create_workers("first", 1)
+        self.client.get(reverse("app:workers"))
+        with self.assertNumQueries(7):
+            self.client.get(reverse("app:workers"))
+
+        self.create_workers("second", 10)
+        with self.assertNumQueries(7):
+            response = self.client.get(reverse("app:workers"))
+
+        self.assertContains(response, "Developer")
+
+
+@shared_auth_cache
+class ConditionalGetTests(BaseViewTest):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.task_type = TaskType.objects.create(name="Bug")
+        cls.task = Task.objects.create(
+            name="Task",
+            deadline=timezone.now() + timedelta(days=1),
+            task_type=cls.task_type,
+        )
+        cls.task.assignees.add(cls.user)
+
+    def setUp(self):
+        super().setUp()
+        # The first page view sets the CSRF cookie, which the ETag covers.
+        self.client.get(reverse("app:tasks"))
+
+    def revalidate(self, url):
+        """Fetch ``url``, then ask again with its ETag; return both."""
+        first = self.client.get(url)
+        second = self.client.get(url, headers={
+            "if-none-match": first["ETag"],
+        })
+        return first, second
+
+    def assertUnchanged(self, url):
+        first, second = self.revalidate(url)
+        self.assertEqual(second.status_code, 304)
+        return first["ETag"]
+
+    def assertChanged(self, url, etag):
+        response = self.client.get(url, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 200)
+
+    def test_task_detail(self):
+        url = reverse("app:tasks-detail", kwargs={"pk": self.task.pk})
+        first, second = self.revalidate(url)
+
+        self.assertIn("Last-Modified", first)
+        self.assertIn("no-cache", first["Cache-Control"])
+        self.assertEqual(second.status_code, 304)
+        # the task's updated_at; the session and the user are cached
+        with self.assertNumQueries(1):
+            response = self.client.get(url, headers={
+                "if-modified-since": first["Last-Modified"],
+            })
+        self.assertEqual(response.status_code, 304)
+
+        other = User.objects.create_user(username="other")
+        self.task.assignees.add(other)
+        self.assertChanged(url, first["ETag"])
+
+    def test_task_detail_follows_related_renames(self):
+        url = reverse("app:tasks-detail", kwargs={"pk": self.task.pk})
+        etag = self.assertUnchanged(url)
+
+        self.task_type.name = "Defect"
+        self.task_type.save()
+        self.assertChanged(url, etag)
+
+        etag = self.assertUnchanged(url)
+        self.user.username = "renamed"
+        self.user.save()
+        self.assertChanged(url, etag)
+
+    def test_task_list(self):
+        url = reverse("app:tasks") + "?status=open"
+        etag = self.assertUnchanged(url)
+
+        Task.objects.create(name="Done", deadline=timezone.now(),
+                            is_complete=True)
+        self.assertUnchanged(url)
+
+        Task.objects.create(name="Other", deadline=timezone.now())
+        etag = self.assertUnchanged(url)
+        Task.objects.filter(name="Other").delete()
+        self.assertChanged(url, etag)
+
+        etag = self.assertUnchanged(url)
+        self.client.post(
+            reverse("app:tasks-bulk"),
+            {"action": "priority", "scope": "filter", "priority": "HIGH"},
+        )
+        self.assertChanged(url, etag)
+
+    def test_pending_messages_are_not_cached(self):
+        self.client.post(
+            reverse("app:tasks-bulk"),
+            {"action": "complete", "scope": "selected"},
+        )
+        response = self.client.get(reverse("app:tasks"))
+
+        self.assertNotIn("ETag", response)
+
+    def test_worker_pages(self):
+        detail = reverse("app:workers-detail", kwargs={"pk": self.user.pk})
+        detail_etag = self.assertUnchanged(detail)
+        list_etag = self.assertUnchanged(reverse("app:workers"))
+
+        position = Position.objects.create(name="Developer")
+        self.user.position = position
+        self.user.save()
+        self.assertChanged(detail, detail_etag)
+        self.assertChanged(reverse("app:workers"), list_etag)
+
+        detail_etag = self.assertUnchanged(detail)
+        position.name = "Engineer"
+        position.save()
+        self.assertChanged(detail, detail_etag)
+
+    def test_worker_list_depends_on_its_page_only(self):
+        url = reverse("app:workers")
+        # Past the page: "zz" sorts after the 20 shown.
+        for i in range(20):
+            User.objects.create_user(username=f"worker{i:02}")
+        position = Position.objects.create(name="Developer")
+        User.objects.create_user(username="zz", position=position)
+        etag = self.assertUnchanged(url)
+
+        position.name = "Engineer"
+        position.save()
+        response = self.client.get(url, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 304)
+
+        # Overdue counts move with the clock.
+        later = timezone.now() + timedelta(days=2)
+        with mock.patch("django.utils.timezone.now", return_value=later):
+            self.assertChanged(url, etag)
+
+        self.task.is_complete = True
+        self.task.save()
+        self.assertChanged(url, etag)
+
+    def test_revalidating_never_reads_tasks_or_assignments(self):
+        worker = reverse("app:workers-detail", kwargs={"pk": self.user.pk})
+        for url in (reverse("app:tasks") + "?status=open",
+                    reverse("app:workers"),
+                    worker):
+            etag = self.client.get(url)["ETag"]
+            with self.subTest(url=url), \
+                    CaptureQueriesContext(connection) as queries:
+                response = self.client.get(
+                    url, headers={"if-none-match": etag}
+                )
+                self.assertEqual(response.status_code, 304)
+                with connection.cursor() as cursor:
+                    for query in queries.captured_queries:
+                        self.assertNotIn("app_task_assignees", query["sql"])
+                        cursor.execute("EXPLAIN QUERY PLAN " + query["sql"])
+                        plan = str(cursor.fetchall())
+                        self.assertNotRegex(plan, r"SCAN app_task\b")
+
+    def test_worker_detail_follows_the_clock(self):
+        url = reverse("app:workers-detail", kwargs={"pk": self.user.pk})
+        etag = self.assertUnchanged(url)
+
+        later = timezone.now() + timedelta(days=2)
+        with mock.patch("django.utils.timezone.now", return_value=later):
+            self.assertChanged(url, etag)
+
+
+class WorkloadTests(BaseViewTest):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        now = timezone.now()
+        for i in range(25):
+            task = Task.objects.create(
+                name=f"Task {i}",
+                deadline=now + timedelta(days=i - 2, hours=1),
+                is_complete=i % 5 == 0,
+            )
+            task.assignees.add(cls.user)
+
+    def test_worker_list_summary_and_preview(self):
+        response = self.client.get(reverse("app:workers"))
+        worker = response.context["object_list"][0]
+
+        self.assertEqual(
+            worker.workload, {"open": 20, "complete": 5, "overdue": 1}
+        )
+        self.assertEqual(
+            [task.name for task in worker.upcoming],
+            ["Task 1", "Task 2", "Task 3"],
+        )
+
+    def test_worker_detail_paginates_assigned_tasks(self):
+        url = reverse("app:workers-detail", kwargs={"pk": self.user.pk})
+
+        first = self.client.get(url)
+        second = self.client.get(
+            url, {"cursor": first.context["page_obj"].next_cursor}
+        )
+
+        self.assertEqual(len(first.context["assigned_tasks"]), 20)
+        self.assertEqual(len(second.context["assigned_tasks"]), 5)
+        self.assertFalse(second.context["page_obj"].has_next())
+        self.assertEqual(first.context["object"].workload["complete"], 5)
+
+    def test_assigned_tasks_query_uses_indexes(self):
+        plan = Task.objects.filter(assignees=self.user).order_by(
+            "deadline", "id"
+        )[:21].explain()
+
+        self.assertNotRegex(plan, r"SCAN app_task(_assignees)?\b(?! USING)")
+
+
 class WorkerDetailViewTests(BaseViewTest):
 
     def test_worker_detail_view(self):
@@ -141,6 +2190,364 @@ class WorkerDetailViewTests(BaseViewTest):
         self.assertEqual(response.context["object"], self.user)
 
 
+class AsyncReadViewTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="testuser")
+        cls.task = Task.objects.create(name="Task", deadline=timezone.now())
+        cls.task.assignees.add(cls.user)
+
+    async def get(self, view, path, user=None, headers=None, **kwargs):
+        request = AsyncRequestFactory().get(path, headers=headers)
+
+        async def auser():
+            return user or self.user
+
+        request.auser = auser
+        response = await view(request, **kwargs)
+        if hasattr(response, "render"):
+            response = await sync_to_async(response.render)()
+        return response
+
+    async def test_index(self):
+        response = await self.get(async_views.index, "/")
+
+        self.assertContains(response, "<strong>Tasks:</strong> 1")
+
+    async def test_lists(self):
+        tasks = await self.get(async_views.TasksView.as_view(), "/tasks/")
+        workers = await self.get(
+            async_views.WorkersView.as_view(), "/workers/"
+        )
+
+        self.assertContains(tasks, "testuser")
+        self.assertContains(workers, "1 open")
+
+    async def test_details(self):
+        task = await self.get(
+            async_views.TasksDetailView.as_view(), "/", pk=self.task.pk
+        )
+        worker = await self.get(
+            async_views.WorkerDetailView.as_view(), "/", pk=self.user.pk
+        )
+
+        self.assertContains(task, "testuser")
+        self.assertContains(worker, "Task")
+
+    async def test_not_modified(self):
+        view = async_views.TasksDetailView.as_view()
+        response = await self.get(view, "/", pk=self.task.pk)
+        response = await self.get(
+            view, "/", headers={"if-none-match": response["ETag"]},
+            pk=self.task.pk,
+        )
+
+        self.assertEqual(response.status_code, 304)
+
+    async def test_requires_login(self):
+        response = await self.get(
+            async_views.TasksView.as_view(), "/tasks/", user=AnonymousUser()
+        )
+
+        self.assertEqual(response.status_code, 302)
+
+
+@override_settings(
+    REQUEST_INSTRUMENTATION=True,
+    SLOW_REQUEST_MS=60_000,
+    SLOW_QUERY_MS=60_000,
+    REPEATED_QUERY_THRESHOLD=3,
+)
+class InstrumentationMiddlewareTests(BaseViewTest):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        task_type = TaskType.objects.create(name="Bug")
+        for i in range(3):
+            Task.objects.create(
+                name=f"Task {i}", deadline=timezone.now(), task_type=task_type
+            )
+
+    def test_server_timing_and_log_line(self):
+        with self.assertLogs("app.instrumentation", "INFO") as logs:
+            response = self.client.get(reverse("app:tasks"))
+
+        self.assertRegex(
+            response["Server-Timing"],
+            r'^db;dur=[\d.]+;desc="\d+ queries", template;dur=[\d.]+, '
+            r"total;dur=[\d.]+$",
+        )
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record["view"], "app:tasks")
+        self.assertEqual(record["status"], 200)
+        self.assertGreater(record["queries"], 0)
+        self.assertGreater(record["template_ms"], 0)
+        self.assertEqual(len(logs.records), 1)
+
+    @override_settings(SLOW_REQUEST_MS=0, SLOW_QUERY_MS=0)
+    def test_slow_request_and_queries(self):
+        with self.assertLogs("app.instrumentation", "WARNING") as logs:
+            self.client.get(reverse("app:tasks"))
+
+        kinds = {next(iter(json.loads(r.getMessage()))) for r in logs.records}
+        self.assertEqual(kinds, {"slow_request", "slow_query"})
+
+    def test_flags_repeated_queries_by_template(self):
+        profile = middleware.RequestProfile()
+        template = Template(
+            "{% for task in tasks %}{{ task.task_type.name }}{% endfor %}",
+            name="n_plus_one.html",
+        )
+        middleware.install()
+        token = middleware._profile.set(profile)
+        try:
+            template.render(Context({"tasks": Task.objects.all()}))
+        finally:
+            middleware._profile.reset(token)
+
+        [(sql, count, name)] = profile.repeated_queries(3)
+        self.assertIn("app_tasktype", sql)
+        self.assertEqual(count, 3)
+        self.assertEqual(name, "n_plus_one.html")
+
+
+@shared_auth_cache
+class CachedModelBackendTests(BaseViewTest):
+
+    def setUp(self):
+        super().setUp()
+        backends.get_cache().clear()
+        self.backend = backends.CachedModelBackend()
+
+    def test_user_is_cached_with_position(self):
+        position = Position.objects.create(name="Developer")
+        self.user.position = position
+        self.user.save()
+
+        with self.assertNumQueries(1):
+            self.backend.get_user(self.user.pk)
+        with self.assertNumQueries(0):
+            user = self.backend.get_user(self.user.pk)
+            self.assertEqual(user.position.name, "Developer")
+
+    def test_changes_drop_cached_user(self):
+        position = Position.objects.create(name="Developer")
+        User.objects.filter(pk=self.user.pk).update(position=position)
+        self.backend.get_user(self.user.pk)
+
+        position.name = "Lead"
+        position.save()
+        self.assertEqual(
+            self.backend.get_user(self.user.pk).position.name, "Lead"
+        )
+
+        self.user.first_name = "Ann"
+        self.user.save()
+        self.assertEqual(self.backend.get_user(self.user.pk).first_name, "Ann")
+
+        position.delete()
+        self.assertIsNone(self.backend.get_user(self.user.pk).position)
+
+        self.user.delete()
+        self.assertIsNone(self.backend.get_user(self.user.pk))
+
+    def test_async_views_read_the_cached_user(self):
+        client = self.async_client
+        async_to_sync(client.alogin)(username="testuser", password="password")
+        try:
+            with override_settings(ASYNC_READ_VIEWS=True):
+                reroute()
+                async_to_sync(client.get)(reverse("app:index"))
+                with CaptureQueriesContext(connection) as queries:
+                    response = async_to_sync(client.get)(reverse("app:index"))
+        finally:
+            reroute()
+
+        self.assertEqual(response.status_code, 200)
+        # The counters alone: no session, no worker.
+        self.assertEqual(len(queries), 1)
+
+    def test_password_change_ends_other_sessions(self):
+        self.assertEqual(
+            self.client.get(reverse("app:index")).status_code, 200
+        )
+
+        self.user.set_password("new password")
+        self.user.save()
+
+        response = self.client.get(reverse("app:index"))
+        self.assertEqual(response.status_code, 302)
+
+
+class StaticAssetsTests(TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        overrides = self.settings(STATIC_ROOT=tmp.name, SERVE_STATIC=True)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        call_command("collectstatic", "--noinput", verbosity=0)
+
+        self.source = (
+            settings.BASE_DIR / "static" / "js" / "autocomplete.js"
+        ).read_bytes()
+        self.url = Template(
+            "{% load static %}{% static 'js/autocomplete.js' %}"
+        ).render(Context())
+
+    def test_collectstatic_hashes_and_compresses(self):
+        self.assertRegex(self.url, r"^/static/js/autocomplete\.\w{12}\.js$")
+        compressed = Path(settings.STATIC_ROOT, self.url[8:] + ".gz")
+        self.assertEqual(gzip.decompress(compressed.read_bytes()), self.source)
+
+    def test_serves_hashed_file_compressed_and_immutable(self):
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                self.url, headers={"accept-encoding": "gzip, deflate"}
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(response["Content-Type"], "text/javascript")
+        self.assertIn("immutable", response["Cache-Control"])
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+        self.assertEqual(gzip.decompress(response.content), self.source)
+
+    def test_honours_refused_encodings(self):
+        # Brotli need not be installed: any .br file next to it will do.
+        Path(settings.STATIC_ROOT, self.url[8:] + ".br").write_bytes(b"br")
+
+        for accept_encoding, expected in (
+            ("br;q=0, gzip", "gzip"),
+            ("gzip, br", "br"),
+            ("BR; q=0.5", "br"),
+            ("*;q=0, gzip", "gzip"),
+            ("gzip;q=0, *", "br"),
+            ("gzip;q=0", None),
+            ("x-gzip-brotli", None),
+        ):
+            with self.subTest(accept_encoding):
+                response = self.client.get(
+                    self.url, headers={"accept-encoding": accept_encoding}
+                )
+                self.assertEqual(response.get("Content-Encoding"), expected)
+
+    def test_serves_unhashed_file_for_a_short_time(self):
+        url = "/static/js/autocomplete.js"
+        response = self.client.get(url)
+
+        self.assertEqual(response.content, self.source)
+        self.assertNotIn("Content-Encoding", response)
+        self.assertEqual(response["Cache-Control"], "public, max-age=60")
+
+        response = self.client.get(url, headers={
+            "if-modified-since": response["Last-Modified"],
+        })
+        self.assertEqual(response.status_code, 304)
+
+    def test_unknown_files_fall_through(self):
+        response = self.client.get("/static/js/missing.js")
+
+        self.assertEqual(response.status_code, 404)
+
+    async def test_serves_under_asgi(self):
+        response = await self.async_client.get(
+            self.url, headers={"accept-encoding": "gzip"}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("immutable", response["Cache-Control"])
+        self.assertEqual(gzip.decompress(response.content), self.source)
+
+
+class AdminTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(
+            username="admin", password="password"
+        )
+        cls.task_type = TaskType.objects.create(name="Bug")
+        cls.position = Position.objects.create(name="Developer")
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def create(self, count):
+        for i in range(count):
+            worker = User.objects.create(
+                username=f"worker{User.objects.count()}",
+                position=self.position,
+            )
+            task = Task.objects.create(
+                name=f"Report {i}",
+                deadline=timezone.now(),
+                task_type=self.task_type,
+            )
+            task.assignees.add(worker)
+
+    def changelist_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return [query["sql"] for query in queries]
+
+    def test_changelist_queries_are_constant(self):
+        for name in ("task", "worker"):
+            with self.subTest(name):
+                url = reverse(f"admin:app_{name}_changelist")
+                self.create(1)
+                self.client.get(url)
+                few = self.changelist_queries(url)
+                self.create(10)
+                many = self.changelist_queries(url)
+
+                self.assertEqual(len(few), len(many))
+                self.assertFalse(
+                    [sql for sql in many if "COUNT(" in sql],
+                    "the total should come from the counters",
+                )
+
+    def test_filtered_changelist_is_counted(self):
+        self.create(3)
+        url = reverse("admin:app_task_changelist")
+
+        queries = self.changelist_queries(url + "?q=report")
+
+        self.assertEqual(
+            len([sql for sql in queries if "COUNT(" in sql]), 1
+        )
+        self.assertContains(self.client.get(url + "?q=report"), "3 tasks")
+
+    def test_task_form_does_not_list_every_worker(self):
+        self.create(2)
+        task, other = Task.objects.order_by("pk")
+
+        response = self.client.get(
+            reverse("admin:app_task_change", args=[task.pk])
+        )
+
+        self.assertContains(response, task.assignees.get().username)
+        self.assertNotContains(response, other.assignees.get().username)
+
+    def test_paginator_estimates_large_tables(self):
+        TaskType.objects.create(name="Feature")
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+        with mock.patch("app.pagination.ESTIMATE_MIN_ROWS", 2):
+            estimated = EstimatedCountPaginator(TaskType.objects.all(), 10)
+            with self.assertNumQueries(1):
+                self.assertEqual(estimated.count, 2)
+            filtered = EstimatedCountPaginator(
+                TaskType.objects.filter(name="Bug"), 10
+            )
+            self.assertEqual(filtered.count, 1)
+
+
 class LoginRequiredTests(TestCase):
 
     def test_tasks_requires_login(self):
@@ -172,6 +2579,17 @@ class WorkerCreationFormTests(TestCase):
         self.assertEqual(user.position, self.position)
         self.assertTrue(User.objects.filter(username="john_doe").exists())
 
+    def test_email_is_folded_like_the_database(self):
+        user = User(username="emile", email="ÉMILE@Example.COM")
+        user.clean()
+        user.save()
+
+        self.assertEqual(user.email, "Émile@example.com")
+        self.assertEqual(
+            User.objects.values_list(Lower("email"), flat=True).get(),
+            user.email,
+        )
+
     def test_duplicate_email_not_allowed(self):
         User.objects.create_user(
             username="existing_user",
@@ -255,3 +2673,72 @@ class WorkerUpdateFormTests(TestCase):
             form.errors["email"][0],
             "A user with this email already exists."
         )
+
+    def test_email_check_is_case_insensitive(self):
+        form = WorkerUpdateForm(instance=self.user, data={
+            "username": "user1",
+            "email": "User2@Example.com",
+        })
+
+        self.assertFalse(form.is_valid())
+        self.assertEqual(
+            form.errors["email"], ["A user with this email already exists."]
+        )
+
+    def test_blank_emails_do_not_clash(self):
+        User.objects.create_user(username="nomail1")
+        form = WorkerUpdateForm(instance=self.user, data={
+            "username": "user1", "email": "", "position": self.position.id,
+        })
+
+        self.assertTrue(form.is_valid())
+        form.save()
+
+    def test_email_check_is_one_indexed_lookup(self):
+        form = WorkerUpdateForm(instance=self.user, data={
+            "username": "user1", "email": "user2@example.com",
+        })
+
+        with CaptureQueriesContext(connection) as queries:
+            form.is_valid()
+
+        email_queries = [
+            q["sql"] for q in queries if "LOWER" in q["sql"]
+        ]
+        self.assertEqual(len(email_queries), 1)
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {email_queries[0]}")
+            plan = " ".join(str(row) for row in cursor.fetchall())
+        self.assertIn("worker_email_ci_unique", plan)
+
+
+class WorkerEmailRaceTests(BaseViewTest):
+
+    def test_concurrent_duplicate_becomes_form_error(self):
+        position = Position.objects.create(name="Driver")
+        User.objects.create_user(username="first", email="taken@example.com")
+        validate = User.validate_constraints
+        calls = []
+
+        def validate_late(instance, exclude=None):
+            # Let the form's own check pass, as if the other request had
+            # not committed yet; later checks see the real table.
+            calls.append(instance)
+            if len(calls) > 1:
+                validate(instance, exclude)
+
+        with mock.patch.object(User, "validate_constraints", validate_late):
+            response = self.client.post(reverse("app:workers-create"), {
+                "username": "second",
+                "password1": "StrongPassword123!",
+                "password2": "StrongPassword123!",
+                "email": "TAKEN@example.com",
+                "position": position.id,
+            })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.context["form"].errors["email"],
+            ["A user with this email already exists."],
+        )
+        self.assertFalse(User.objects.filter(username="second").exists())
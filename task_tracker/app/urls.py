@@ -1,31 +1,53 @@
+from django.conf import settings
 from django.urls import path
 
+from . import async_views, views
+from .replica import replica_reads
 from .views import (
-    index,
-    TasksView,
-    TasksDetailView,
+    ChangesView,
+    JobStatusView,
+    TasksBulkActionView,
+    TasksExportView,
+    TasksSearchView,
     TasksCreateView,
     TasksUpdateView,
     TasksDeleteView,
-    WorkersView,
-    WorkerDetailView,
+    WorkerAutocompleteView,
     WorkerCreateView,
     WorkerUpdateView,
     WorkerDeleteView,
 )
 
+# The read paths have native async versions for ASGI deployments, and
+# read from the replica database when there is one.
+read_views = async_views if settings.ASYNC_READ_VIEWS else views
+
 
 urlpatterns = [
-    path("", index, name="index"),
-    path("tasks/", TasksView.as_view(), name="tasks"),
-    path("tasks/<int:pk>/", TasksDetailView.as_view(), name="tasks-detail"),
+    path("", replica_reads(read_views.index), name="index"),
+    path("tasks/", replica_reads(read_views.TasksView.as_view()),
+         name="tasks"),
+    path("tasks/search/", TasksSearchView.as_view(), name="tasks-search"),
+    path("tasks/bulk/", TasksBulkActionView.as_view(), name="tasks-bulk"),
+    path("tasks/export.csv", TasksExportView.as_view(export_format="csv"),
+         name="tasks-export-csv"),
+    path("tasks/export.ndjson",
+         TasksExportView.as_view(export_format="ndjson"),
+         name="tasks-export-ndjson"),
+    path("tasks/<int:pk>/",
+         replica_reads(read_views.TasksDetailView.as_view()),
+         name="tasks-detail"),
     path("tasks/create/", TasksCreateView.as_view(), name="tasks-create"),
     path("tasks/<int:pk>/update/", TasksUpdateView.as_view(),
          name="tasks-update"),
     path("tasks/<int:pk>/delete/", TasksDeleteView.as_view(),
          name="tasks-delete"),
-    path("workers/", WorkersView.as_view(), name="workers"),
-    path("workers/<int:pk>/", WorkerDetailView.as_view(),
+    path("workers/", replica_reads(read_views.WorkersView.as_view()),
+         name="workers"),
+    path("workers/autocomplete/", WorkerAutocompleteView.as_view(),
+         name="workers-autocomplete"),
+    path("workers/<int:pk>/",
+         replica_reads(read_views.WorkerDetailView.as_view()),
          name="workers-detail"),
     path("workers/create/", WorkerCreateView.as_view(),
          name="workers-create"),
@@ -33,7 +55,16 @@ urlpatterns = [
          name="workers-update"),
     path("workers/<int:pk>/delete/", WorkerDeleteView.as_view(),
          name="workers-delete"),
+    path("jobs/<int:pk>/", JobStatusView.as_view(), name="jobs-detail"),
+    path("changes/", ChangesView.as_view(), name="changes"),
 
 ]
 
+# The live stream never ends: only route it where it is meant to be
+# served, under ASGI.
+if settings.LIVE_UPDATES:
+    urlpatterns.append(
+        path("tasks/live/", async_views.tasks_live, name="tasks-live")
+    )
+
 app_name = "app"
@@ -1,55 +1,262 @@
+import sys
+
+from django.conf import settings
+from django.contrib import messages
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.urls import reverse_lazy
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.urls import reverse, reverse_lazy
+from django.views import View
 from django.views.generic import (
+    TemplateView,
     DetailView,
     CreateView,
     UpdateView,
     DeleteView,
 )
 from django.views.generic.list import ListView
-from django.shortcuts import render
+from django.shortcuts import get_object_or_404, redirect, render
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.db.models import Prefetch, Q
+from django.db.models.functions import Lower
 
-from .models import Task, Worker
-from .forms import WorkerCreationForm, WorkerUpdateForm
+from . import (
+    archive,
+    changes,
+    conditional,
+    counters,
+    export,
+    jobs,
+    row_cache,
+    search,
+    workload,
+)
+from .conditional import ConditionalGetMixin
+from .models import (
+    ArchivedTask, Change, Job, Task, TaskType, Worker, fold_case,
+)
+from .forms import (
+    WorkerCreationForm,
+    WorkerUpdateForm,
+    TaskForm,
+    TaskFilterForm,
+    TaskBulkActionForm,
+)
+from .pagination import CursorPaginationMixin, CursorPaginator, InvalidCursor
 
 
 # Create your views here.
 @login_required
 def index(request):
     """View function for the home page of the site."""
-    num_tasks = Task.objects.count()
-    num_workers = Worker.objects.count()
+    context = dashboard_context(counters.get_counts())
+    return render(request, "app/index.html", context=context)
+
+
+def include_archived(request):
+    """Whether ``request`` asks for archived tasks too (``?archived=1``)."""
+    return request.GET.get("archived") == "1"
+
+
+def job_queued_message(request, job):
+    url = reverse("app:jobs-detail", kwargs={"pk": job.pk})
+    messages.info(request, f"Queued as job #{job.pk}; follow it at {url}.")
 
-    context = {
-        "num_tasks": num_tasks,
-        "num_workers": num_workers,
+
+def dashboard_context(counts):
+    return {
+        "num_tasks": counts[counters.TASKS],
+        "num_workers": counts[counters.WORKERS],
+        "num_open": counts[counters.TASKS_OPEN],
+        "num_complete": counts[counters.TASKS_COMPLETE],
+        "num_overdue": counts["overdue"],
+        "num_by_priority": [
+            (label, counts[counters.priority_counter(value)])
+            for value, label in Task.PRIORITY_CHOICES
+        ],
     }
-    return render(request, "app/index.html", context=context)
 
 
-class TasksView(LoginRequiredMixin, ListView):
+class TasksView(
+    LoginRequiredMixin, ConditionalGetMixin, CursorPaginationMixin, ListView
+):
     """View function for the list of all tasks."""
     model = Task
+    paginate_by = 20
+
+    def get_filter_form(self):
+        if not hasattr(self, "filter_form"):
+            self.filter_form = TaskFilterForm(self.request.GET)
+        return self.filter_form
+
+    def get_cursor_ordering(self):
+        return self.get_filter_form().get_ordering()
+
+    def get_queryset(self):
+        return row_cache.with_row_data(
+            self.get_filter_form().filter(Task.objects.all())
+        )
+
+    def get_task_types(self):
+        # Both forms offer every task type: load them once for the two.
+        if not hasattr(self, "task_types"):
+            self.task_types = list(
+                TaskType.objects.values_list("pk", "name")
+            )
+        return self.task_types
+
+    def get_validators(self):
+        # The filters are part of the ETag through the URL.
+        return (conditional.task_state(), self.get_task_types()), None
+
+    def get_forms_context(self):
+        filter_form = self.get_filter_form()
+        bulk_form = TaskBulkActionForm()
+        task_types = self.get_task_types()
+        filter_form.fields["type"].choices = [("", "Any type"), *task_types]
+        bulk_form.fields["task_type"].choices = [("", "Type"), *task_types]
+        return {"filter_form": filter_form, "bulk_form": bulk_form}
 
+    def get_live_context(self):
+        if not settings.LIVE_UPDATES:
+            return {}
+        # Where the live stream starts, so that no change made while the
+        # page loads is missed. The ETag covers it (see task_state()): a
+        # 304 means no entry came since, and compact_changes keeps the
+        # newest, so the stream can always resume from it.
+        return {"live_cursor": changes.latest_cursor()}
 
-class TasksDetailView(LoginRequiredMixin, DetailView):
-    """View function for the detail view of a task."""
+    def get_list_context(self):
+        return {**self.get_forms_context(), **self.get_live_context()}
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context.update(self.get_list_context())
+        return context
+
+
+class TasksBulkActionView(LoginRequiredMixin, View):
+    """View function for applying one action to many tasks at once."""
+
+    def post(self, request):
+        # The task list's filters ride along in the query string, both to
+        # scope "all matching" and to return to the same list afterwards.
+        filter_form = TaskFilterForm(request.GET)
+        form = TaskBulkActionForm(request.POST)
+
+        if form.is_valid() and settings.BACKGROUND_JOBS:
+            data = request.POST.copy()
+            data.pop("csrfmiddlewaretoken", None)
+            job = jobs.enqueue(
+                "bulk_action",
+                created_by=request.user,
+                data=data.urlencode(),
+                query=request.GET.urlencode(),
+            )
+            job_queued_message(request, job)
+        elif form.is_valid():
+            count = form.apply(filter_form)
+            deleted = form.cleaned_data["action"] == "delete"
+            verb = "Deleted" if deleted else "Updated"
+            messages.success(request, f"{verb} {count} tasks.")
+        else:
+            for errors in form.errors.values():
+                for error in errors:
+                    messages.error(request, error)
+
+        query = request.GET.copy()
+        query.pop("cursor", None)
+        return redirect(f"{reverse('app:tasks')}?{query.urlencode()}")
+
+
+class TasksExportView(LoginRequiredMixin, View):
+    """View function for streaming the (filtered) task list as a file."""
+    export_format = "csv"
+
+    def get(self, request):
+        form = TaskFilterForm(request.GET)
+        models = (Task, ArchivedTask) if include_archived(request) else (Task,)
+        # Archived tasks follow the others, each part in the list's order.
+        querysets = [
+            export.export_queryset(
+                form.filter(model.objects.all()).order_by(
+                    *form.get_ordering(), "pk"
+                )
+            )
+            for model in models
+        ]
+        lines, content_type = export.FORMATS[self.export_format]
+
+        response = StreamingHttpResponse(
+            lines(*querysets), content_type=content_type
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="tasks.{self.export_format}"'
+        )
+        return response
+
+
+class TasksSearchView(LoginRequiredMixin, TemplateView):
+    """View function for ranked full-text search over tasks."""
+    template_name = "app/task_search.html"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        query = self.request.GET.get("q", "").strip()
+        context["query"] = query
+        context["include_archived"] = include_archived(self.request)
+        context["results"] = search.search_tasks(
+            query, include_archived=context["include_archived"]
+        )
+        return context
+
+
+class TasksDetailView(LoginRequiredMixin, ConditionalGetMixin, DetailView):
+    """View function for the detail view of a task.
+
+    A task that is no longer in ``Task`` is looked up in the archive.
+    """
     model = Task
+    template_name = "app/task_detail.html"
+    context_object_name = "task"
+
+    def get_validators(self):
+        pk = self.kwargs["pk"]
+        updated_at = Task.objects.filter(pk=pk).values_list(
+            "updated_at", flat=True
+        ).first() or ArchivedTask.objects.filter(pk=pk).values_list(
+            "archived_at", flat=True
+        ).first()
+        return updated_at and (updated_at, updated_at)
+
+    def get_queryset(self):
+        return Task.objects.select_related("task_type").prefetch_related(
+            Prefetch(
+                "assignees",
+                queryset=Worker.objects.only("id", "username"),
+            )
+        )
+
+    def get_object(self, queryset=None):
+        try:
+            return super().get_object(queryset)
+        except Http404:
+            return super().get_object(archive.archived_queryset())
 
 
 class TasksCreateView(LoginRequiredMixin, CreateView):
     """View function for the create view of a task."""
     model = Task
-    fields = "__all__"
+    form_class = TaskForm
     success_url = reverse_lazy("app:tasks")
 
 
 class TasksUpdateView(LoginRequiredMixin, UpdateView):
     """View function for the create view of a task."""
     model = Task
-    fields = "__all__"
+    form_class = TaskForm
     success_url = reverse_lazy("app:tasks")
 
 
@@ -59,24 +266,174 @@ class TasksDeleteView(LoginRequiredMixin, DeleteView):
     success_url = reverse_lazy("app:tasks")
 
 
-class WorkersView(LoginRequiredMixin, ListView):
+class WorkersView(
+    LoginRequiredMixin, ConditionalGetMixin, CursorPaginationMixin, ListView
+):
     """View function for the list of all workers."""
     model = Worker
+    paginate_by = 20
+    cursor_ordering = ("username", "id")
+
+    def get_validators(self):
+        # The workers on the page, not the whole table: seeking to the
+        # page is as cheap as rendering it.
+        paginator = CursorPaginator(
+            Worker.objects.only("id", "username", "updated_at"),
+            self.paginate_by,
+            self.get_cursor_ordering(),
+        )
+        try:
+            page = paginator.page(self.request.GET.get("cursor"))
+        except InvalidCursor:
+            return None
+        workers = [(worker.pk, worker.updated_at) for worker in page]
+        return (workers, page.has_next(), conditional.workload_state()), None
+
+    def get_queryset(self):
+        # Only a short preview of each worker's tasks is rendered; the
+        # totals come from one grouped query over the page.
+        return Worker.objects.select_related("position").prefetch_related(
+            workload.upcoming_prefetch()
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        workload.attach_summaries(context["object_list"])
+        return context
 
 
-class WorkerDetailView(LoginRequiredMixin, DetailView):
+class WorkerDetailView(LoginRequiredMixin, ConditionalGetMixin, DetailView):
     """View function for the detail view of a worker."""
     model = Worker
+    tasks_paginate_by = 20
+
+    def get_validators(self):
+        # Index lookups, as for the lists, rather than aggregates over the
+        # worker's assignments: assignee changes touch the tasks, so the
+        # state of every task covers those of the worker.
+        updated_at = Worker.objects.filter(pk=self.kwargs["pk"]).values_list(
+            "updated_at", flat=True
+        ).first()
+        if updated_at is None:
+            return None
+        return (updated_at, conditional.workload_state()), None
+
+    def get_queryset(self):
+        return Worker.objects.select_related("position")
+
+    def get_tasks_paginator(self):
+        # Deadline lives on app_task, so no index yields a worker's tasks
+        # in order: each page reads all of their assignments from the
+        # covering (worker_id, task_id) index (migration 0006), looks up
+        # each task and sorts them. That grows with the worker's
+        # assignments, not the table: about 12 ms a page for 14k of them.
+        return CursorPaginator(
+            Task.objects.filter(assignees=self.object).only(
+                "id", "name", "is_complete", "priority", "deadline"
+            ),
+            self.tasks_paginate_by,
+            ("deadline", "id"),
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        workload.attach_summaries([self.object])
+
+        paginator = self.get_tasks_paginator()
+        try:
+            page = paginator.page(self.request.GET.get("cursor"))
+        except InvalidCursor as e:
+            raise Http404(str(e))
+
+        context.update(tasks_page_context(paginator, page))
+        return context
+
+
+def tasks_page_context(paginator, page):
+    return {
+        "assigned_tasks": page.object_list,
+        "paginator": paginator,
+        "page_obj": page,
+        "is_paginated": page.has_other_pages(),
+    }
+
+
+def prefix_upper_bound(prefix):
+    """The least string above every string starting with ``prefix``, or
+    ``None`` if there is none (it ends in U+10FFFF characters only)."""
+    prefix = prefix.rstrip(chr(sys.maxunicode))
+    if not prefix:
+        return None
+    code = ord(prefix[-1]) + 1
+    if 0xD800 <= code <= 0xDFFF:
+        # Surrogates cannot be encoded: skip to the next character.
+        code = 0xE000
+    return prefix[:-1] + chr(code)
+
 
+class WorkerAutocompleteView(LoginRequiredMixin, View):
+    """View function for worker suggestions as JSON, by name prefix."""
+    limit = 10
+    search_fields = ("username", "first_name", "last_name")
 
-class WorkerCreateView(LoginRequiredMixin, CreateView):
+    def get_queryset(self, prefix):
+        # A half-open range instead of LIKE 'prefix%', so the Lower()
+        # indexes on Worker serve it on every backend.
+        upper = prefix_upper_bound(prefix)
+        matches = Q()
+        for field in self.search_fields:
+            match = Q(**{f"{field}_lower__gte": prefix})
+            if upper is not None:
+                match &= Q(**{f"{field}_lower__lt": upper})
+            matches |= match
+        return Worker.objects.alias(**{
+            f"{field}_lower": Lower(field) for field in self.search_fields
+        }).filter(matches).order_by("username")
+
+    def get(self, request):
+        # Folded as Lower() folds the columns it is compared with.
+        prefix = fold_case(request.GET.get("q", "").strip())
+        results = []
+        if prefix:
+            results = list(self.get_queryset(prefix).values(
+                "id", "username", "first_name", "last_name"
+            )[:self.limit])
+        return JsonResponse({"results": results})
+
+
+class WorkerEmailConflictMixin:
+    """Turn a lost race for an email address into a form error.
+
+    The form already checked the email against the unique constraint; if
+    another request took it since, the insert fails and the constraint is
+    checked again to explain why.
+    """
+
+    def form_valid(self, form):
+        try:
+            with transaction.atomic():
+                return super().form_valid(form)
+        except IntegrityError:
+            try:
+                form.instance.validate_constraints()
+            except ValidationError as e:
+                form.add_error(None, e)
+                return self.form_invalid(form)
+            raise
+
+
+class WorkerCreateView(
+    LoginRequiredMixin, WorkerEmailConflictMixin, CreateView
+):
     """View function for the create view of a worker."""
     model = get_user_model()
     form_class = WorkerCreationForm
     success_url = reverse_lazy("app:workers")
 
 
-class WorkerUpdateView(LoginRequiredMixin, UpdateView):
+class WorkerUpdateView(
+    LoginRequiredMixin, WorkerEmailConflictMixin, UpdateView
+):
     """View function for the update view of a worker."""
     model = Worker
     form_class = WorkerUpdateForm
@@ -87,3 +444,84 @@ class WorkerDeleteView(LoginRequiredMixin, DeleteView):
     """View function for the delete view of a worker."""
     model = Worker
     success_url = reverse_lazy("app:workers")
+
+    def form_valid(self, form):
+        # With thousands of assigned tasks, the delete can take seconds.
+        if not settings.BACKGROUND_JOBS:
+            return super().form_valid(form)
+        job = jobs.enqueue(
+            "delete_worker", created_by=self.request.user, pk=self.object.pk
+        )
+        job_queued_message(self.request, job)
+        return redirect(self.get_success_url())
+
+
+class JobStatusView(LoginRequiredMixin, View):
+    """View function for polling one of the user's background jobs."""
+
+    def get(self, request, pk):
+        job = get_object_or_404(Job, pk=pk, created_by=request.user)
+        return JsonResponse({
+            "id": job.pk,
+            "name": job.name,
+            "status": job.status,
+            "attempts": job.attempts,
+            "result": job.result,
+            "error": job.error,
+            "created_at": job.created_at,
+            "finished_at": job.finished_at,
+        })
+
+
+class ChangesView(LoginRequiredMixin, View):
+    """View function for the change feed after a cursor, as JSON.
+
+    Without ``since``, no entries are returned, only the current cursor:
+    a client takes it before loading the pages it keeps in sync. When
+    ``since`` is older than the oldest entry kept, the answer is 410 Gone
+    and the client must load everything again.
+    """
+    default_limit = 100
+    max_limit = 1000
+
+    def get(self, request):
+        if "since" not in request.GET:
+            return JsonResponse({
+                "changes": [],
+                "cursor": changes.latest_cursor(),
+                "more": False,
+            })
+        try:
+            since = int(request.GET["since"])
+            limit = int(request.GET.get("limit", self.default_limit))
+        except ValueError:
+            return JsonResponse(
+                {"error": "since and limit must be integers."}, status=400
+            )
+        if since < changes.oldest_cursor():
+            return JsonResponse(
+                {"error": "since is older than the kept changes; reload."},
+                status=410,
+            )
+
+        limit = max(1, min(limit, self.max_limit))
+        # One row more than asked tells whether another page follows.
+        entries = list(
+            Change.objects.filter(pk__gt=since).order_by("pk")[:limit + 1]
+        )
+        page = entries[:limit]
+        return JsonResponse({
+            "changes": [
+                {
+                    "id": change.pk,
+                    "model": change.model,
+                    "object_id": change.object_id,
+                    "action": change.action,
+                    "data": change.data,
+                    "at": change.created_at,
+                }
+                for change in page
+            ],
+            "cursor": page[-1].pk if page else since,
+            "more": len(entries) > limit,
+        })
@@ -0,0 +1,58 @@
+"""Per-worker task counts, computed for a page of workers at a time."""
+from django.db.models import Count, Prefetch, Q
+from django.utils import timezone
+
+from .models import Task
+
+Assignment = Task.assignees.through
+
+PREVIEW_SIZE = 3
+
+
+def summary_queryset(worker_ids, now=None):
+    """One grouped query over the assignments of ``worker_ids``."""
+    now = now or timezone.now()
+    return Assignment.objects.filter(worker_id__in=worker_ids).values(
+        "worker_id"
+    ).annotate(
+        open=Count("pk", filter=Q(task__is_complete=False)),
+        complete=Count("pk", filter=Q(task__is_complete=True)),
+        overdue=Count(
+            "pk",
+            filter=Q(task__is_complete=False, task__deadline__lt=now),
+        ),
+    ).order_by()
+
+
+def _attach(workers, rows):
+    empty = {"open": 0, "complete": 0, "overdue": 0}
+    summaries = {row.pop("worker_id"): row for row in rows}
+    for worker in workers:
+        worker.workload = summaries.get(worker.pk, empty)
+    return workers
+
+
+def attach_summaries(workers):
+    """Set ``workload`` (open/complete/overdue counts) on each worker."""
+    rows = summary_queryset([worker.pk for worker in workers])
+    return _attach(workers, rows)
+
+
+async def aattach_summaries(workers):
+    rows = summary_queryset([worker.pk for worker in workers])
+    return _attach(workers, [row async for row in rows])
+
+
+def upcoming_prefetch(size=PREVIEW_SIZE):
+    """Prefetch each worker's next ``size`` open tasks as ``upcoming``.
+
+    The slice becomes a ROW_NUMBER() window per worker, so a busy worker
+    costs the same as an idle one.
+    """
+    return Prefetch(
+        "assigned_tasks",
+        queryset=Task.objects.filter(is_complete=False)
+        .only("id", "name", "deadline")
+        .order_by("deadline", "id")[:size],
+        to_attr="upcoming",
+    )
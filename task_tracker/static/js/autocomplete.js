@@ -0,0 +1,90 @@
+// Autocomplete for <select multiple data-autocomplete-url="...">.
+//
+// The select only holds the chosen options. A text box next to it asks
+// the URL for matches (?q=<prefix>, answered with {"results": [...]})
+// and adds the one picked; double-clicking an option removes it.
+(function () {
+  "use strict";
+
+  function label(worker) {
+    var name = [worker.first_name, worker.last_name].join(" ").trim();
+    return name ? worker.username + " (" + name + ")" : worker.username;
+  }
+
+  function setUp(select) {
+    var input = document.createElement("input");
+    var list = document.createElement("div");
+    var timer = null;
+    var request = 0;
+
+    input.type = "search";
+    input.className = "form-control mt-2";
+    input.placeholder = "Type a name to add…";
+    input.setAttribute("autocomplete", "off");
+    list.className = "list-group";
+    select.parentNode.insertBefore(input, select.nextSibling);
+    input.parentNode.insertBefore(list, input.nextSibling);
+
+    function add(worker) {
+      var value = String(worker.id);
+      var exists = Array.prototype.some.call(select.options, function (o) {
+        return o.value === value;
+      });
+      if (!exists) {
+        select.add(new Option(worker.username, value, true, true));
+      }
+      input.value = "";
+      list.innerHTML = "";
+    }
+
+    function show(results) {
+      list.innerHTML = "";
+      results.forEach(function (worker) {
+        var item = document.createElement("button");
+        item.type = "button";
+        item.className = "list-group-item list-group-item-action";
+        item.textContent = label(worker);
+        item.addEventListener("click", function () { add(worker); });
+        list.appendChild(item);
+      });
+    }
+
+    input.addEventListener("input", function () {
+      clearTimeout(timer);
+      var prefix = input.value.trim();
+      if (!prefix) {
+        show([]);
+        return;
+      }
+      timer = setTimeout(function () {
+        var current = ++request;
+        var url = select.dataset.autocompleteUrl +
+          "?q=" + encodeURIComponent(prefix);
+        fetch(url, {credentials: "same-origin"})
+          .then(function (response) { return response.json(); })
+          .then(function (data) {
+            // Ignore answers to keystrokes that were overtaken.
+            if (current === request) {
+              show(data.results);
+            }
+          });
+      }, 200);
+    });
+
+    select.addEventListener("dblclick", function (event) {
+      if (event.target.tagName === "OPTION") {
+        event.target.remove();
+      }
+    });
+
+    // Only what is still listed is submitted, selected or not.
+    select.form.addEventListener("submit", function () {
+      Array.prototype.forEach.call(select.options, function (o) {
+        o.selected = true;
+      });
+    });
+  }
+
+  document.querySelectorAll("select[data-autocomplete-url]")
+    .forEach(setUp);
+})();
@@ -0,0 +1,84 @@
+// Live updates of the task list, over Server-Sent Events (app/live.py).
+//
+// <tbody data-live-url="..."> holds the rows. The stream is asked for the
+// tasks they show and sends the new row of each one that changes, which
+// replaces the old one in place. Tasks created meanwhile are only
+// counted, in #live-notice: where they belong depends on the filters and
+// the page, so they show on reload.
+(function () {
+  "use strict";
+
+  var body = document.querySelector("tbody[data-live-url]");
+  var notice = document.getElementById("live-notice");
+  if (!body || !window.EventSource) {
+    return;
+  }
+  var created = 0;
+
+  function boxes(root) {
+    return root.querySelectorAll("input[name=ids]");
+  }
+
+  function row(id) {
+    var box = body.querySelector("input[name=ids][value='" + id + "']");
+    return box && box.closest("tr");
+  }
+
+  function say(text) {
+    notice.textContent = text + " ";
+    var link = document.createElement("a");
+    link.href = "";
+    link.textContent = "Reload";
+    notice.appendChild(link);
+    notice.hidden = false;
+  }
+
+  function replace(data, highlight) {
+    var old = row(data.id);
+    if (!old) {
+      return;
+    }
+    var template = document.createElement("template");
+    template.innerHTML = data.html.trim();
+    var fresh = template.content.firstElementChild;
+    // Keep the row picked for a bulk action.
+    boxes(fresh)[0].checked = boxes(old)[0].checked;
+    if (highlight) {
+      fresh.classList.add("table-success");
+      setTimeout(function () {
+        fresh.classList.remove("table-success");
+      }, 3000);
+    }
+    old.replaceWith(fresh);
+  }
+
+  var ids = Array.prototype.map.call(boxes(body), function (box) {
+    return box.value;
+  });
+  // On reconnecting, the browser also sends the id of the last event it
+  // got, which the server prefers to "since".
+  var source = new EventSource(
+    body.dataset.liveUrl + "&ids=" + ids.join(",")
+  );
+
+  source.addEventListener("updated", function (event) {
+    replace(JSON.parse(event.data), false);
+  });
+  source.addEventListener("completed", function (event) {
+    replace(JSON.parse(event.data), true);
+  });
+  source.addEventListener("deleted", function (event) {
+    var old = row(JSON.parse(event.data).id);
+    if (old) {
+      old.remove();
+    }
+  });
+  source.addEventListener("created", function (event) {
+    created += JSON.parse(event.data).count;
+    say(created === 1 ? "1 new task." : created + " new tasks.");
+  });
+  source.addEventListener("reload", function () {
+    source.close();
+    say("This list is out of date.");
+  });
+})();
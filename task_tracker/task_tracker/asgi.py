@@ -3,14 +3,49 @@ ASGI config for task_tracker project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serve it with an ASGI server (Daphne, Uvicorn, ...) for the async read
+views (ASYNC_READ_VIEWS) and the live task list updates (LIVE_UPDATES):
+each open task list holds a connection, which costs a coroutine here
+rather than a thread.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
 """
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.urls import reverse
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'task_tracker.settings')
 
-application = get_asgi_application()
+
+class StreamingASGIHandler(ASGIHandler):
+    """Django's ASGI handler, sparing the live update streams a thread.
+
+    Django runs the sync calls of each request (loading the session and
+    the user, the request_started receivers) in a thread of the request's
+    own, which lasts as long as the request: one idle thread per open
+    stream. The streams' few, short sync calls share one thread instead.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.streaming_paths = (
+            {reverse("app:tasks-live")} if settings.LIVE_UPDATES else set()
+        )
+
+    async def __call__(self, scope, receive, send):
+        path_info = scope.get("path", "").removeprefix(
+            scope.get("root_path", "")
+        )
+        if scope["type"] == "http" and path_info in self.streaming_paths:
+            await self.handle(scope, receive, send)
+        else:
+            await super().__call__(scope, receive, send)
+
+
+django.setup(set_prefix=False)
+application = StreamingASGIHandler()
@@ -47,12 +47,19 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so its timings cover the rest; inactive unless enabled below.
+    "app.middleware.InstrumentationMiddleware",
     'django.middleware.security.SecurityMiddleware',
+    # Before sessions and auth, which static files do not need; inactive
+    # unless SERVE_STATIC is on.
+    "app.static_assets.StaticFilesMiddleware",
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
+    # Inactive unless there is a replica database (see REPLICA_DATABASE).
+    "app.replica.PinPrimaryMiddleware",
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
@@ -77,6 +84,68 @@ CRISPY_TEMPLATE_PACK = "bootstrap4"
 
 WSGI_APPLICATION = 'task_tracker.wsgi.application'
 
+ASGI_APPLICATION = 'task_tracker.asgi.application'
+
+# Serve the read-only views (home, lists, details) with their native async
+# versions. Only worth it under ASGI; under WSGI each would be wrapped back
+# into a sync call.
+ASYNC_READ_VIEWS = os.getenv("ASYNC_READ_VIEWS", "") == "1"
+
+# Per-request SQL/template/view timings as a Server-Timing header and log
+# lines on "app.instrumentation" (see app/middleware.py). Requests and
+# queries slower than these many milliseconds are logged as warnings, as
+# is any SQL run REPEATED_QUERY_THRESHOLD or more times in one request.
+REQUEST_INSTRUMENTATION = os.getenv("REQUEST_INSTRUMENTATION", "") == "1"
+SLOW_REQUEST_MS = int(os.getenv("SLOW_REQUEST_MS", "500"))
+SLOW_QUERY_MS = int(os.getenv("SLOW_QUERY_MS", "100"))
+REPEATED_QUERY_THRESHOLD = int(os.getenv("REPEATED_QUERY_THRESHOLD", "5"))
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "app.instrumentation": {
+            "handlers": ["console"],
+            "level": "INFO",
+            "propagate": False,
+        },
+        "app.jobs": {
+            "handlers": ["console"],
+            "level": "INFO",
+            "propagate": False,
+        },
+        "app.live": {
+            "handlers": ["console"],
+            "level": "INFO",
+            "propagate": False,
+        },
+    },
+}
+
+# Hand bulk edits and worker deletions to the background job queue (see
+# app/jobs.py) instead of running them in the request; run the queue with
+# "manage.py run_jobs". A claimed job is given JOB_VISIBILITY_TIMEOUT
+# seconds, renewed while it runs, before another worker may take it over,
+# and is retried up to JOB_MAX_ATTEMPTS runs in all, JOB_RETRY_DELAY
+# seconds after the first failure and twice as long after each further
+# one. "manage.py purge_jobs" deletes finished jobs.
+BACKGROUND_JOBS = os.getenv("BACKGROUND_JOBS", "") == "1"
+JOB_VISIBILITY_TIMEOUT = int(os.getenv("JOB_VISIBILITY_TIMEOUT", "300"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETRY_DELAY = int(os.getenv("JOB_RETRY_DELAY", "10"))
+
+# Patch the rows of open task lists as tasks change, over a Server-Sent
+# Events stream (see app/live.py). Each open list holds a connection, so
+# only turn this on under ASGI. One poll of the change feed every
+# LIVE_POLL_INTERVAL seconds serves all of a process's connections; idle
+# ones are sent a keep-alive every LIVE_HEARTBEAT seconds.
+LIVE_UPDATES = os.getenv("LIVE_UPDATES", "") == "1"
+LIVE_POLL_INTERVAL = float(os.getenv("LIVE_POLL_INTERVAL", "1"))
+LIVE_HEARTBEAT = int(os.getenv("LIVE_HEARTBEAT", "15"))
+
 
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
@@ -88,6 +157,102 @@ DATABASES = {
     }
 }
 
+# Applied to every new SQLite connection by app/sqlite.py.
+SQLITE_PRAGMAS = {}
+
+# DATABASE_PROFILE=production tunes SQLite for several worker processes
+# sharing one file. WAL lets readers run while a write is in progress.
+# Writers take the lock when their transaction begins (IMMEDIATE) and wait
+# up to busy_timeout for it, instead of failing with "database is locked"
+# when a read transaction tries to upgrade. Connections are kept for
+# CONN_MAX_AGE seconds and checked before being reused.
+DATABASE_PROFILE = os.getenv("DATABASE_PROFILE", "default")
+
+PRODUCTION_DATABASE = {
+    "CONN_MAX_AGE": int(os.getenv("CONN_MAX_AGE", "600")),
+    "CONN_HEALTH_CHECKS": True,
+    "OPTIONS": {"transaction_mode": "IMMEDIATE"},
+}
+PRODUCTION_SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    # Safe against the app crashing; a power cut may lose the last
+    # commits, but never corrupts the database.
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,  # ms
+    "cache_size": -20000,  # negative means KiB: 20 MB of page cache
+    "mmap_size": 128 * 1024 * 1024,
+    "temp_store": "MEMORY",
+}
+
+if DATABASE_PROFILE == "production":
+    DATABASES["default"].update(PRODUCTION_DATABASE)
+    SQLITE_PRAGMAS = PRODUCTION_SQLITE_PRAGMAS
+
+# REPLICA_DATABASE is the path of a copy of the database, refreshed by
+# "manage.py sync_replica", that serves the reads of the list and detail
+# pages and the home page (see app/replica.py). After a write, the user's
+# reads stay on the primary for REPLICA_PIN_SECONDS; keep it longer than
+# the sync interval.
+REPLICA_DATABASE = os.getenv("REPLICA_DATABASE")
+REPLICA_PIN_SECONDS = int(os.getenv("REPLICA_PIN_SECONDS", "10"))
+
+if REPLICA_DATABASE:
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "NAME": REPLICA_DATABASE,
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_ROUTERS = ["app.replica.ReplicaRouter"]
+
+
+# Caches
+# https://docs.djangoproject.com/en/6.0/topics/cache/
+
+# "task_rows" holds rendered rows of the task list (see app/row_cache.py).
+# Local memory evicts the least recently used rows once MAX_ENTRIES is
+# reached; set TASK_ROW_CACHE_DIR to share the rows between processes
+# through files instead (that backend culls a random third when full).
+TASK_ROW_CACHE_DIR = os.getenv("TASK_ROW_CACHE_DIR")
+
+# "auth" holds sessions and logged-in workers (see app/backends.py) so
+# that a request needs no query to know who is asking. Every process must
+# see the same entries, or a logout or password change in one would go
+# unseen by the others: it is only used once AUTH_CACHE_DIR names a
+# directory they all share. Until then, sessions and workers are read from
+# the database.
+AUTH_CACHE_DIR = os.getenv("AUTH_CACHE_DIR")
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "auth": {
+        "BACKEND": (
+            "django.core.cache.backends.filebased.FileBasedCache"
+            if AUTH_CACHE_DIR
+            else "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": AUTH_CACHE_DIR or "auth",
+        "OPTIONS": {
+            "MAX_ENTRIES": int(os.getenv("AUTH_CACHE_SIZE", "10000")),
+        },
+    },
+    "task_rows": {
+        "BACKEND": (
+            "django.core.cache.backends.filebased.FileBasedCache"
+            if TASK_ROW_CACHE_DIR
+            else "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": TASK_ROW_CACHE_DIR or "task-rows",
+        # Rows carry their own version, so they never expire by age.
+        "TIMEOUT": None,
+        "OPTIONS": {
+            "MAX_ENTRIES": int(os.getenv("TASK_ROW_CACHE_SIZE", "10000")),
+        },
+    },
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -113,6 +278,20 @@ AUTH_PASSWORD_VALIDATORS = [
 
 AUTH_USER_MODEL = "app.Worker"
 
+AUTHENTICATION_BACKENDS = ["django.contrib.auth.backends.ModelBackend"]
+SESSION_ENGINE = "django.contrib.sessions.backends.db"
+
+# Seconds a cached worker is trusted for; saves and deletes drop it
+# earlier.
+USER_CACHE_TIMEOUT = int(os.getenv("USER_CACHE_TIMEOUT", "300"))
+
+if AUTH_CACHE_DIR:
+    AUTHENTICATION_BACKENDS = ["app.backends.CachedModelBackend"]
+    # Sessions are read from the cache and written through to the
+    # database, so they survive a cache flush or restart.
+    SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
+    SESSION_CACHE_ALIAS = "auth"
+
 LOGIN_REDIRECT_URL = "/"
 
 # Internationalization
@@ -131,3 +310,23 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/6.0/howto/static-files/
 
 STATIC_URL = 'static/'
+
+STATICFILES_DIRS = [BASE_DIR / "static"]
+
+# "collectstatic" copies the files here under content-hashed names, with
+# .gz/.br variants (see app/static_assets.py).
+STATIC_ROOT = Path(os.getenv("STATIC_ROOT", BASE_DIR / "staticfiles"))
+
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "app.static_assets.CompressedManifestStaticFilesStorage",
+    },
+}
+
+# Serve STATIC_ROOT from the app, hashed files with a one-year immutable
+# Cache-Control and the rest for STATIC_MAX_AGE seconds.
+SERVE_STATIC = os.getenv("SERVE_STATIC", "") == "1"
+STATIC_MAX_AGE = int(os.getenv("STATIC_MAX_AGE", "60"))